@@ -0,0 +1,128 @@
+"""
+后台产物写入
+
+执行器在每次执行中会保存截图、标记图像、标记映射和执行结果。这些文件复制/JSON写入不影响执行本身，
+ArtifactWriter 将它们放到一个后台线程中按提交顺序执行，调用方只负责准备好要写的数据。
+
+- 有界队列：队列满时提交方阻塞等待（背压），积压的写入不会无限占用内存
+- 计数器：按类别统计已提交的产物数，会话摘要直接使用计数，不再遍历目录
+- flush/close：等待已提交的写入全部完成（close 后不再接受后台写入，进程退出时自动 close）
+- 同步模式：提交时直接在调用线程中写入并抛出异常（用于测试）
+"""
+
+import atexit
+import queue
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+from .logger import get_logger
+
+logger = get_logger("ArtifactWriter")
+
+
+class ArtifactWriter:
+    """按提交顺序执行写入任务的后台线程
+
+    Attributes:
+        synchronous: 是否为同步模式
+        counts: 各类别已提交的产物数
+        written: 成功完成的写入数
+        failed: 失败的写入数
+    """
+
+    def __init__(self, max_queue_size: int = 64, synchronous: bool = False, name: str = "artifact-writer"):
+        """
+        Args:
+            max_queue_size: 队列容量（未完成的写入数上限）
+            synchronous: 同步模式（在调用线程中立即写入）
+            name: 后台线程名
+        """
+        self.synchronous = synchronous
+        self.counts: Counter = Counter()
+        self.written = 0
+        self.failed = 0
+        self.errors: List[str] = []
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+        if not synchronous:
+            self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+            self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, kind: str, func: Callable, *args: Any):
+        """提交一个写入任务（队列满时阻塞）
+
+        Args:
+            kind: 产物类别（用于计数）
+            func: 写入函数
+            *args: 写入函数的参数
+        """
+        with self._stats_lock:
+            self.counts[kind] += 1
+        if self.synchronous:
+            self._run(func, args, raise_errors=True)
+            return
+        with self._submit_lock:
+            if not self._closed:
+                self._queue.put((func, args))
+                return
+        # 已关闭：在调用线程中写入
+        self._run(func, args)
+
+    def _run(self, func: Callable, args: tuple, raise_errors: bool = False):
+        try:
+            func(*args)
+        except Exception as e:
+            with self._stats_lock:
+                self.failed += 1
+                self.errors.append(str(e))
+            logger.error(f"产物写入失败: {e}")
+            if raise_errors:
+                raise
+        else:
+            with self._stats_lock:
+                self.written += 1
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._run(*item)
+            finally:
+                self._queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        """尚未完成的写入数"""
+        return 0 if self.synchronous else self._queue.unfinished_tasks
+
+    def flush(self):
+        """等待已提交的写入全部完成"""
+        if not self.synchronous:
+            self._queue.join()
+
+    def close(self):
+        """写完已提交的任务并停止后台线程（可重复调用）"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+        if not self.synchronous:
+            self._queue.put(None)
+            self._thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'submitted': sum(self.counts.values()),
+                'written': self.written,
+                'failed': self.failed,
+                'pending': self.pending,
+                'counts': dict(self.counts)
+            }
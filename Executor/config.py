@@ -65,6 +65,7 @@ class PerceptionConfig:
     non_visual_mode: bool = False
     save_marked_images: bool = True
     enable_immediate_screenshot: bool = False  # ⭐ 是否启用立刻截图（0.2秒），默认关闭
+    enable_adaptive_settle: bool = True  # ⭐ 是否用屏幕稳定检测替代固定等待（关闭时退回固定5秒）
 
     @classmethod
     def from_env(cls) -> 'PerceptionConfig':
@@ -94,7 +95,25 @@ class PerceptionConfig:
             text_summary_model=text_summary_model,
             non_visual_mode=os.getenv("NON_VISUAL_MODE", "False").lower() == "true",
             save_marked_images=os.getenv("SAVE_MARKED_IMAGES", "True").lower() == "true",
-            enable_immediate_screenshot=os.getenv("ENABLE_IMMEDIATE_SCREENSHOT", "False").lower() == "true"  # ⭐ 默认关闭立刻截图
+            enable_immediate_screenshot=os.getenv("ENABLE_IMMEDIATE_SCREENSHOT", "False").lower() == "true",  # ⭐ 默认关闭立刻截图
+            enable_adaptive_settle=os.getenv("ENABLE_ADAPTIVE_SETTLE", "True").lower() == "true"
+        )
+
+
+@dataclass
+class ReflectionConfig:
+    """反思配置"""
+    enable_precheck: bool = True  # ⭐ 是否在调用LMM反思前先做确定性预检（明显的结果不再调用LMM）
+    precheck_min_confidence: float = 0.9  # 直接采用预检结果所需的最低置信度
+    precheck_audit_mode: bool = True  # 审计模式（默认）：仍然调用LMM，只统计预检结果与LMM结果的一致率；准确率得到验证后再关闭
+
+    @classmethod
+    def from_env(cls) -> 'ReflectionConfig':
+        """从环境变量加载反思配置"""
+        return cls(
+            enable_precheck=os.getenv("ENABLE_REFLECTION_PRECHECK", "True").lower() == "true",
+            precheck_min_confidence=float(os.getenv("REFLECTION_PRECHECK_MIN_CONFIDENCE", "0.9")),
+            precheck_audit_mode=os.getenv("REFLECTION_PRECHECK_AUDIT_MODE", "True").lower() == "true"
         )
 
 
@@ -106,6 +125,8 @@ class OutputConfig:
     save_marked_images: bool = True
     save_logs: bool = True
     log_level: str = "INFO"
+    async_writes: bool = True  # ⭐ 是否在后台线程中写入截图/结果等产物（关闭时同步写入）
+    write_queue_size: int = 64  # 后台写入队列容量，队列满时保存产物的调用方阻塞等待
 
     def __post_init__(self):
         """确保输出目录存在"""
@@ -125,7 +146,9 @@ class OutputConfig:
             save_screenshots=os.getenv("SAVE_SCREENSHOTS", "True").lower() == "true",
             save_marked_images=os.getenv("SAVE_MARKED_IMAGES", "True").lower() == "true",
             save_logs=os.getenv("SAVE_LOGS", "True").lower() == "true",
-            log_level=os.getenv("LOG_LEVEL", "INFO")
+            log_level=os.getenv("LOG_LEVEL", "INFO"),
+            async_writes=os.getenv("ASYNC_ARTIFACT_WRITES", "True").lower() == "true",
+            write_queue_size=int(os.getenv("ARTIFACT_WRITE_QUEUE_SIZE", "64"))
         )
 
 
@@ -155,6 +178,7 @@ class ExecutorConfig:
     core_model: ModelConfig
     perception: PerceptionConfig
     output: OutputConfig
+    reflection: ReflectionConfig = field(default_factory=ReflectionConfig)
 
     @classmethod
     def from_env(cls, env_file: Optional[str] = None) -> 'ExecutorConfig':
@@ -172,7 +196,8 @@ class ExecutorConfig:
             device=DeviceConfig.from_env(),
             core_model=ModelConfig.from_env("CORE_LMM"),
             perception=PerceptionConfig.from_env(),
-            output=OutputConfig.from_env()
+            output=OutputConfig.from_env(),
+            reflection=ReflectionConfig.from_env()
         )
 
     @classmethod
@@ -185,14 +210,16 @@ class ExecutorConfig:
                     'device': {'device_id': '...'},
                     'core_model': {'model_name': '...', ...},
                     'perception': {...},
-                    'output': {...}
+                    'output': {...},
+                    'reflection': {...}
                 }
         """
         return cls(
             device=DeviceConfig(**config_dict.get('device', {})),
             core_model=ModelConfig(**config_dict['core_model']),
             perception=PerceptionConfig(**config_dict.get('perception', {})),
-            output=OutputConfig(**config_dict.get('output', {}))
+            output=OutputConfig(**config_dict.get('output', {})),
+            reflection=ReflectionConfig(**config_dict.get('reflection', {}))
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -204,5 +231,6 @@ class ExecutorConfig:
                 'non_visual_mode': self.perception.non_visual_mode,
                 'save_marked_images': self.perception.save_marked_images
             },
-            'output': self.output.__dict__
+            'output': self.output.__dict__,
+            'reflection': self.reflection.__dict__
         }
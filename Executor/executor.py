@@ -13,10 +13,12 @@ from Citlali.models.openai.client import OpenAIChatClient
 from Fairy.entity.info_entity import ScreenInfo, ActionInfo, PlanInfo
 from Fairy.tools.mobile_controller.action_type import AtomicActionType, ATOMIC_ACTION_SIGNITURES
 from Fairy.tools.screen_perceptor.ssip_new.perceptor.perceptor import ScreenStructuredInfoPerception
+from shared import BlobStore
 
 from .config import ExecutorConfig
 from .output import ExecutionOutput, OutputManager
 from .logger import get_logger
+from .reflection_precheck import ReflectionPrecheck
 from .singleton_wrappers import SingletonUiAutomatorMobileController, SingletonUiAutomatorMobileScreenCapturer
 
 logger = get_logger("FairyExecutor")
@@ -48,7 +50,7 @@ class FairyExecutor:
         next_agent.process(result)
     """
 
-    def __init__(self, config: ExecutorConfig, use_session_subdir: bool = True):
+    def __init__(self, config: ExecutorConfig, use_session_subdir: bool = True, blob_store: Optional[BlobStore] = None):
         """
         初始化执行器
 
@@ -56,6 +58,7 @@ class FairyExecutor:
             config: 执行器配置对象
             use_session_subdir: 是否在output_dir下创建session子目录（默认True）
                                 由Explorer调用时应设为False
+            blob_store: 内容寻址存储，由Explorer传入以便与步骤目录共享同一份截图
         """
         self.config = config
         self.use_session_subdir = use_session_subdir
@@ -73,6 +76,10 @@ class FairyExecutor:
         fairy_config = self._create_fairy_config()
         self.controller = SingletonUiAutomatorMobileController(fairy_config)
         self.screen_capturer = SingletonUiAutomatorMobileScreenCapturer(fairy_config)
+        if not config.perception.enable_adaptive_settle:
+            # 关闭自适应稳定检测，退回原有的固定等待
+            self.controller.settle_detector = None
+            self.screen_capturer.settle_detector = None
 
         # 初始化屏幕感知器
         if config.perception.visual_model:
@@ -85,10 +92,22 @@ class FairyExecutor:
             self.screen_perceptor = None
             logger.warning("屏幕感知器未配置")
 
+        # ⭐ 反思预检（明显的执行结果不调用LMM）
+        if config.reflection.enable_precheck:
+            self.reflection_precheck = ReflectionPrecheck(
+                min_confidence=config.reflection.precheck_min_confidence,
+                audit_mode=config.reflection.precheck_audit_mode
+            )
+        else:
+            self.reflection_precheck = None
+
         # 初始化输出管理器
         self.output_manager = OutputManager(
             config.output.output_dir,
-            use_session_subdir=use_session_subdir
+            use_session_subdir=use_session_subdir,
+            blob_store=blob_store,
+            synchronous_writes=not config.output.async_writes,
+            write_queue_size=config.output.write_queue_size
         )
         logger.info(f"输出目录: {self.output_manager.session_dir}")
 
@@ -116,7 +135,8 @@ class FairyExecutor:
         key_infos: Optional[List] = None,
         language: str = "Chinese",
         max_iterations: int = 5,
-        enable_reflection: bool = True
+        enable_reflection: bool = True,
+        screen_before: Optional[ScreenInfo] = None
     ) -> ExecutionOutput:
         """
         执行自然语言指令
@@ -148,6 +168,8 @@ class FairyExecutor:
             language: 指令语言
             max_iterations: 最大循环次数（默认5），用于重复执行直到任务完成
             enable_reflection: 是否启用反思机制（默认True），启用后会循环执行直到任务完成
+            screen_before: 调用方已获取的当前屏幕信息（可选，如上一步的screen_after），
+                           提供时第一次迭代直接使用，不再重新截图和感知
 
         Returns:
             ExecutionOutput: 执行结果，包含所有输出文件路径和所有迭代的信息
@@ -179,6 +201,7 @@ class FairyExecutor:
             output_files = {}
             all_actions_taken = []
             all_iterations = []
+            handoff_screen = screen_before
             screen_before = None
             screen_after = None
             final_action_info = None
@@ -189,8 +212,17 @@ class FairyExecutor:
                 logger.info(f"[{execution_id}] === 迭代 {iteration + 1}/{max_iterations} ===")
 
                 # 1. 获取屏幕信息（before）
-                logger.info(f"[{execution_id}] 获取执行前屏幕信息...")
-                screen_before = await self._get_screen_info()
+                if iteration == 0 and handoff_screen is not None:
+                    # ⭐ 使用调用方交接的屏幕信息，省去一次截图+感知
+                    logger.info(f"[{execution_id}] 使用调用方提供的执行前屏幕信息")
+                    screen_before = handoff_screen
+                elif screen_after is not None:
+                    # ⭐ 后续迭代：上一次迭代的screen_after就是屏幕稳定后的当前屏幕
+                    logger.info(f"[{execution_id}] 使用上一次迭代的执行后屏幕信息作为执行前屏幕")
+                    screen_before = screen_after
+                else:
+                    logger.info(f"[{execution_id}] 获取执行前屏幕信息...")
+                    screen_before = await self._get_screen_info()
 
                 # 保存第一次迭代的 before 截图
                 if iteration == 0 and self.config.output.save_screenshots:
@@ -370,25 +402,16 @@ class FairyExecutor:
         """获取屏幕信息"""
         import time
 
-        # 获取当前Activity
-        t0 = time.time()
-        activity_info = await self.screen_capturer.get_current_activity()
-        logger.debug(f"获取Activity耗时: {time.time() - t0:.2f}秒")
-
-        # 获取截图和UI层次结构
-        t0 = time.time()
-        screenshot_file_info, ui_hierarchy_xml = await self.screen_capturer.get_screen()
-        logger.debug(f"获取截图和UI层次耗时: {time.time() - t0:.2f}秒")
+        # 并发获取截图、UI层次结构、Activity和键盘状态
+        snapshot = await self.screen_capturer.capture_snapshot()
+        logger.debug(f"获取屏幕快照耗时: " + ", ".join(f"{k}={v:.2f}秒" for k, v in snapshot.timings.items()))
+        screenshot_file_info, ui_hierarchy_xml = snapshot.screenshot_file_info, snapshot.ui_hierarchy_xml
+        activity_info, keyboard_status = snapshot.activity_info, snapshot.keyboard_status
 
         t0 = time.time()
         screenshot_file_info.compress_image_to_jpeg()
         logger.debug(f"压缩图像耗时: {time.time() - t0:.2f}秒")
 
-        # 获取键盘状态
-        t0 = time.time()
-        keyboard_status = await self.screen_capturer.get_keyboard_activation_status()
-        logger.debug(f"获取键盘状态耗时: {time.time() - t0:.2f}秒")
-
         # 解析屏幕
         if self.screen_perceptor is not None:
             t0 = time.time()
@@ -800,11 +823,12 @@ class FairyExecutor:
         - 如果 enable_immediate_screenshot=True（双截图模式）：
           1. 执行主要动作
           2. 等待0.2秒 → 第一次快速截图（捕获快速消失的bubble/toast）
-          3. 等待到5秒 → 第二次截图（页面完全稳定/加载完成）
+             第一次截图的压缩与屏幕感知在后台进行，与等待页面稳定重叠
+          3. 等待页面稳定（最长到5秒） → 第二次截图（页面完全稳定/加载完成）
           4. 两张截图都保留，传给Reflector让LLM判断
         - 如果 enable_immediate_screenshot=False（单截图模式，默认）：
           1. 执行主要动作
-          2. 等待5秒 → 截图（页面完全稳定/加载完成）
+          2. 等待页面稳定（最长5秒） → 截图（页面完全稳定/加载完成）
 
         Args:
             actions: 动作列表
@@ -847,6 +871,7 @@ class FairyExecutor:
         # ⭐ 声明变量（可能为None）
         screenshot_file_info_1 = None
         ui_xml_1 = None
+        immediate_task = None
 
         # ⭐ 如果启用立刻截图：等待0.2秒后立刻截图（捕获快速bubble）
         if enable_immediate:
@@ -860,77 +885,89 @@ class FairyExecutor:
                 f"{self.screen_capturer.screenshot_filename}_immediate",
                 'png'
             )
-            self.controller.dev.screenshot(screenshot_file_info_1.get_screenshot_fullpath())
-            ui_xml_1 = self.controller.dev.dump_hierarchy()
+            screenshot_image_1, ui_xml_1 = await asyncio.gather(
+                self.controller.adev.screenshot(),
+                self.controller.adev.dump_hierarchy()
+            )
+            screenshot_file_info_1.set_image(screenshot_image_1)
             logger.info(f"[{execution_id}] 第一次截图完成，耗时: {time.time() - capture_time:.2f}秒")
 
-            # 等待到5秒（总共5秒 - 0.2秒 = 4.8秒）
-            logger.info(f"[{execution_id}] 等待到5秒后进行第二次截图（页面稳定）...")
-            await asyncio.sleep(4.8)
-        else:
-            # ⭐ 单截图模式：等待5秒
-            logger.info(f"[{execution_id}] 等待5秒后进行截图（页面稳定）...")
-            await asyncio.sleep(5.0)
-
-        capture_time = time.time()
-        # 快速截图2
-        screenshot_file_info_2 = ScreenFileInfo(
-            self.screen_capturer.screenshot_temp_path,
-            self.screen_capturer.screenshot_filename,  # 主截图
-            'png'
-        )
-        self.controller.dev.screenshot(screenshot_file_info_2.get_screenshot_fullpath())
-        ui_xml_2 = self.controller.dev.dump_hierarchy()
-        logger.info(f"[{execution_id}] 第二次截图完成，耗时: {time.time() - capture_time:.2f}秒")
-
-        # 获取其他信息（Activity、键盘状态）
-        logger.info(f"[{execution_id}] 获取Activity和键盘状态...")
-        activity_info = await self.screen_capturer.get_current_activity()
-        keyboard_status = await self.screen_capturer.get_keyboard_activation_status()
+            # ⭐ immediate截图的压缩与SoM标记在后台进行，与下面的等待页面稳定重叠
+            immediate_task = asyncio.create_task(
+                self._perceive_immediate_capture(screenshot_file_info_1, ui_xml_1, execution_id)
+            )
 
-        # 压缩两张图（如果有立刻截图）
-        screenshot_file_info_2.compress_image_to_jpeg()
-        if enable_immediate and screenshot_file_info_1:
-            screenshot_file_info_1.compress_image_to_jpeg()
+        try:
+            if enable_immediate:
+                # 等待页面稳定（最长到5秒：5秒 - 0.2秒 = 4.8秒）
+                logger.info(f"[{execution_id}] 等待页面稳定后进行第二次截图（最长4.8秒）...")
+                await self._wait_for_screen_settle(4.8)
+            else:
+                # ⭐ 单截图模式：等待页面稳定（最长5秒）
+                logger.info(f"[{execution_id}] 等待页面稳定后进行截图（最长5秒）...")
+                await self._wait_for_screen_settle(5.0)
 
-        # ⭐ 屏幕感知：根据配置决定是否对两张截图都进行SoM标记
-        if self.screen_perceptor is not None:
-            # 1. 处理stable截图（5秒） - 总是需要
-            logger.info(f"[{execution_id}] 开始屏幕感知（stable截图，5秒）...")
-            screenshot_file_info_2, perception_infos_stable = await self.screen_perceptor.get_perception_infos(
-                screenshot_file_info_2,
-                ui_xml_2,
-                non_visual_mode=self.config.perception.non_visual_mode,
-                target_app=activity_info.package_name
+            capture_time = time.time()
+            # 快速截图2
+            screenshot_file_info_2 = ScreenFileInfo(
+                self.screen_capturer.screenshot_temp_path,
+                self.screen_capturer.screenshot_filename,  # 主截图
+                'png'
+            )
+            screenshot_image_2, ui_xml_2 = await asyncio.gather(
+                self.controller.adev.screenshot(),
+                self.controller.adev.dump_hierarchy()
+            )
+            screenshot_file_info_2.set_image(screenshot_image_2)
+            logger.info(f"[{execution_id}] 第二次截图完成，耗时: {time.time() - capture_time:.2f}秒")
+
+            # 获取其他信息（Activity、键盘状态），同时压缩stable截图
+            logger.info(f"[{execution_id}] 获取Activity和键盘状态...")
+            activity_info, keyboard_status, _ = await asyncio.gather(
+                self.screen_capturer.get_current_activity(),
+                self.screen_capturer.get_keyboard_activation_status(),
+                asyncio.to_thread(screenshot_file_info_2.compress_image_to_jpeg)
             )
 
-            # 2. 如果启用立刻截图，处理immediate截图（0.2秒）- 完整的SoM标记
-            perception_infos_immediate = None
-            if enable_immediate and screenshot_file_info_1 and ui_xml_1:
-                logger.info(f"[{execution_id}] 开始屏幕感知（immediate截图，0.2秒）...")
-                screenshot_file_info_1, perception_infos_immediate = await self.screen_perceptor.get_perception_infos(
-                    screenshot_file_info_1,
-                    ui_xml_1,
+            # ⭐ 屏幕感知：关键路径上只剩stable截图的感知，immediate截图的感知已在后台完成
+            if self.screen_perceptor is not None:
+                logger.info(f"[{execution_id}] 开始屏幕感知（stable截图，5秒）...")
+                screenshot_file_info_2, perception_infos_stable = await self.screen_perceptor.get_perception_infos(
+                    screenshot_file_info_2,
+                    ui_xml_2,
                     non_visual_mode=self.config.perception.non_visual_mode,
                     target_app=activity_info.package_name
                 )
+        except BaseException:
+            if immediate_task is not None:
+                immediate_task.cancel()
+            raise
+
+        perception_infos_immediate = None
+        if immediate_task is not None:
+            try:
+                screenshot_file_info_1, perception_infos_immediate = await immediate_task
+            except Exception as e:
+                logger.warning(f"[{execution_id}] immediate截图的屏幕感知失败，仅使用stable截图: {e}")
+
+        if self.screen_perceptor is not None:
+            if perception_infos_immediate is not None:
                 logger.info(f"[{execution_id}] 两张截图的SoM标记都已完成")
             else:
                 logger.info(f"[{execution_id}] SoM标记已完成（仅stable截图）")
         else:
             from Fairy.tools.screen_perceptor.entity import ScreenPerceptionInfo
             perception_infos_stable = ScreenPerceptionInfo(
-                width=screenshot_file_info_2.get_screenshot_Image_file().width,
-                height=screenshot_file_info_2.get_screenshot_Image_file().height,
+                width=screenshot_file_info_2.get_screenshot_PILImage_file().width,
+                height=screenshot_file_info_2.get_screenshot_PILImage_file().height,
                 perception_infos=ui_xml_2,
                 keyboard_status=keyboard_status,
                 use_set_of_marks_mapping=False
             )
-            perception_infos_immediate = None
             if enable_immediate and screenshot_file_info_1 and ui_xml_1:
                 perception_infos_immediate = ScreenPerceptionInfo(
-                    width=screenshot_file_info_1.get_screenshot_Image_file().width,
-                    height=screenshot_file_info_1.get_screenshot_Image_file().height,
+                    width=screenshot_file_info_1.get_screenshot_PILImage_file().width,
+                    height=screenshot_file_info_1.get_screenshot_PILImage_file().height,
                     perception_infos=ui_xml_1,
                     keyboard_status=keyboard_status,
                     use_set_of_marks_mapping=False
@@ -942,7 +979,7 @@ class FairyExecutor:
 
         # ⭐ 如果启用立刻截图，附加immediate截图的完整信息
         if enable_immediate and screenshot_file_info_1:
-            screen_after.immediate_screenshot_path = screenshot_file_info_1.get_screenshot_fullpath()
+            screen_after.immediate_screenshot_path = screenshot_file_info_1.ensure_persisted()
             screen_after.immediate_marked_screenshot_path = screenshot_file_info_1.get_screenshot_fullpath().replace('.jpeg', '_marked.jpeg')
             screen_after.immediate_xml = ui_xml_1
             screen_after.immediate_perception_infos = perception_infos_immediate
@@ -974,6 +1011,54 @@ class FairyExecutor:
 
         return screen_after
 
+    async def _perceive_immediate_capture(self, screenshot_file_info, ui_xml: str, execution_id: str):
+        """压缩immediate截图并进行屏幕感知（作为后台任务，与等待页面稳定重叠）
+
+        Args:
+            screenshot_file_info: immediate截图文件信息
+            ui_xml: immediate截图时的UI层次结构
+            execution_id: 执行ID
+
+        Returns:
+            Tuple[ScreenFileInfo, Optional[SSIPInfo]]: 截图文件信息（视觉模式下为标记后的截图）与感知结果（未配置感知器时为None）
+        """
+        import asyncio
+        import time
+
+        t0 = time.time()
+        if self.screen_perceptor is None:
+            await asyncio.to_thread(screenshot_file_info.compress_image_to_jpeg)
+            return screenshot_file_info, None
+
+        activity_info, _ = await asyncio.gather(
+            self.screen_capturer.get_current_activity(),
+            asyncio.to_thread(screenshot_file_info.compress_image_to_jpeg)
+        )
+        screenshot_file_info, perception_infos = await self.screen_perceptor.get_perception_infos(
+            screenshot_file_info,
+            ui_xml,
+            non_visual_mode=self.config.perception.non_visual_mode,
+            target_app=activity_info.package_name,
+            track_diff=False  # immediate截图为过渡态，不作为下一帧差异基准
+        )
+        logger.info(f"[{execution_id}] immediate截图的屏幕感知已在后台完成，耗时: {time.time() - t0:.2f}秒")
+        return screenshot_file_info, perception_infos
+
+    async def _wait_for_screen_settle(self, max_timeout: float):
+        """等待屏幕稳定（未启用稳定检测时固定等待max_timeout秒）
+
+        Args:
+            max_timeout: 最长等待时间（秒）
+        """
+        import asyncio
+
+        settle_detector = self.screen_capturer.settle_detector
+        if settle_detector is None:
+            await asyncio.sleep(max_timeout)
+            return
+        settle_result = await settle_detector.wait_until_settled(max_timeout=max_timeout)
+        logger.info(f"屏幕{'已稳定' if settle_result.settled else '未稳定（超时）'}，耗时: {settle_result.elapsed:.2f}秒，采样 {settle_result.polls} 次")
+
     async def _reflect_on_execution(
         self,
         instruction: str,
@@ -1004,6 +1089,14 @@ class FairyExecutor:
 
         logger.info("开始反思执行结果...")
 
+        # ⭐ 预检：由确定性信号判断明显的结果，置信度足够时不调用LMM
+        verdict = None
+        if self.reflection_precheck is not None:
+            verdict = self.reflection_precheck.evaluate(action_info, screen_before, screen_after)
+            if self.reflection_precheck.accept(verdict):
+                logger.info(f"采用预检结果，跳过LMM反思: {verdict.reason}")
+                return verdict.to_progress_info(plan_info.current_sub_goal)
+
         # 构建 reflection prompt
         t0 = time.time()
         prompt = self._build_reflection_prompt(
@@ -1065,6 +1158,8 @@ class FairyExecutor:
 
         # 解析响应
         progress_info = self._parse_reflection_response(response.content)
+        if verdict is not None and self.reflection_precheck.audit_mode:
+            self.reflection_precheck.record_audit(verdict, progress_info)
 
         logger.info(f"反思结果: action_result={progress_info.action_result}, progress_status={progress_info.progress_status}")
         if progress_info.error_potential_causes != "None":
@@ -1179,6 +1274,9 @@ class FairyExecutor:
 
         prompt += current_screen.perception_infos.get_screen_info_prompt("after the Action (stable state)")
 
+        # ⭐ 增量感知提供的结构差异（廉价的"屏幕变化"信号）
+        prompt += current_screen.perception_infos.get_screen_diff_prompt("after the Action")
+
         prompt += f"\nPlease scrutinize the above screen information to infer the type of previous and current pages (e.g., home page, search page, results page, details page, etc.) and thus the main function of these pages. Please carefully identify whether the page has jumped or not! This will help you to find the mistakes in the execution just now and avoid the wrong plan.\n"
 
         if has_dual_screenshots:
@@ -1223,6 +1321,13 @@ class FairyExecutor:
                 progress_status="Unknown"
             )
 
+    def flush_outputs(self):
+        """等待后台产物写入完成（读取输出文件或保存 blob 清单前调用）"""
+        self.output_manager.flush()
+
     def get_session_summary(self) -> Dict:
         """获取会话摘要"""
-        return self.output_manager.get_session_summary()
+        summary = self.output_manager.get_session_summary()
+        if self.reflection_precheck is not None:
+            summary['reflection_precheck'] = self.reflection_precheck.get_stats()
+        return summary
@@ -5,13 +5,15 @@
 """
 
 import json
-import shutil
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 
 from Fairy.entity.info_entity import ScreenInfo
+from shared import BlobStore
+
+from .artifact_writer import ArtifactWriter
 
 
 @dataclass
@@ -88,7 +90,8 @@ class ExecutionOutput:
 class OutputManager:
     """输出管理器
 
-    负责管理所有输出文件的保存和组织
+    负责管理所有输出文件的保存和组织。文件的复制和JSON写入由后台的 ArtifactWriter 执行，
+    save_* 方法立即返回目标路径；需要读取这些文件前先调用 flush()。
 
     Examples:
         manager = OutputManager(output_dir=Path("output"))
@@ -103,13 +106,18 @@ class OutputManager:
         manager.save_execution_result(execution_output)
     """
 
-    def __init__(self, output_dir: Path, session_id: Optional[str] = None, use_session_subdir: bool = True):
+    def __init__(self, output_dir: Path, session_id: Optional[str] = None, use_session_subdir: bool = True,
+                 blob_store: Optional[BlobStore] = None, synchronous_writes: bool = False, write_queue_size: int = 64):
         """
         Args:
             output_dir: 输出根目录
             session_id: 会话ID，用于区分不同的执行会话。如果不指定，使用时间戳
             use_session_subdir: 是否在output_dir下创建session子目录（默认True）
                                 设为False时，直接使用output_dir作为输出目录
+            blob_store: 内容寻址存储（由Explorer传入会话级的store，与步骤目录共享）。
+                        不指定时在会话目录下创建 blobs/
+            synchronous_writes: 是否同步写入（默认在后台线程中写入）
+            write_queue_size: 后台写入队列容量
         """
         self.output_dir = Path(output_dir)
 
@@ -134,6 +142,12 @@ class OutputManager:
         for dir_path in [self.screenshots_dir, self.marked_images_dir, self.logs_dir, self.results_dir]:
             dir_path.mkdir(exist_ok=True)
 
+        # ⭐ 截图以 blob 引用的方式保存，同一内容只存一份
+        self.blob_store = blob_store or BlobStore(self.session_dir / "blobs")
+
+        # ⭐ 后台写入产物（有界队列，会话摘要使用其计数）
+        self.writer = ArtifactWriter(write_queue_size, synchronous=synchronous_writes)
+
         # 执行计数器
         self.execution_count = 0
 
@@ -156,15 +170,12 @@ class OutputManager:
         if execution_id is None:
             execution_id = self.get_execution_id()
 
-        # 获取原始截图路径
-        source_path = screen_info.screenshot_file_info.get_screenshot_fullpath()
-
         # 目标路径
         filename = f"{execution_id}_{stage}.jpg"
         target_path = self.screenshots_dir / filename
 
-        # 复制文件
-        shutil.copy(source_path, target_path)
+        # 链接到 blob（before 截图与标记图像内容相同，只存一份）
+        self.writer.submit("screenshots", self._store_screenshot, screen_info.screenshot_file_info, target_path)
 
         return target_path
 
@@ -185,15 +196,12 @@ class OutputManager:
         if execution_id is None:
             execution_id = self.get_execution_id()
 
-        # 获取标记后的图像路径
-        source_path = screen_info.screenshot_file_info.get_screenshot_fullpath()
-
         # 目标路径
         filename = f"{execution_id}_{stage}_marked.jpg"
         target_path = self.marked_images_dir / filename
 
-        # 复制文件
-        shutil.copy(source_path, target_path)
+        # 链接到 blob（before 截图与标记图像内容相同，只存一份）
+        self.writer.submit("marked_images", self._store_screenshot, screen_info.screenshot_file_info, target_path)
 
         return target_path
 
@@ -229,8 +237,7 @@ class OutputManager:
         filename = f"{execution_id}_{stage}_mapping.json"
         filepath = self.marked_images_dir / filename
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(mapping_data, f, indent=2, ensure_ascii=False)
+        self.writer.submit("mark_mappings", self._write_json, filepath, mapping_data)
 
         return filepath
 
@@ -246,10 +253,33 @@ class OutputManager:
         filename = f"result_{result.timestamp.replace(':', '-').replace(' ', '_')}.json"
         filepath = self.results_dir / filename
 
-        result.save_to_file(filepath)
+        # 提交时序列化（调用方之后可能继续修改 result.output_files）
+        self.writer.submit("results", self._write_text, filepath, result.to_json())
 
         return filepath
 
+    def _store_screenshot(self, screenshot_file_info, target_path: Path):
+        """等待截图落盘后链接到 blob（在后台线程中执行）"""
+        self.blob_store.store_file(screenshot_file_info.ensure_persisted(), target_path)
+
+    @staticmethod
+    def _write_json(filepath: Path, data: Dict[str, Any]):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def _write_text(filepath: Path, text: str):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def flush(self):
+        """等待已提交的产物全部写入"""
+        self.writer.flush()
+
+    def close(self):
+        """写完已提交的产物并停止后台写入线程"""
+        self.writer.close()
+
     def get_session_summary(self) -> Dict[str, Any]:
         """获取会话摘要
 
@@ -260,15 +290,19 @@ class OutputManager:
             'session_id': self.session_id,
             'session_dir': str(self.session_dir),
             'execution_count': self.execution_count,
-            'screenshots_count': len(list(self.screenshots_dir.glob('*.jpg'))),
-            'marked_images_count': len(list(self.marked_images_dir.glob('*_marked.jpg'))),
-            'results_count': len(list(self.results_dir.glob('*.json')))
+            'screenshots_count': self.writer.counts["screenshots"],
+            'marked_images_count': self.writer.counts["marked_images"],
+            'results_count': self.writer.counts["results"],
+            'artifact_writer': self.writer.get_stats(),
+            'blob_store': self.blob_store.get_stats()
         }
 
     def save_session_summary(self) -> Path:
         """保存会话摘要"""
+        self.flush()
         summary = self.get_session_summary()
         filepath = self.session_dir / "session_summary.json"
+        self.blob_store.save_manifest()
 
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False)
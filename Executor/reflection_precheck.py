@@ -0,0 +1,389 @@
+"""
+反思预检
+
+每次动作执行后，反思默认都会把执行前后的截图和屏幕信息交给LMM判断结果。其中有相当一部分结果是显而易见的：
+点击后屏幕没有任何变化（几乎可以确定失败），或者预期中要出现的文本已经出现（几乎可以确定成功）。
+
+预检在调用LMM之前先计算几个廉价的确定性信号：
+- 可访问性树的差异大小（新增/删除/内容变化的节点数，同时比较0.2秒立刻截图，避免漏掉很快消失的提示）
+- 点击位置上的目标控件是否消失、文本或勾选/选中状态是否变化
+- 键盘状态是否变化
+- Activity / 前台应用是否变化
+- 预期结果中引号括起的文本是否在执行后的屏幕上新出现
+
+然后按规则给出判断及置信度，置信度达到阈值时直接采用（不调用LMM），否则退回LMM反思。
+审计模式下仍然调用LMM，预检结果只用于与LMM的结果对比，统计预检的准确率。
+
+判断规则：
+- no_change (D): 执行了点击/长按/输入类动作，但屏幕结构、键盘、Activity都没有变化
+- expected_text_appeared (B): 预期文本全部出现在执行后的屏幕上且至少一个是新出现的（同时切换了Activity时置信度更高）。
+  预期文本来自单个动作的预期结果，只能说明该动作的结果符合预期，不能说明整个子目标已完成，因此判断为 B 而不是 A
+其余情况不作判断。
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from Fairy.entity.info_entity import ActionInfo, ProgressInfo, ScreenInfo
+from Fairy.tools.screen_perceptor.ssip_new.perceptor.screen_diff import diff_node_index, index_nodes
+
+from .logger import get_logger
+
+logger = get_logger("ReflectionPrecheck")
+
+# 屏幕无变化即可判定为失败的动作
+EFFECTFUL_ACTIONS = ("Tap", "LongPress", "Input", "ClearInput")
+# 包含这些动作时不作判断（结果需要LMM理解页面才能判断）
+UNDECIDABLE_ACTIONS = ("Finish", "NeedInteraction", "UserInstruction", "ListApps")
+# 目标控件的状态属性
+STATE_PROPERTIES = ("checked", "selected", "focused", "enabled")
+
+# 预期文本：引号/书名号括起的内容
+_QUOTED_TEXT_PATTERN = re.compile(r'"([^"]{2,40})"|\'([^\']{2,40})\'|“([^”]{1,40})”|‘([^’]{1,40})’|「([^」]{1,40})」|『([^』]{1,40})』')
+
+RULE_CONFIDENCE = {
+    "no_change": 0.95,
+    "no_change_input": 0.9,  # 输入框可能已有相同内容
+    "expected_text_appeared": 0.9,
+    "expected_text_appeared_with_page_change": 0.95,
+}
+
+# 审计时与预检结果一致的LMM结果：预检判断为 B（动作结果符合预期）时，LMM 判断为 A（子目标也已完成）同样一致
+AGREEING_LLM_RESULTS = {"B": ("A", "B")}
+
+
+@dataclass
+class PrecheckSignals:
+    """一次动作执行前后的确定性信号
+
+    Attributes:
+        action_names: 执行的动作名称
+        diff_size: 执行前后可访问性树变化的节点数（新增+删除+内容变化），缺少可访问性树时为None
+        immediate_diff_size: 执行前与0.2秒立刻截图之间变化的节点数（未启用立刻截图时为None）
+        target_found: 是否在执行前的屏幕上找到点击位置的目标控件
+        target_disappeared: 目标控件在执行后是否消失
+        target_changes: 目标控件的变化（如 "text", "+checked", "-selected"）
+        keyboard_changed: 键盘状态是否变化
+        activity_changed: Activity是否变化
+        package_changed: 前台应用是否变化
+        expected_texts: 从预期结果中提取的文本
+        expected_texts_present: 执行后屏幕上出现的预期文本
+        expected_texts_new: 执行后新出现（执行前没有）的预期文本
+    """
+    action_names: List[str] = field(default_factory=list)
+    diff_size: Optional[int] = None
+    immediate_diff_size: Optional[int] = None
+    target_found: bool = False
+    target_disappeared: bool = False
+    target_changes: List[str] = field(default_factory=list)
+    keyboard_changed: bool = False
+    activity_changed: bool = False
+    package_changed: bool = False
+    expected_texts: List[str] = field(default_factory=list)
+    expected_texts_present: List[str] = field(default_factory=list)
+    expected_texts_new: List[str] = field(default_factory=list)
+
+    @property
+    def screen_unchanged(self) -> bool:
+        """屏幕结构、键盘、Activity都没有变化（缺少可访问性树时无法判断，返回False）"""
+        if self.diff_size is None:
+            return False
+        return (self.diff_size == 0 and not self.immediate_diff_size
+                and not self.keyboard_changed and not self.activity_changed and not self.package_changed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class PrecheckVerdict:
+    """预检判断
+
+    Attributes:
+        action_result: 'A'/'B'/'C'/'D'
+        confidence: 置信度
+        rule: 命中的规则
+        reason: 判断依据（写入 error_potential_causes / progress_status）
+        signals: 计算出的信号
+    """
+    action_result: str
+    confidence: float
+    rule: str
+    reason: str
+    signals: PrecheckSignals
+
+    def to_progress_info(self, sub_goal: str) -> ProgressInfo:
+        """转换为与LMM反思结果相同的 ProgressInfo"""
+        if self.action_result == "A":
+            return ProgressInfo(
+                action_result=self.action_result,
+                error_potential_causes="None",
+                progress_status=f"Sub-goal '{sub_goal}' completed ({self.reason})"
+            )
+        if self.action_result == "B":
+            return ProgressInfo(
+                action_result=self.action_result,
+                error_potential_causes="None",
+                progress_status=f"The action result met expectations ({self.reason}); sub-goal '{sub_goal}' not yet confirmed as completed"
+            )
+        return ProgressInfo(
+            action_result=self.action_result,
+            error_potential_causes=self.reason,
+            progress_status=f"Sub-goal '{sub_goal}' not completed"
+        )
+
+
+def _get_at_dict(screen: Optional[ScreenInfo], immediate: bool = False):
+    """取屏幕感知结果中的可访问性树（[xml, page_desc, at_dict]），没有时返回None"""
+    if screen is None:
+        return None
+    perception_infos = getattr(screen, 'immediate_perception_infos', None) if immediate else screen.perception_infos
+    infos = getattr(perception_infos, 'infos', None)
+    # 未配置感知器时 infos 只有XML（字符串或 [xml, None]），没有可访问性树
+    if not isinstance(infos, (list, tuple)) or len(infos) < 3:
+        return None
+    return infos[2]
+
+
+def _iter_nodes(at_dict):
+    stack = list(reversed(at_dict or []))
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.get('children', [])))
+
+
+def _collect_texts(at_dict) -> str:
+    """屏幕上所有节点的文本（用换行连接，便于子串查找）"""
+    return "\n".join(node.get('text') or '' for node in _iter_nodes(at_dict))
+
+
+def _find_target(at_dict, x, y) -> Optional[Dict]:
+    """找到包含坐标 (x, y) 的面积最小的节点"""
+    best, best_area = None, None
+    for node in _iter_nodes(at_dict):
+        bounds = node.get('bounds')
+        if not bounds:
+            continue
+        (x1, y1), (x2, y2) = bounds
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            area = (x2 - x1) * (y2 - y1)
+            if best_area is None or area < best_area:
+                best, best_area = node, area
+    return best
+
+
+def extract_expected_texts(text: Optional[str]) -> List[str]:
+    """提取预期结果中引号/书名号括起的文本
+
+    Args:
+        text: 预期结果
+
+    Returns:
+        List[str]: 去重后的文本列表
+    """
+    texts = []
+    for match in _QUOTED_TEXT_PATTERN.finditer(text or ''):
+        quoted = next(group for group in match.groups() if group is not None).strip()
+        if quoted and quoted not in texts:
+            texts.append(quoted)
+    return texts
+
+
+class ReflectionPrecheck:
+    """反思预检：由确定性信号判断明显的执行结果
+
+    Attributes:
+        min_confidence: 直接采用预检结果所需的最低置信度
+        audit_mode: 审计模式（仍然调用LMM，只统计预检与LMM结果的一致率）
+    """
+
+    def __init__(self, min_confidence: float = 0.9, audit_mode: bool = False):
+        """
+        Args:
+            min_confidence: 最低置信度
+            audit_mode: 是否启用审计模式
+        """
+        self.min_confidence = min_confidence
+        self.audit_mode = audit_mode
+        self.rules: Counter = Counter()
+        self.llm_calls_saved = 0
+        self.audits: List[Dict[str, Any]] = []
+
+    def compute_signals(
+        self,
+        action_info: ActionInfo,
+        screen_before: ScreenInfo,
+        screen_after: ScreenInfo
+    ) -> PrecheckSignals:
+        """计算执行前后的确定性信号
+
+        Args:
+            action_info: 执行的动作信息（Tap/LongPress 已转换为坐标）
+            screen_before: 执行前的屏幕信息
+            screen_after: 执行后的屏幕信息
+
+        Returns:
+            PrecheckSignals: 信号
+        """
+        signals = PrecheckSignals(action_names=[action['name'] for action in action_info.actions])
+
+        before_activity, after_activity = screen_before.current_activity_info, screen_after.current_activity_info
+        signals.activity_changed = before_activity.activity != after_activity.activity
+        signals.package_changed = before_activity.package_name != after_activity.package_name
+        signals.keyboard_changed = (getattr(screen_before.perception_infos, 'keyboard_status', None)
+                                    != getattr(screen_after.perception_infos, 'keyboard_status', None))
+
+        before_tree, after_tree = _get_at_dict(screen_before), _get_at_dict(screen_after)
+        if before_tree is None or after_tree is None:
+            return signals
+
+        before_index = index_nodes(before_tree)
+        diff = diff_node_index(before_index, index_nodes(after_tree))
+        signals.diff_size = len(diff.added) + len(diff.removed) + len(diff.changed)
+        immediate_tree = _get_at_dict(screen_after, immediate=True)
+        if immediate_tree is not None:
+            immediate_diff = diff_node_index(before_index, index_nodes(immediate_tree))
+            signals.immediate_diff_size = len(immediate_diff.added) + len(immediate_diff.removed) + len(immediate_diff.changed)
+
+        # 点击位置上的目标控件
+        tap = next((action for action in action_info.actions if action['name'] in ("Tap", "LongPress")), None)
+        if tap is not None and 'x' in tap['arguments']:
+            target = _find_target(before_tree, tap['arguments']['x'], tap['arguments']['y'])
+            if target is not None:
+                signals.target_found = True
+                key = (target.get('resource-id'), target.get('class'), tuple(tuple(point) for point in target.get('bounds')))
+                after_node = next((node for node in _iter_nodes(after_tree)
+                                   if (node.get('resource-id'), node.get('class'), tuple(tuple(point) for point in node.get('bounds') or [])) == key), None)
+                if after_node is None:
+                    signals.target_disappeared = True
+                else:
+                    if (after_node.get('text') or '') != (target.get('text') or ''):
+                        signals.target_changes.append("text")
+                    before_props, after_props = set(target.get('properties', [])), set(after_node.get('properties', []))
+                    signals.target_changes.extend(f"+{prop}" for prop in STATE_PROPERTIES if prop in after_props - before_props)
+                    signals.target_changes.extend(f"-{prop}" for prop in STATE_PROPERTIES if prop in before_props - after_props)
+
+        # 预期文本
+        signals.expected_texts = extract_expected_texts(action_info.action_expectation)
+        if signals.expected_texts:
+            before_text, after_text = _collect_texts(before_tree), _collect_texts(after_tree)
+            signals.expected_texts_present = [text for text in signals.expected_texts if text in after_text]
+            signals.expected_texts_new = [text for text in signals.expected_texts_present if text not in before_text]
+        return signals
+
+    @staticmethod
+    def judge(signals: PrecheckSignals) -> Optional[PrecheckVerdict]:
+        """由信号给出判断（不考虑置信度阈值）
+
+        Args:
+            signals: 信号
+
+        Returns:
+            Optional[PrecheckVerdict]: 判断结果，没有命中规则时返回None
+        """
+        names = signals.action_names
+        if not names or any(name in UNDECIDABLE_ACTIONS for name in names):
+            return None
+
+        if signals.screen_unchanged and any(name in EFFECTFUL_ACTIONS for name in names):
+            rule = "no_change" if any(name in ("Tap", "LongPress") for name in names) else "no_change_input"
+            return PrecheckVerdict(
+                action_result="D",
+                confidence=RULE_CONFIDENCE[rule],
+                rule=rule,
+                reason=f"The action(s) {names} produced no screen change: the UI hierarchy, keyboard and activity are all identical to before the action.",
+                signals=signals
+            )
+
+        if (signals.expected_texts and signals.diff_size
+                and len(signals.expected_texts_present) == len(signals.expected_texts) and signals.expected_texts_new):
+            page_changed = signals.activity_changed or signals.package_changed
+            rule = "expected_text_appeared_with_page_change" if page_changed else "expected_text_appeared"
+            return PrecheckVerdict(
+                action_result="B",
+                confidence=RULE_CONFIDENCE[rule],
+                rule=rule,
+                reason=f"expected text {signals.expected_texts} is present on the screen after the action",
+                signals=signals
+            )
+        return None
+
+    def evaluate(
+        self,
+        action_info: ActionInfo,
+        screen_before: ScreenInfo,
+        screen_after: ScreenInfo
+    ) -> Optional[PrecheckVerdict]:
+        """计算信号并给出判断
+
+        Args:
+            action_info: 执行的动作信息
+            screen_before: 执行前的屏幕信息
+            screen_after: 执行后的屏幕信息
+
+        Returns:
+            Optional[PrecheckVerdict]: 判断结果，没有命中规则时返回None
+        """
+        try:
+            signals = self.compute_signals(action_info, screen_before, screen_after)
+        except Exception as e:
+            logger.warning(f"预检信号计算失败，退回LMM反思: {e}")
+            return None
+        verdict = self.judge(signals)
+        logger.debug(f"预检信号: {signals.to_dict()}")
+        if verdict is not None:
+            logger.info(f"预检判断: {verdict.action_result}（规则 {verdict.rule}，置信度 {verdict.confidence:.2f}）")
+        return verdict
+
+    def accept(self, verdict: Optional[PrecheckVerdict]) -> bool:
+        """是否直接采用预检结果（跳过LMM）
+
+        Args:
+            verdict: 预检判断
+
+        Returns:
+            bool: 非审计模式且置信度达到阈值时为True
+        """
+        if verdict is None or self.audit_mode or verdict.confidence < self.min_confidence:
+            return False
+        self.rules[verdict.rule] += 1
+        self.llm_calls_saved += 1
+        return True
+
+    def record_audit(self, verdict: Optional[PrecheckVerdict], llm_result: ProgressInfo):
+        """审计模式：记录预检结果与LMM结果的对比
+
+        Args:
+            verdict: 预检判断
+            llm_result: LMM反思结果
+        """
+        if verdict is None:
+            return
+        agreed = llm_result.action_result in AGREEING_LLM_RESULTS.get(verdict.action_result, (verdict.action_result,))
+        self.audits.append({
+            'rule': verdict.rule,
+            'confidence': verdict.confidence,
+            'precheck': verdict.action_result,
+            'llm': llm_result.action_result,
+            'agreed': agreed
+        })
+        if not agreed:
+            logger.warning(f"预检审计不一致: 规则 {verdict.rule} 判断为 {verdict.action_result}，LMM 判断为 {llm_result.action_result}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """统计信息（各规则的采用次数、审计模式下各规则的准确率）"""
+        accuracy = {}
+        for rule in sorted({audit['rule'] for audit in self.audits}):
+            records = [audit for audit in self.audits if audit['rule'] == rule]
+            agreed = sum(1 for audit in records if audit['agreed'])
+            accuracy[rule] = {'total': len(records), 'agreed': agreed, 'accuracy': agreed / len(records)}
+        return {
+            'min_confidence': self.min_confidence,
+            'audit_mode': self.audit_mode,
+            'llm_calls_saved': self.llm_calls_saved,
+            'rules': dict(self.rules),
+            'audit_accuracy': accuracy
+        }
@@ -4,6 +4,9 @@
 
 from Fairy.tools.mobile_controller.ui_automator_tools.mobile_control_tool import UiAutomatorMobileController
 from Fairy.tools.mobile_controller.ui_automator_tools.screen_capture_tool import UiAutomatorMobileScreenCapturer
+from Fairy.tools.mobile_controller.screen_settle_detector import SettleConfig
+from Fairy.tools.mobile_controller.ui_automator_tools.async_device import AsyncDevice
+from Fairy.tools.mobile_controller.ui_automator_tools.screen_settle_sampler import build_settle_detector
 from shared import DeviceManager
 
 
@@ -13,6 +16,10 @@ class SingletonUiAutomatorMobileController(UiAutomatorMobileController):
     def __init__(self, config):
         # 使用单例设备连接
         self.dev = DeviceManager.get_device(config.device)
+        self.adev = AsyncDevice.of(self.dev)
+
+        # 动作后的屏幕稳定检测器（最长2秒）
+        self.settle_detector = build_settle_detector(self.adev, SettleConfig(max_timeout=2.0))
 
         # 初始化日志模板（必需）
         from Fairy.entity.log_template import LogTemplate
@@ -28,6 +35,10 @@ class SingletonUiAutomatorMobileScreenCapturer(UiAutomatorMobileScreenCapturer):
 
         # 使用单例设备连接
         self.dev = DeviceManager.get_device(config.device)
+        self.adev = AsyncDevice.of(self.dev)
+
+        # 截图前的屏幕稳定检测器（最长5秒）
+        self.settle_detector = build_settle_detector(self.adev)
 
         from Fairy.entity.log_template import LogTemplate
         self.log_t = LogTemplate(self, "UiAutomatorScreenCapturer")
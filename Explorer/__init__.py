@@ -14,6 +14,7 @@ from .entities import (
     ExecutionSnapshot
 )
 from .explorer import FairyExplorer
+from .scheduler import MultiDeviceExplorationScheduler, BatchReport
 from .logger import setup_logger, get_logger
 
 __all__ = [
@@ -30,6 +31,8 @@ __all__ = [
 
     # 核心类
     "FairyExplorer",
+    "MultiDeviceExplorationScheduler",
+    "BatchReport",
 
     # 日志
     "setup_logger",
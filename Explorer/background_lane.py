@@ -0,0 +1,77 @@
+"""
+后台任务通道
+
+探索循环的流水线模式中，不在关键路径上的工作（文件落盘、步骤快照记录、计划保存等）
+提交到后台通道，与下一次重新规划的LLM调用并行执行。同一通道内的任务按提交顺序串行执行，
+保证后写的文件可以依赖先写的文件（例如步骤快照复制前先写出原始XML）。
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Callable, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger("BackgroundLane")
+
+
+class BackgroundLane:
+    """按提交顺序串行执行的后台任务通道
+
+    Attributes:
+        name: 通道名称（用于日志）
+        submitted: 已提交任务数
+        busy_time: 后台任务累计耗时（秒）
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.submitted = 0
+        self.busy_time = 0.0
+        self._tail: Optional[asyncio.Task] = None
+        self._errors: List[Exception] = []
+
+    def submit(self, func: Callable, *args, **kwargs) -> asyncio.Task:
+        """提交一个任务，在之前提交的任务完成后执行
+
+        Args:
+            func: 协程函数或普通函数（普通函数在线程中执行，不阻塞事件循环）
+
+        Returns:
+            asyncio.Task: 该任务
+        """
+        previous = self._tail
+
+        async def _run():
+            if previous is not None:
+                await asyncio.gather(previous, return_exceptions=True)
+            t0 = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"[{self.name}] 后台任务失败: {e}")
+                self._errors.append(e)
+            finally:
+                self.busy_time += time.perf_counter() - t0
+
+        self.submitted += 1
+        self._tail = asyncio.create_task(_run())
+        return self._tail
+
+    @property
+    def idle(self) -> bool:
+        return self._tail is None or self._tail.done()
+
+    async def drain(self) -> List[Exception]:
+        """等待所有已提交任务完成
+
+        Returns:
+            List[Exception]: 自上次drain以来后台任务抛出的异常
+        """
+        if self._tail is not None:
+            await self._tail
+        errors, self._errors = self._errors, []
+        return errors
@@ -45,7 +45,14 @@ class ExplorerConfig:
         max_plan_steps: 单次计划的最大步骤数
         replan_on_every_step: 是否每步都重新规划
         replan_interval: 如果不是每步都规划，则每N步重新规划
+        adaptive_replan: 自适应重新规划：上一步成功、状态发生预期变化且无循环时跳过重新规划（优先于 replan_on_every_step/replan_interval）
+        adaptive_replan_max_skips: 自适应模式下最多连续跳过的重新规划次数
         max_exploration_steps: 最大探索步骤数（防止无限循环）
+        pipelined: 流水线模式，文件落盘与步骤记录在后台执行，与下一次重新规划并行
+        reuse_screen_after: 将上一步的执行后屏幕交接给Executor作为执行前屏幕，不重复截图感知
+        state_similarity_threshold: 页面结构相似度达到该阈值时视为同一状态（默认 1.0：只合并骨架完全相同的页面；小于 1.0 时启用模糊合并，骨架不含文本，可能把文本不同的页面合并为同一状态）
+        feature_tree_snapshot_interval: 功能树每隔N步写一次紧凑快照（每步的修改以事件形式追加到日志）
+        replan_prompt_token_budget: Replan提示词的token预算（估算值），超出时按优先级截断历史、功能进度、屏幕文本（0 表示不限制）
     """
     # LLM配置（无默认值）
     llm_model_name: str
@@ -67,7 +74,14 @@ class ExplorerConfig:
     max_plan_steps: int = 20
     replan_on_every_step: bool = True  # 默认每步都重新规划
     replan_interval: int = 1  # 如果不是每步都规划，则间隔
+    adaptive_replan: bool = False  # 自适应重新规划
+    adaptive_replan_max_skips: int = 3  # 最多连续跳过次数
     max_exploration_steps: int = 50  # 防止无限循环
+    pipelined: bool = True  # 非关键路径的落盘工作在后台执行
+    reuse_screen_after: bool = True  # 上一步的screen_after交接为下一步的screen_before
+    state_similarity_threshold: float = 1.0  # 结构指纹的估计Jaccard相似度阈值（1.0 为精确匹配）
+    feature_tree_snapshot_interval: int = 20  # 功能树快照间隔（步数）
+    replan_prompt_token_budget: int = 16000  # Replan提示词token预算
 
     @classmethod
     def from_env(cls) -> "ExplorerConfig":
@@ -121,7 +135,14 @@ class ExplorerConfig:
             max_plan_steps=int(os.getenv("EXPLORER_MAX_PLAN_STEPS", "20")),
             replan_on_every_step=os.getenv("EXPLORER_REPLAN_ON_EVERY_STEP", "true").lower() == "true",
             replan_interval=int(os.getenv("EXPLORER_REPLAN_INTERVAL", "1")),
-            max_exploration_steps=int(os.getenv("EXPLORER_MAX_EXPLORATION_STEPS", "50"))
+            adaptive_replan=os.getenv("EXPLORER_ADAPTIVE_REPLAN", "false").lower() == "true",
+            adaptive_replan_max_skips=int(os.getenv("EXPLORER_ADAPTIVE_REPLAN_MAX_SKIPS", "3")),
+            max_exploration_steps=int(os.getenv("EXPLORER_MAX_EXPLORATION_STEPS", "50")),
+            pipelined=os.getenv("EXPLORER_PIPELINED", "true").lower() == "true",
+            reuse_screen_after=os.getenv("EXPLORER_REUSE_SCREEN_AFTER", "true").lower() == "true",
+            state_similarity_threshold=float(os.getenv("EXPLORER_STATE_SIMILARITY_THRESHOLD", "1.0")),
+            feature_tree_snapshot_interval=int(os.getenv("EXPLORER_FEATURE_TREE_SNAPSHOT_INTERVAL", "20")),
+            replan_prompt_token_budget=int(os.getenv("EXPLORER_REPLAN_PROMPT_TOKEN_BUDGET", "16000"))
         )
 
     def __str__(self) -> str:
@@ -134,5 +155,7 @@ class ExplorerConfig:
             f"  Device ID: {self.device_id or 'Auto-detect'}\n"
             f"  Output Dir: {self.output_dir}\n"
             f"  Replan on Every Step: {self.replan_on_every_step}\n"
-            f"  Max Exploration Steps: {self.max_exploration_steps}"
+            f"  Adaptive Replan: {self.adaptive_replan}\n"
+            f"  Max Exploration Steps: {self.max_exploration_steps}\n"
+            f"  Pipelined: {self.pipelined}"
         )
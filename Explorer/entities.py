@@ -4,8 +4,11 @@ Explorer 数据实体定义
 定义Explorer的输入、输出、状态等所有数据结构
 """
 
+from collections import deque
 from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Deque
+import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
 import json
@@ -144,9 +147,156 @@ class PerceptionOutput:
     immediate_compressed_txt_path: Optional[str] = None
     immediate_som_mapping_path: Optional[str] = None
 
+    # 产物名（去掉 _path 后缀的字段名）
+    ARTIFACTS = (
+        'screenshot', 'marked_screenshot', 'xml', 'compressed_xml', 'compressed_txt', 'som_mapping',
+        'immediate_screenshot', 'immediate_marked_screenshot', 'immediate_xml',
+        'immediate_compressed_xml', 'immediate_compressed_txt', 'immediate_som_mapping'
+    )
+
+    def __post_init__(self):
+        # ⭐ 内存中的产物：{产物名: (文件名, 内容)}
+        # 内容为 str / bytes / JSON对象 / PIL图像，或已有自己落盘任务的截图对象（ScreenFileInfo）
+        self._artifacts: Dict[str, tuple] = {}
+        self._written = set()  # 已写出的文件路径（写一次）
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_artifacts(cls, timestamp: str, screen_size: tuple, artifacts: Dict[str, tuple]) -> "PerceptionOutput":
+        """由内存中的产物构建（不写文件，路径在 bind/materialize 时确定）
+
+        Args:
+            timestamp: 时间戳
+            screen_size: 屏幕尺寸 (width, height)
+            artifacts: {产物名: (文件名, 内容)}；内容为 None 的产物视为不存在
+
+        Returns:
+            PerceptionOutput: 路径字段为空、内容在内存中的感知输出
+        """
+        output = cls(
+            screenshot_path=None, marked_screenshot_path=None, xml_path=None,
+            compressed_xml_path=None, compressed_txt_path=None, som_mapping_path=None,
+            timestamp=timestamp, screen_size=screen_size
+        )
+        for name, (filename, content) in artifacts.items():
+            if content is not None:
+                output._artifacts[name] = (filename, content)
+        return output
+
+    def is_in_memory(self, name: str) -> bool:
+        """产物是否由内存内容提供（写出后仍为True）"""
+        return name in self._artifacts
+
+    def has_artifact(self, name: str) -> bool:
+        """产物是否存在（内存中或磁盘上）"""
+        return name in self._artifacts or getattr(self, f"{name}_path") is not None
+
+    def read_text(self, name: str) -> Optional[str]:
+        """读取文本产物，优先使用内存中的内容，不存在时从磁盘读取
+
+        Args:
+            name: 产物名，如 'compressed_txt'
+
+        Returns:
+            文本内容，产物不存在时返回None
+        """
+        if name in self._artifacts:
+            content = self._artifacts[name][1]
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        path = getattr(self, f"{name}_path")
+        if path is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def get_image(self, name: str):
+        """获取图像产物（PIL图像），优先使用内存中的图像
+
+        Args:
+            name: 产物名，如 'marked_screenshot'
+
+        Returns:
+            PIL.Image.Image，产物不存在时返回None
+        """
+        if name in self._artifacts:
+            content = self._artifacts[name][1]
+            if hasattr(content, 'get_screenshot_PILImage_file'):
+                return content.get_screenshot_PILImage_file()
+            return content
+        path = getattr(self, f"{name}_path")
+        if path is None:
+            return None
+        from PIL import Image
+        return Image.open(path)
+
+    def bind(self, output_dir: Path, immediate_output_dir: Optional[Path] = None):
+        """为尚未写出的内存产物指定最终路径（只设置路径，不写文件）
+
+        Args:
+            output_dir: stable 产物目录
+            immediate_output_dir: immediate 产物目录，默认与 output_dir 相同
+        """
+        immediate_output_dir = immediate_output_dir or output_dir
+        for name, (filename, _) in self._artifacts.items():
+            if getattr(self, f"{name}_path") is None:
+                target_dir = immediate_output_dir if name.startswith('immediate_') else output_dir
+                setattr(self, f"{name}_path", str(Path(target_dir) / filename))
+
+    def materialize(self, output_dir: Optional[Path] = None, immediate_output_dir: Optional[Path] = None,
+                    blob_store=None):
+        """将内存产物写到各自的路径（每个文件只写一次，可重复调用，线程安全）
+
+        Args:
+            output_dir: 尚未 bind 的产物写到该目录（可选）
+            immediate_output_dir: 尚未 bind 的 immediate 产物写到该目录（可选）
+            blob_store: 内容寻址存储（shared.BlobStore，可选），文本/二进制/截图产物以 blob 硬链接的方式写出
+        """
+        with self._lock:
+            if output_dir is not None:
+                self.bind(output_dir, immediate_output_dir)
+            for name, (_, content) in self._artifacts.items():
+                path = getattr(self, f"{name}_path")
+                if path is None or path in self._written:
+                    continue
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                if blob_store is not None and isinstance(content, (str, bytes)):
+                    blob_store.store_bytes(content, path)
+                elif isinstance(content, str):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                elif isinstance(content, bytes):
+                    with open(path, 'wb') as f:
+                        f.write(content)
+                elif hasattr(content, 'ensure_persisted'):
+                    # 截图已由其所有者编码落盘，等待写完后复制（或链接到 blob）
+                    src_path = content.ensure_persisted()
+                    if Path(src_path).resolve() != Path(path).resolve():
+                        if blob_store is not None:
+                            blob_store.store_file(src_path, path)
+                        else:
+                            shutil.copy2(src_path, path)
+                elif hasattr(content, 'save'):
+                    content.save(path)
+                else:
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(content, f, indent=2)
+                self._written.add(path)
+
+    @property
+    def materialized(self) -> bool:
+        """所有内存产物是否都已写出"""
+        return all(getattr(self, f"{name}_path") in self._written for name in self._artifacts)
+
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PerceptionOutput":
+        """由 to_dict() 的结果还原（只还原路径，不含内存产物）"""
+        kwargs = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        kwargs['screen_size'] = tuple(kwargs['screen_size']) if kwargs.get('screen_size') else kwargs.get('screen_size')
+        return cls(**kwargs)
+
 
 @dataclass
 class ExecutionSnapshot:
@@ -262,6 +412,10 @@ class PathStep:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PathStep":
+        return cls(**data)
+
 
 @dataclass
 class PageState:
@@ -334,6 +488,10 @@ class FeatureNode:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureNode":
+        return cls(**data)
+
 
 @dataclass
 class FeatureTree:
@@ -347,13 +505,104 @@ class FeatureTree:
         states: 状态ID到PageState的映射
         steps: 步骤ID到PathStep的映射（去重存储）
         state_transitions: 状态转换记录 [(from_state_id, to_state_id, step_id)]
+        adjacency: 邻接表 {from_state_id: {to_state_id: 转换次数}}（索引，不序列化）
+        visit_counts: 状态访问次数 {state_id: 作为转换目标的次数}（索引，不序列化）
+        state_steps: 到达各状态的步骤 {state_id: [step_id, ...]}（索引，不序列化）
+        feature_name_index: 功能名称索引 {feature_name: [feature_id, ...]}（索引，不序列化）
+        recent_states: 最近到达的状态ID滑动窗口（索引，不序列化）
+        feature_revision: 功能节点修改计数（用于判断功能相关的渲染结果是否需要更新，不序列化）
+
+    ⭐ 索引由 record_transition/index_feature 增量维护，replan 构建提示词时只需 O(窗口) 的查询；
+    直接修改 features/state_transitions 后（如从文件加载）需调用 rebuild_indices()。
     """
+    RECENT_WINDOW = 10
+
     root_feature_id: str
     features: Dict[str, FeatureNode] = field(default_factory=dict)
     states: Dict[str, PageState] = field(default_factory=dict)
     steps: Dict[str, PathStep] = field(default_factory=dict)  # ⭐ 新增：集中存储所有steps
     state_transitions: List[tuple] = field(default_factory=list)
 
+    # ⭐ 增量维护的索引
+    adjacency: Dict[str, Dict[str, int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    visit_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    state_steps: Dict[str, List[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    feature_name_index: Dict[str, List[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    recent_states: Deque[str] = field(default_factory=lambda: deque(maxlen=FeatureTree.RECENT_WINDOW),
+                                      init=False, repr=False, compare=False)
+    feature_revision: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.rebuild_indices()
+
+    # ==================== 索引维护 ====================
+
+    def rebuild_indices(self):
+        """根据 features 和 state_transitions 全量重建索引"""
+        self.adjacency.clear()
+        self.visit_counts.clear()
+        self.state_steps.clear()
+        self.feature_name_index.clear()
+        self.recent_states.clear()
+        for feature_id in self.features:
+            self.index_feature(feature_id)
+        for from_state_id, to_state_id, step_id in self.state_transitions:
+            self._index_transition(from_state_id, to_state_id, step_id)
+
+    def _index_transition(self, from_state_id: str, to_state_id: str, step_id: str):
+        targets = self.adjacency.setdefault(from_state_id, {})
+        targets[to_state_id] = targets.get(to_state_id, 0) + 1
+        self.visit_counts[to_state_id] = self.visit_counts.get(to_state_id, 0) + 1
+        self.state_steps.setdefault(to_state_id, []).append(step_id)
+        self.recent_states.append(to_state_id)
+
+    def record_transition(self, from_state_id: str, to_state_id: str, step_id: str):
+        """记录一次状态转换并更新索引
+
+        Args:
+            from_state_id: 起始状态ID
+            to_state_id: 目标状态ID
+            step_id: 触发转换的步骤ID
+        """
+        self.state_transitions.append((from_state_id, to_state_id, step_id))
+        self._index_transition(from_state_id, to_state_id, step_id)
+
+    def index_feature(self, feature_id: str):
+        """将功能节点加入名称索引（节点需已在 features 中）"""
+        feature_ids = self.feature_name_index.setdefault(self.features[feature_id].feature_name, [])
+        if feature_id not in feature_ids:
+            feature_ids.append(feature_id)
+        self.touch_features()
+
+    def touch_features(self):
+        """功能节点内容被修改（归属状态、完成状态等）后调用"""
+        self.feature_revision += 1
+
+    def rename_feature(self, feature_id: str, new_name: str):
+        """重命名功能节点并更新名称索引"""
+        feature = self.features[feature_id]
+        feature_ids = self.feature_name_index.get(feature.feature_name, [])
+        if feature_id in feature_ids:
+            feature_ids.remove(feature_id)
+            if not feature_ids:
+                del self.feature_name_index[feature.feature_name]
+        feature.feature_name = new_name
+        self.index_feature(feature_id)
+
+    def find_feature_id(self, feature_name: str) -> Optional[str]:
+        """按名称查找功能ID（同名时返回最早加入的），不存在时返回None"""
+        feature_ids = self.feature_name_index.get(feature_name)
+        return feature_ids[0] if feature_ids else None
+
+    def get_visit_count(self, state_id: str) -> int:
+        """状态作为转换目标的次数"""
+        return self.visit_counts.get(state_id, 0)
+
+    def get_recent_states(self, limit: Optional[int] = None) -> List[str]:
+        """最近到达的状态ID（按时间顺序，最多 RECENT_WINDOW 个）"""
+        recent = list(self.recent_states)
+        return recent[-limit:] if limit else recent
+
     def to_dict(self) -> Dict[str, Any]:
         """序列化为字典（完整版，包含所有step详情）"""
         return {
@@ -420,6 +669,36 @@ class FeatureTree:
             ]
         }
 
+    @classmethod
+    def from_dict_compressed(cls, data: Dict[str, Any]) -> "FeatureTree":
+        """由压缩版字典（to_dict_compressed() 的结果）还原功能树
+
+        Args:
+            data: 压缩版字典，states 中 path_from_root 为 step_id 列表
+
+        Returns:
+            FeatureTree: 还原后的功能树（索引已重建）
+        """
+        steps = {step_id: PathStep.from_dict(step) for step_id, step in data.get('steps', {}).items()}
+        states = {}
+        for sid, state in data.get('states', {}).items():
+            states[sid] = PageState(
+                state_id=state['state_id'],
+                state_name=state['state_name'],
+                activity_name=state['activity_name'],
+                perception_output=PerceptionOutput.from_dict(state['perception_output']),
+                path_from_root=[steps[step_id] for step_id in state['path_from_root'] if step_id in steps],
+                discovered_at=state['discovered_at'],
+                reachable_states=list(state.get('reachable_states', []))
+            )
+        return cls(
+            root_feature_id=data['root_feature_id'],
+            features={fid: FeatureNode.from_dict(f) for fid, f in data.get('features', {}).items()},
+            states=states,
+            steps=steps,
+            state_transitions=[(t['from'], t['to'], t['step']) for t in data.get('state_transitions', [])]
+        )
+
     def save_to_file(self, filepath: Path):
         """保存功能树到文件（完整版）"""
         filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -4,9 +4,12 @@ Explorer 核心模块
 协调Planner、Perceptor、Executor和StateTracker，实现完整的探索流程
 """
 
+import asyncio
 import time
 import signal
 import atexit
+import inspect
+import json
 from datetime import datetime
 from pathlib import Path
 
@@ -16,6 +19,7 @@ from Fairy.config.model_config import ModelConfig
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from Executor import ExecutorConfig, FairyExecutor
+from shared import BlobStore
 
 from .config import ExplorerConfig
 from .entities import ExplorationTarget, ExplorationPlan, ExplorationResult, ExplorationStep
@@ -24,6 +28,9 @@ from .perception_wrapper import PerceptionWrapper
 from .state_tracker import StateTracker
 from .state_identifier import StateIdentifier  # ⭐ 新增
 from .feature_tree_builder import FeatureTreeBuilder  # ⭐ 新增
+from .feature_tree_journal import FeatureTreeJournal
+from .replan_policy import AdaptiveReplanPolicy
+from .background_lane import BackgroundLane
 from .logger import get_logger
 
 logger = get_logger("FairyExplorer")
@@ -32,26 +39,40 @@ logger = get_logger("FairyExplorer")
 class FairyExplorer:
     """Fairy功能探索器"""
 
-    def __init__(self, config: ExplorerConfig):
+    def __init__(self, config: ExplorerConfig, session_name: str = None, register_signal_handlers: bool = True):
+        """
+        Args:
+            config: Explorer配置
+            session_name: 会话目录名，默认使用时间戳（多设备并行时由调度器指定，避免目录冲突）
+            register_signal_handlers: 是否注册中断信号处理器（多设备并行时由调度器统一处理）
+        """
         self.config = config
         logger.info("初始化 FairyExplorer...")
 
         # 创建会话目录
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        session_id = session_name or datetime.now().strftime("%Y%m%d_%H%M%S")
         self.session_dir = config.output_dir / session_id
         self.session_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"会话目录: {self.session_dir}")
 
         # ⭐ 初始化StateIdentifier和FeatureTreeBuilder（延迟到explore()）
-        self.state_identifier = StateIdentifier()
+        self.state_identifier = StateIdentifier(similarity_threshold=config.state_similarity_threshold)
         self.feature_tree_builder = None  # 初始计划后创建
+        self.feature_tree_journal = None  # ⭐ 功能树事件日志，与构建器一起创建
         self.current_feature_path = []  # 当前功能路径
 
         # 初始化Executor
         executor_config = ExecutorConfig.from_env()
         # ⭐ 指定Executor输出到当前session目录的executor_outputs子目录
         executor_config.output.output_dir = self.session_dir / "executor_outputs"
-        self.executor = FairyExecutor(executor_config, use_session_subdir=False)
+        # ⭐ Explorer指定了设备时，Executor驱动同一台设备，临时截图按设备隔离
+        if config.device_id:
+            executor_config.device.device_id = config.device_id
+            executor_config.device.temp_path = str(Path(executor_config.device.temp_path) / config.device_id)
+            Path(executor_config.device.temp_path).mkdir(parents=True, exist_ok=True)
+        # ⭐ 会话级内容寻址存储：Executor输出与步骤目录中的相同产物只存一份（硬链接引用）
+        self.blob_store = BlobStore(self.session_dir / "blobs")
+        self.executor = FairyExecutor(executor_config, use_session_subdir=False, blob_store=self.blob_store)
         logger.info("Executor已初始化")
 
         # 初始化Perceptor
@@ -75,28 +96,45 @@ class FairyExplorer:
         logger.info("Planner已初始化")
 
         # 初始化StateTracker
-        self.state_tracker = StateTracker(self.session_dir)
+        self.state_tracker = StateTracker(self.session_dir, blob_store=self.blob_store)
         logger.info("StateTracker已初始化")
 
+        # ⭐ 流水线模式：非关键路径的落盘工作在后台通道中按顺序执行
+        self.persist_lane = BackgroundLane("ExplorerPersist")
+
+        # ⭐ 自适应重新规划策略（计划在正轨上时跳过重新规划）
+        self.replan_policy = AdaptiveReplanPolicy(config.adaptive_replan_max_skips) if config.adaptive_replan else None
+
         # ⭐ 注册信号处理器（捕获Ctrl+C等中断信号）
-        self._register_signal_handlers()
+        if register_signal_handlers:
+            self._register_signal_handlers()
 
         # ⭐ 注册程序退出时的清理函数
         atexit.register(self._cleanup_on_exit)
 
         logger.success("FairyExplorer初始化完成")
 
-    def _save_feature_tree(self, reason="程序中断"):
+    def _save_feature_tree(self, reason="程序中断", full=True):
         """保存功能状态树（支持中途保存）
 
+        功能树的修改每步都已追加到事件日志；中断时只需刷盘（O(步)），完整的 feature_tree.json
+        可以之后由 feature_tree_journal.export_feature_tree() 重新生成
+
         Args:
             reason: 保存原因，用于日志记录
+            full: 是否同时导出完整版/压缩版功能树和更新日志（O(树)）
         """
         if self.feature_tree_builder is None:
             logger.warning(f"功能树未初始化，跳过保存（原因: {reason}）")
             return
 
         try:
+            if self.feature_tree_journal is not None:
+                self.feature_tree_journal.flush()
+                if not full:
+                    logger.success(f"✓ 功能树事件日志已刷盘（原因: {reason}）: {self.feature_tree_journal.events_path}")
+                    return
+
             tree_path = self.session_dir / "feature_tree.json"
             updates_path = self.session_dir / "feature_updates.json"
 
@@ -121,8 +159,8 @@ class FairyExplorer:
             logger.warning(f"收到信号 {signal_name}，正在保存数据...")
             logger.warning(f"{'=' * 60}")
 
-            # 保存功能树
-            self._save_feature_tree(reason=f"收到{signal_name}信号")
+            # 保存功能树（只刷盘事件日志）
+            self._save_feature_tree(reason=f"收到{signal_name}信号", full=False)
 
             # 保存当前状态
             if hasattr(self, 'state_tracker'):
@@ -168,15 +206,23 @@ class FairyExplorer:
                 target_app=target.app_package
             )
             logger.success("初始屏幕捕获完成")
+            # ⭐ 初始感知产物写到采集目录（不在关键路径上）
+            initial_perception.bind(Path(initial_perception.screenshot_path).parent)
+            await self._persist(initial_perception.materialize, blob_store=self.blob_store)
 
             current_plan = await self.planner.create_initial_plan(target, initial_perception)
             logger.success(f"初始计划生成完成，共 {len(current_plan.steps)} 个步骤")
-            current_plan.save_to_file(self.session_dir / "initial_plan.json")
+            await self._persist(self._write_json, self.session_dir / "initial_plan.json", current_plan.to_dict())
 
-            # ⭐ 初始化功能树构建器
+            # ⭐ 初始化功能树构建器（修改以事件形式追加到日志）
+            self.feature_tree_journal = FeatureTreeJournal(
+                self.session_dir,
+                snapshot_interval=self.config.feature_tree_snapshot_interval
+            )
             self.feature_tree_builder = FeatureTreeBuilder(
                 root_feature_name=target.feature_to_explore,
-                root_feature_description=f"探索{target.app_name}的{target.feature_to_explore}功能"
+                root_feature_description=f"探索{target.app_name}的{target.feature_to_explore}功能",
+                journal=self.feature_tree_journal
             )
 
             # ⭐ 从初始计划中提取功能结构
@@ -196,6 +242,8 @@ class FairyExplorer:
 
             total_steps_executed = 0
             failed_steps = 0
+            previous_screen_after = None  # ⭐ 上一步Executor执行后的屏幕，交接给下一步作为screen_before
+            plan_source = "initial_plan"  # 当前计划的来源（跳过重新规划时沿用上一次的计划）
 
             while total_steps_executed < self.config.max_exploration_steps:
                 next_step = self.planner.get_next_step(current_plan)
@@ -211,10 +259,9 @@ class FairyExplorer:
 
                 next_step.status = "executing"
 
-                current_perception = await self.perceptor.capture_and_perceive(
-                    non_visual_mode=False,
-                    target_app=target.app_package
-                )
+                # ⭐ 不再在执行前单独捕获屏幕：Executor内部会获取执行前屏幕，
+                # 有上一步的screen_after时直接交接给Executor，省去一次截图+感知+稳定等待
+                handoff_screen = previous_screen_after if self.config.reuse_screen_after else None
 
                 executor_result = await self.executor.execute(
                     instruction=next_step.instruction,
@@ -223,8 +270,10 @@ class FairyExplorer:
                         "current_sub_goal": next_step.sub_goal
                     },
                     enable_reflection=next_step.enable_reflection,
-                    max_iterations=next_step.max_iterations
+                    max_iterations=next_step.max_iterations,
+                    screen_before=handoff_screen
                 )
+                previous_screen_after = executor_result.screen_after
 
                 executor_result_dict = executor_result.to_dict()
 
@@ -233,16 +282,25 @@ class FairyExplorer:
                     logger.info("将Executor执行后的双截图转换为PerceptionOutput...")
                     after_perception = await self._convert_screen_info_to_perception(executor_result.screen_after)
                 else:
-                    logger.warning("Executor未返回screen_after，使用执行前的perception")
-                    after_perception = current_perception
+                    logger.warning("Executor未返回screen_after，重新捕获当前屏幕")
+                    after_perception = await self.perceptor.capture_and_perceive(
+                        non_visual_mode=False,
+                        target_app=target.app_package
+                    )
 
-                snapshot = await self.state_tracker.record_step(
+                # ⭐ 感知产物的最终路径直接定在步骤目录中；步骤快照（文件写出）不在关键路径上，流水线模式下在后台记录
+                step_output_dir = str(self.state_tracker.bind_step_outputs(next_step.step_id, after_perception))
+                await self._persist(
+                    self.state_tracker.record_step,
                     step=next_step,
                     perception_output=after_perception,  # ⭐ 使用执行后的perception（含双截图）
-                    executor_result=executor_result_dict
+                    executor_result=executor_result_dict,
+                    navigation_path=self.state_tracker.get_current_path()
                 )
 
                 # ⭐ 识别和记录State到功能树
+                previous_state_id = self.feature_tree_builder.previous_state_id if self.feature_tree_builder else None
+                state_id = None
                 if executor_result.screen_after and self.feature_tree_builder:
                     state_id = self.state_identifier.identify_state(
                         executor_result.screen_after,
@@ -273,7 +331,6 @@ class FairyExplorer:
                     logger.success(f"步骤 {next_step.step_id} 执行成功")
 
                     # ⭐ 记录实际执行的步骤（成功）
-                    plan_source = "initial_plan" if total_steps_executed == 1 else f"replan_after_step_{total_steps_executed - 1}"
                     self.state_tracker.record_executed_step(
                         step=next_step,
                         plan_source=plan_source,
@@ -289,29 +346,28 @@ class FairyExplorer:
                     logger.error(f"步骤 {next_step.step_id} 执行失败")
 
                     # ⭐ 记录实际执行的步骤（失败）
-                    plan_source = "initial_plan" if total_steps_executed == 1 else f"replan_after_step_{total_steps_executed - 1}"
                     self.state_tracker.record_executed_step(
                         step=next_step,
                         plan_source=plan_source,
                         result_status="failed"
                     )
 
-                if self._should_replan(total_steps_executed, next_step, executor_result_dict):
+                should_replan = self._should_replan(
+                    total_steps_executed, next_step, executor_result_dict,
+                    plan=current_plan,
+                    previous_state_id=previous_state_id,
+                    current_state_id=state_id,
+                    target_package=target.app_package,
+                    current_package=(executor_result.screen_after.current_activity_info.package_name
+                                     if executor_result.screen_after else None)
+                )
+                if should_replan:
                     logger.info("触发重新规划...")
 
                     # 使用Executor执行后的屏幕信息进行重新规划
-                    # Executor已经在执行后立刻捕获了屏幕，包括短暂的toast等提示
-                    if executor_result.screen_after:
-                        logger.info("使用Executor执行后的屏幕信息进行重新规划...")
-                        # 从ScreenInfo转换为PerceptionOutput
-                        replan_perception = await self._convert_screen_info_to_perception(executor_result.screen_after)
-                    else:
-                        # 兜底：如果Executor没有返回执行后屏幕，重新捕获
-                        logger.warning("Executor未返回执行后屏幕，重新捕获...")
-                        replan_perception = await self.perceptor.capture_and_perceive(
-                            non_visual_mode=False,
-                            target_app=target.app_package
-                        )
+                    # Executor已经在执行后立刻捕获了屏幕，包括短暂的toast等提示；
+                    # 复用上面已转换得到的PerceptionOutput（Executor未返回时上面已重新捕获）
+                    replan_perception = after_perception
 
                     current_plan = await self.planner.replan(
                         target,
@@ -323,10 +379,11 @@ class FairyExplorer:
                         # ⭐ 新增参数：传递功能树和最近状态序列
                         feature_tree=self.feature_tree_builder.tree if self.feature_tree_builder else None,
                         recent_state_sequence=self._get_recent_state_sequence(),
-                        step_output_dir=snapshot.step_output_dir  # ⭐ 传递step输出目录
+                        step_output_dir=step_output_dir  # ⭐ 传递step输出目录
                     )
                     logger.success(f"重新规划完成，新计划包含 {len(current_plan.steps)} 个步骤")
-                    current_plan.save_to_file(self.session_dir / f"plan_after_step_{next_step.step_id}.json")
+                    plan_source = f"replan_after_step_{total_steps_executed}"
+                    await self._persist(self._write_json, self.session_dir / f"plan_after_step_{next_step.step_id}.json", current_plan.to_dict())
 
                     # ⭐ 检查是否有功能结构更新
                     if current_plan.feature_update and self.feature_tree_builder:
@@ -355,19 +412,36 @@ class FairyExplorer:
 
                             self.current_feature_path = new_feature_path
                             logger.info(f"当前功能路径: {' -> '.join(self.current_feature_path)}")
+                else:
+                    # ⭐ 沿用当前计划，下一步直接执行计划中的下一个待执行步骤
+                    current_plan.completed_steps.append(next_step.step_id)
+
+                # ⭐ 本步对功能树的修改刷盘（定期写快照）
+                self.feature_tree_journal.commit_step(self.feature_tree_builder)
 
             # 阶段3: 结束
             logger.info("=" * 60)
             logger.info("阶段3: 探索完成")
             logger.info("=" * 60)
 
+            # ⭐ 等待后台落盘完成（执行历史依赖所有步骤快照）
+            await self._drain_persist_lane()
+
             self.state_tracker.save_navigation_path()
             # ⭐ 保存实际执行计划
             self.state_tracker.save_executed_plan()
             current_plan.save_to_file(self.session_dir / "final_plan.json")
 
+            # ⭐ 自适应重新规划统计
+            if self.replan_policy:
+                stats = self.replan_policy.get_stats()
+                self._write_json(self.session_dir / "replan_policy_stats.json", stats)
+                logger.info(f"自适应重新规划: {stats['replans']} 次重新规划, 节省 {stats['llm_calls_saved']} 次LLM调用, 原因分布: {stats['reasons']}")
+
             # ⭐ 保存功能树和更新日志
             self._save_feature_tree(reason="正常完成")
+            self.feature_tree_journal.snapshot(self.feature_tree_builder)
+            self.feature_tree_journal.close()
 
             total_time = time.time() - start_time
             completed_steps = len([s for s in current_plan.steps if s.status == "completed"])
@@ -399,7 +473,8 @@ class FairyExplorer:
             import traceback
             logger.error(traceback.format_exc())
 
-            # ⭐ 异常情况下也保存功能树
+            # ⭐ 异常情况下也保存功能树，并等待已提交的后台落盘完成
+            await self._drain_persist_lane()
             self._save_feature_tree(reason=f"异常退出: {type(e).__name__}")
 
             total_time = time.time() - start_time
@@ -419,6 +494,39 @@ class FairyExplorer:
             result.save_to_file(self.session_dir / "exploration_result.json")
             return result
 
+    async def _persist(self, func, *args, **kwargs):
+        """执行落盘类工作：流水线模式下提交到后台通道，否则立即执行
+
+        Args:
+            func: 协程函数或普通函数
+        """
+        if self.config.pipelined:
+            self.persist_lane.submit(func, *args, **kwargs)
+        elif inspect.iscoroutinefunction(func):
+            await func(*args, **kwargs)
+        else:
+            func(*args, **kwargs)
+
+    async def _drain_persist_lane(self):
+        """等待后台通道中的落盘工作全部完成"""
+        errors = await self.persist_lane.drain()
+        if self.persist_lane.submitted:
+            logger.info(f"后台落盘完成: {self.persist_lane.submitted} 个任务, 累计耗时 {self.persist_lane.busy_time:.2f}s（与规划并行）")
+        for error in errors:
+            logger.error(f"后台落盘失败: {error}")
+        # Executor 的输出产物也在后台写入，一并等待
+        await asyncio.to_thread(self.executor.flush_outputs)
+        # ⭐ 产物都已写出，保存 blob 引用清单
+        self.blob_store.save_manifest()
+        stats = self.blob_store.get_stats()
+        logger.info(f"产物存储: {stats['blobs']} 个blob, {stats['references']} 个引用, 去重 {stats['dedup_hits']} 次, 节省 {stats['bytes_saved'] / 1024:.1f}KB")
+
+    @staticmethod
+    def _write_json(path: Path, data, indent: int = 2):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+
     def _get_recent_state_sequence(self):
         """获取最近10个状态ID序列
 
@@ -428,19 +536,25 @@ class FairyExplorer:
         if not self.feature_tree_builder:
             return []
 
-        # 从feature_tree的state_transitions中提取最近10个状态ID
-        # state_transitions的格式是: (from_state_id, to_state_id, step_id)
-        transitions = self.feature_tree_builder.tree.state_transitions
-        if not transitions:
-            return []
+        # ⭐ 功能树增量维护最近到达的状态窗口（即最近10次转换的 to_state_id）
+        return self.feature_tree_builder.tree.get_recent_states(10)
 
-        recent_transitions = transitions[-10:] if len(transitions) >= 10 else transitions
-        # trans是tuple: (from_state_id, to_state_id, step_id)
-        # trans[1] 是 to_state_id
-        return [trans[1] for trans in recent_transitions]
+    def _should_replan(self, steps_executed: int, last_step: ExplorationStep, last_result: dict,
+                       plan: ExplorationPlan = None, previous_state_id=None, current_state_id=None,
+                       target_package=None, current_package=None) -> bool:
+        """判断是否需要重新规划
 
-    def _should_replan(self, steps_executed: int, last_step: ExplorationStep, last_result: dict) -> bool:
-        """判断是否需要重新规划"""
+        启用自适应策略时由本地进度信号决定（见 replan_policy），否则每步或每隔N步重新规划
+        """
+        if self.replan_policy and plan is not None:
+            return self.replan_policy.decide(
+                plan, last_step, last_result,
+                previous_state_id=previous_state_id,
+                current_state_id=current_state_id,
+                recent_states=self._get_recent_state_sequence(),
+                target_package=target_package,
+                current_package=current_package
+            ).replan
         if self.config.replan_on_every_step:
             return True
         else:
@@ -449,105 +563,69 @@ class FairyExplorer:
     async def _convert_screen_info_to_perception(self, screen_info) -> "PerceptionOutput":
         """将Fairy的ScreenInfo转换为Explorer的PerceptionOutput
 
+        所有产物（截图、XML、压缩XML/TXT、SoM映射）保留在内存中，不写临时文件；
+        Planner和StateIdentifier直接读取内存内容，StateTracker.record_step 时一次性写入步骤目录
+
         Args:
             screen_info: Fairy的ScreenInfo对象
 
         Returns:
-            PerceptionOutput对象
+            PerceptionOutput对象（内存产物）
         """
         from .entities import PerceptionOutput
         from Perceptor.tools import XMLCompressor
-        import os
-        import json
 
-        # 获取截图路径（稳定截图，5秒）
-        screenshot_path = screen_info.screenshot_file_info.get_screenshot_fullpath()
-        marked_screenshot_path = screenshot_path  # SoM标记后的图也是同一个文件
+        # 截图由Executor负责编码落盘，这里只引用（稳定截图，5秒）；SoM标记后的图也是同一张
+        screenshot_file_info = screen_info.screenshot_file_info
+        screenshot_filename = screenshot_file_info.get_screenshot_filename()
 
         # 获取UI XML字符串（从perception_infos.infos[0]获取）
         ui_xml_str = screen_info.perception_infos.infos[0]
         timestamp = screen_info.screenshot_file_info.file_build_timestamp
 
-        # 创建临时目录保存XML和压缩文件
-        temp_dir = Path(screenshot_path).parent
-        xml_path = temp_dir / f"ui_dump_{timestamp}.xml"
-
-        # 保存原始XML（稳定截图）
-        with open(xml_path, 'w', encoding='utf-8') as f:
-            f.write(ui_xml_str)
-
-        # 压缩XML（稳定截图）
-        compressor = XMLCompressor(output_dir=str(temp_dir))
-        compressed_xml_path, compressed_txt_path = await compressor.compress_xml(
-            ui_xml=ui_xml_str, timestamp=timestamp
-        )
+        # 在内存中压缩XML（稳定截图）；⭐ 复用SSIP感知时的解析结果，不再重新解析XML
+        compressor = XMLCompressor()
+        hierarchy = getattr(screen_info.perception_infos, 'hierarchy', None) or ui_xml_str
+        compressed_xml, compressed_txt = await asyncio.to_thread(compressor.compress_xml_in_memory, hierarchy)
 
-        # 保存SoM映射
-        som_mapping_path = temp_dir / f"som_mapping_{timestamp}.json"
-        with open(som_mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(screen_info.perception_infos.SoM_mapping, f, indent=2)
-
-        # 获取屏幕尺寸
-        screen_size = (
-            screen_info.perception_infos.width,
-            screen_info.perception_infos.height
-        )
-
-        # ⭐ 检查是否有立刻截图（0.2秒）及其完整信息
-        immediate_screenshot_path = None
-        immediate_marked_screenshot_path = None
-        immediate_xml_path = None
-        immediate_compressed_xml_path = None
-        immediate_compressed_txt_path = None
-        immediate_som_mapping_path = None
+        artifacts = {
+            'screenshot': (screenshot_filename, screenshot_file_info),
+            'marked_screenshot': (screenshot_filename, screenshot_file_info),
+            'xml': (f"ui_dump_{timestamp}.xml", ui_xml_str),
+            'compressed_xml': (f"compressed_{timestamp}.xml", compressed_xml),
+            'compressed_txt': (f"compressed_{timestamp}.txt", compressed_txt),
+            'som_mapping': (f"som_mapping_{timestamp}.json", screen_info.perception_infos.SoM_mapping),
+        }
 
         # ⭐ 只有在启用立刻截图且screen_info包含立刻截图时才处理
-        if (hasattr(screen_info, 'immediate_screenshot_path') and
-            screen_info.immediate_screenshot_path is not None and
-            screen_info.immediate_screenshot_path):
-            immediate_screenshot_path = screen_info.immediate_screenshot_path
-
-            # ⭐ 提取immediate截图的标记后截图路径
-            if hasattr(screen_info, 'immediate_marked_screenshot_path') and screen_info.immediate_marked_screenshot_path:
-                immediate_marked_screenshot_path = screen_info.immediate_marked_screenshot_path
-
-            # 保存立刻截图的XML
-            if hasattr(screen_info, 'immediate_xml') and screen_info.immediate_xml:
-                immediate_xml_path = temp_dir / f"ui_dump_{timestamp}_immediate.xml"
-                with open(immediate_xml_path, 'w', encoding='utf-8') as f:
-                    f.write(screen_info.immediate_xml)
-
-                # 压缩立刻截图的XML
-                immediate_compressed_xml_path, immediate_compressed_txt_path = await compressor.compress_xml(
-                    ui_xml=screen_info.immediate_xml,
-                    timestamp=f"{timestamp}_immediate"
+        has_immediate = bool(getattr(screen_info, 'immediate_screenshot_path', None))
+        if has_immediate:
+            if getattr(screen_info, 'immediate_xml', None):
+                immediate_hierarchy = getattr(getattr(screen_info, 'immediate_perception_infos', None), 'hierarchy', None)
+                immediate_compressed_xml, immediate_compressed_txt = await asyncio.to_thread(
+                    compressor.compress_xml_in_memory, immediate_hierarchy or screen_info.immediate_xml
                 )
-                immediate_xml_path = str(immediate_xml_path)
+                artifacts['immediate_xml'] = (f"ui_dump_{timestamp}_immediate.xml", screen_info.immediate_xml)
+                artifacts['immediate_compressed_xml'] = (f"compressed_{timestamp}_immediate.xml", immediate_compressed_xml)
+                artifacts['immediate_compressed_txt'] = (f"compressed_{timestamp}_immediate.txt", immediate_compressed_txt)
 
-            # ⭐ 保存immediate截图的SoM映射
-            if hasattr(screen_info, 'immediate_perception_infos') and screen_info.immediate_perception_infos:
-                immediate_som_mapping_path = temp_dir / f"som_mapping_{timestamp}_immediate.json"
-                with open(immediate_som_mapping_path, 'w', encoding='utf-8') as f:
-                    json.dump(screen_info.immediate_perception_infos.SoM_mapping, f, indent=2)
-                immediate_som_mapping_path = str(immediate_som_mapping_path)
+            if getattr(screen_info, 'immediate_perception_infos', None):
+                artifacts['immediate_som_mapping'] = (
+                    f"som_mapping_{timestamp}_immediate.json", screen_info.immediate_perception_infos.SoM_mapping
+                )
 
-            logger.info(f"检测到双截图模式（完整信息）: immediate={immediate_screenshot_path}, stable={screenshot_path}")
-        else:
-            logger.info(f"单截图模式: stable={screenshot_path}")
-
-        return PerceptionOutput(
-            screenshot_path=screenshot_path,
-            marked_screenshot_path=marked_screenshot_path,
-            xml_path=str(xml_path),
-            compressed_xml_path=compressed_xml_path,
-            compressed_txt_path=compressed_txt_path,
-            som_mapping_path=str(som_mapping_path),
+        perception_output = PerceptionOutput.from_artifacts(
             timestamp=timestamp,
-            screen_size=screen_size,
-            immediate_screenshot_path=immediate_screenshot_path,
-            immediate_marked_screenshot_path=immediate_marked_screenshot_path,
-            immediate_xml_path=immediate_xml_path,
-            immediate_compressed_xml_path=immediate_compressed_xml_path,
-            immediate_compressed_txt_path=immediate_compressed_txt_path,
-            immediate_som_mapping_path=immediate_som_mapping_path
+            screen_size=(screen_info.perception_infos.width, screen_info.perception_infos.height),
+            artifacts=artifacts
         )
+
+        if has_immediate:
+            # 立刻截图（0.2秒）已由Executor落盘（反思时按路径读取），保留路径引用
+            perception_output.immediate_screenshot_path = screen_info.immediate_screenshot_path
+            perception_output.immediate_marked_screenshot_path = getattr(screen_info, 'immediate_marked_screenshot_path', None) or None
+            logger.info(f"检测到双截图模式（完整信息）: immediate={perception_output.immediate_screenshot_path}, stable={screenshot_filename}")
+        else:
+            logger.info(f"单截图模式: stable={screenshot_filename}")
+
+        return perception_output
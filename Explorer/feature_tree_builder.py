@@ -31,28 +31,37 @@ class FeatureTreeBuilder:
         current_path: 当前探索路径（PathStep列表）
         previous_state_id: 上一个状态ID
         feature_update_log: 功能更新日志
+        journal: 功能树事件日志（FeatureTreeJournal，可选），每次修改追加一个事件
     """
 
-    def __init__(self, root_feature_name: str, root_feature_description: str = ""):
+    def __init__(self, root_feature_name: str = "", root_feature_description: str = "",
+                 tree: Optional[FeatureTree] = None, journal=None):
         """初始化功能树
 
         Args:
             root_feature_name: 根功能名称
             root_feature_description: 根功能描述
+            tree: 已有的功能树（从快照恢复时使用），指定时忽略根功能参数
+            journal: 功能树事件日志（可选）
         """
-        # 创建根功能
-        root_feature = FeatureNode(
-            feature_id="root",
-            feature_name=root_feature_name,
-            feature_description=root_feature_description,
-            parent_feature_id=None
-        )
+        self.journal = journal
+
+        if tree is None:
+            # 创建根功能
+            root_feature = FeatureNode(
+                feature_id="root",
+                feature_name=root_feature_name,
+                feature_description=root_feature_description,
+                parent_feature_id=None
+            )
 
-        # 初始化功能树
-        self.tree = FeatureTree(
-            root_feature_id="root",
-            features={"root": root_feature}
-        )
+            # 初始化功能树
+            tree = FeatureTree(
+                root_feature_id="root",
+                features={"root": root_feature}
+            )
+        self.tree = tree
+        self._feature_changed(self.tree.root_feature_id)
 
         # 当前探索路径
         self.current_path: List[PathStep] = []
@@ -63,7 +72,24 @@ class FeatureTreeBuilder:
         # 功能更新日志
         self.feature_update_log: List[Dict[str, Any]] = []
 
-        logger.info(f"功能树初始化完成，根功能: {root_feature_name}")
+        logger.info(f"功能树初始化完成，根功能: {root_feature_name or self.tree.root_feature_id}")
+
+    # ==================== 事件日志 ====================
+
+    def _journal(self, op: str, **payload):
+        if self.journal is not None:
+            self.journal.append(op, **payload)
+
+    def _feature_changed(self, feature_id: str):
+        """功能节点被修改：更新修改计数并记录其当前内容"""
+        self.tree.touch_features()
+        if self.journal is not None and feature_id in self.tree.features:
+            self.journal.append('set_feature', feature=self.tree.features[feature_id].to_dict())
+
+    def _log_update(self, entry: Dict[str, Any]):
+        """追加功能更新日志条目"""
+        self.feature_update_log.append(entry)
+        self._journal('update_log', entry=entry)
 
     def initialize_from_plan(self, feature_structure: Dict[str, Any]):
         """从初始计划中提取功能结构
@@ -87,11 +113,15 @@ class FeatureTreeBuilder:
 
             self.tree.features[feature_id] = feature_node
             self.tree.features["root"].sub_features.append(feature_id)
+            self.tree.index_feature(feature_id)
+            self._feature_changed(feature_id)
 
             logger.info(f"添加子功能: {sub_feat['name']}")
 
+        self._feature_changed("root")
+
         # 记录初始化日志
-        self.feature_update_log.append({
+        self._log_update({
             'action': 'initialize',
             'features': [f['name'] for f in sub_features],
             'timestamp': datetime.now().isoformat()
@@ -162,6 +192,17 @@ class FeatureTreeBuilder:
 
         # 添加到树中
         self.tree.states[state_id] = page_state
+        self._journal(
+            'add_state',
+            state={
+                'state_id': state_id,
+                'state_name': state_name,
+                'activity_name': activity_name,
+                'perception_output': perception_output.to_dict(),
+                'discovered_at': page_state.discovered_at
+            },
+            step=path_step.to_dict()
+        )
 
         # 将State归属到功能节点
         feature_id = self._get_or_create_feature_by_path(feature_path)
@@ -171,6 +212,7 @@ class FeatureTreeBuilder:
             # 如果是该功能的第一个状态，设置为入口状态
             if self.tree.features[feature_id].entry_state_id is None:
                 self.tree.features[feature_id].entry_state_id = state_id
+            self._feature_changed(feature_id)
 
         # 记录转换关系
         if self.previous_state_id:
@@ -181,8 +223,9 @@ class FeatureTreeBuilder:
         logger.info(f"添加新状态: {state_id} -> 功能: {'/'.join(feature_path)}")
 
     def _add_transition(self, from_state_id: str, to_state_id: str, step_id: str):
-        """添加状态转换"""
-        self.tree.state_transitions.append((from_state_id, to_state_id, step_id))
+        """添加状态转换（同时更新邻接表、访问计数和最近状态窗口）"""
+        self.tree.record_transition(from_state_id, to_state_id, step_id)
+        self._journal('add_transition', **{'from': from_state_id, 'to': to_state_id, 'step': step_id})
 
         # 更新from_state的reachable_states
         if from_state_id in self.tree.states:
@@ -215,10 +258,10 @@ class FeatureTreeBuilder:
         # 查找子功能（从第二个元素开始）
         target_feature_name = feature_path[-1]
 
-        # 在所有子功能中查找
-        for fid, feature in self.tree.features.items():
-            if feature.feature_name == target_feature_name:
-                return fid
+        # ⭐ 通过名称索引查找
+        fid = self.tree.find_feature_id(target_feature_name)
+        if fid:
+            return fid
 
         # 如果没找到，返回根功能（可能LLM还没创建这个子功能）
         logger.warning(f"未找到功能: {target_feature_name}，归属到根功能")
@@ -266,9 +309,12 @@ class FeatureTreeBuilder:
         # 添加到树中
         self.tree.features[feature_id] = new_feature
         self.tree.features[parent_id].sub_features.append(feature_id)
+        self.tree.index_feature(feature_id)
+        self._feature_changed(feature_id)
+        self._feature_changed(parent_id)
 
         # 记录日志
-        self.feature_update_log.append({
+        self._log_update({
             'step_id': step_id,
             'action': 'add_new',
             'feature_name': new_feature_info['name'],
@@ -285,21 +331,21 @@ class FeatureTreeBuilder:
         reason = details.get('reason', '')
 
         # 查找功能
-        for fid, feature in self.tree.features.items():
-            if feature.feature_name == old_name:
-                feature.feature_name = new_name
-
-                self.feature_update_log.append({
-                    'step_id': step_id,
-                    'action': 'rename',
-                    'from': old_name,
-                    'to': new_name,
-                    'reason': reason,
-                    'timestamp': datetime.now().isoformat()
-                })
-
-                logger.info(f"[{step_id}] 功能重命名: {old_name} -> {new_name}")
-                break
+        fid = self.tree.find_feature_id(old_name)
+        if fid:
+            self.tree.rename_feature(fid, new_name)
+            self._feature_changed(fid)
+
+            self._log_update({
+                'step_id': step_id,
+                'action': 'rename',
+                'from': old_name,
+                'to': new_name,
+                'reason': reason,
+                'timestamp': datetime.now().isoformat()
+            })
+
+            logger.info(f"[{step_id}] 功能重命名: {old_name} -> {new_name}")
 
     def _split_feature(self, details: Dict[str, Any], step_id: str):
         """拆分功能（简化实现）"""
@@ -308,7 +354,7 @@ class FeatureTreeBuilder:
 
         logger.info(f"[{step_id}] 功能拆分: {original_name} -> {[f['name'] for f in new_features]}")
         # 简化实现：仅记录日志，实际拆分逻辑较复杂
-        self.feature_update_log.append({
+        self._log_update({
             'step_id': step_id,
             'action': 'split',
             'original': original_name,
@@ -372,11 +418,7 @@ class FeatureTreeBuilder:
         feature_name = feature_path[-1]
 
         # 查找对应的feature_id
-        target_feature_id = None
-        for fid, feature in self.tree.features.items():
-            if feature.feature_name == feature_name:
-                target_feature_id = fid
-                break
+        target_feature_id = self.tree.find_feature_id(feature_name)
 
         if not target_feature_id:
             logger.warning(f"未找到功能: {feature_name}，无法标记完成")
@@ -387,12 +429,13 @@ class FeatureTreeBuilder:
         if feature_node.status != "completed":
             feature_node.status = "completed"
             feature_node.completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._feature_changed(target_feature_id)
 
             logger.info(f"✓ 功能已标记为完成: {feature_name} (feature_id={target_feature_id}, step={step_id})")
             logger.info(f"  - 该功能共探索了 {len(feature_node.states)} 个状态")
 
             # 记录到update log
-            self.feature_update_log.append({
+            self._log_update({
                 'action': 'mark_completed',
                 'feature_id': target_feature_id,
                 'feature_name': feature_name,
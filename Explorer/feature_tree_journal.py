@@ -0,0 +1,233 @@
+"""
+功能树增量持久化
+
+功能树的每次修改以事件的形式追加到 JSON Lines 日志（feature_tree_events.jsonl），每步结束时刷盘；
+每隔若干步写一次紧凑快照（feature_tree_snapshot.json）。加载时读取快照，再重放快照之后的事件。
+
+这样每步的保存开销只与该步的修改量有关（而不是整棵树的大小），进程崩溃或被中断时最多丢失当前步的修改。
+
+事件类型：
+- set_feature: 功能节点的新内容（新增、重命名、归属新状态、标记完成等）
+- add_state: 新状态（不含 path_from_root）及到达它的步骤
+- add_transition: 状态转换 (from, to, step)
+- update_log: 功能更新日志条目
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .entities import FeatureNode, FeatureTree, PageState, PathStep, PerceptionOutput
+from .logger import get_logger
+
+logger = get_logger("FeatureTreeJournal")
+
+EVENTS_FILENAME = "feature_tree_events.jsonl"
+SNAPSHOT_FILENAME = "feature_tree_snapshot.json"
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class FeatureTreeJournal:
+    """功能树事件日志
+
+    Attributes:
+        events_path: 事件日志路径
+        snapshot_path: 快照路径
+        snapshot_interval: 每隔多少步写一次快照（<=0 表示只在显式调用 snapshot() 时写）
+        seq: 最后一个事件的序号
+    """
+
+    def __init__(self, session_dir: Path, snapshot_interval: int = 20):
+        """
+        Args:
+            session_dir: 会话目录
+            snapshot_interval: 快照间隔（步数）
+        """
+        session_dir = Path(session_dir)
+        session_dir.mkdir(parents=True, exist_ok=True)
+        self.events_path = session_dir / EVENTS_FILENAME
+        self.snapshot_path = session_dir / SNAPSHOT_FILENAME
+        self.snapshot_interval = snapshot_interval
+        self.seq = 0
+        self._pending: List[str] = []
+        self._steps_since_snapshot = 0
+        self._file = open(self.events_path, 'a', encoding='utf-8')
+
+    def append(self, op: str, **payload):
+        """追加一个事件（写入缓冲区，flush() 时落盘）
+
+        Args:
+            op: 事件类型
+            **payload: 事件内容
+        """
+        self.seq += 1
+        self._pending.append(_dumps({'seq': self.seq, 'op': op, **payload}))
+
+    def flush(self):
+        """将缓冲的事件写入日志并同步到磁盘"""
+        if not self._pending or self._file.closed:
+            return
+        self._file.write("\n".join(self._pending) + "\n")
+        self._pending.clear()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def commit_step(self, builder):
+        """一步结束：刷盘，达到快照间隔时写快照
+
+        Args:
+            builder: FeatureTreeBuilder
+        """
+        self.flush()
+        self._steps_since_snapshot += 1
+        if 0 < self.snapshot_interval <= self._steps_since_snapshot:
+            self.snapshot(builder)
+
+    def snapshot(self, builder):
+        """写紧凑快照（先写临时文件再替换，不会留下写了一半的快照）
+
+        Args:
+            builder: FeatureTreeBuilder
+        """
+        self.flush()
+        data = {
+            'seq': self.seq,
+            'tree': builder.tree.to_dict_compressed(),
+            'current_path': [step.step_id for step in builder.current_path],
+            'previous_state_id': builder.previous_state_id,
+            'feature_update_log': builder.feature_update_log
+        }
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_dumps(data))
+        os.replace(tmp_path, self.snapshot_path)
+        self._steps_since_snapshot = 0
+        logger.debug(f"功能树快照已保存: seq={self.seq}, {len(builder.tree.states)} 个状态")
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def _read_events(events_path: Path, after_seq: int):
+    """读取序号大于 after_seq 的事件，忽略末尾写了一半的行"""
+    if not events_path.exists():
+        return
+    with open(events_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"跳过损坏的事件 ({events_path.name}:{line_no})")
+                continue
+            if event['seq'] > after_seq:
+                yield event
+
+
+def replay_events(builder, events) -> int:
+    """将事件依次应用到构建器（构建器不应挂载 journal，否则会重复记录）
+
+    Args:
+        builder: FeatureTreeBuilder
+        events: 事件序列
+
+    Returns:
+        int: 应用的事件数
+    """
+    tree = builder.tree
+    count = 0
+    for event in events:
+        op = event['op']
+        if op == 'set_feature':
+            feature = FeatureNode.from_dict(event['feature'])
+            existing = tree.features.get(feature.feature_id)
+            if existing is not None and existing.feature_name != feature.feature_name:
+                tree.rename_feature(feature.feature_id, feature.feature_name)
+            tree.features[feature.feature_id] = feature
+            tree.index_feature(feature.feature_id)
+        elif op == 'add_state':
+            step = PathStep.from_dict(event['step'])
+            builder.current_path.append(step)
+            state = event['state']
+            tree.states[state['state_id']] = PageState(
+                state_id=state['state_id'],
+                state_name=state['state_name'],
+                activity_name=state['activity_name'],
+                perception_output=PerceptionOutput.from_dict(state['perception_output']),
+                path_from_root=builder.current_path.copy(),
+                discovered_at=state['discovered_at']
+            )
+            builder.previous_state_id = state['state_id']
+        elif op == 'add_transition':
+            builder._add_transition(event['from'], event['to'], event['step'])
+            builder.previous_state_id = event['to']
+        elif op == 'update_log':
+            builder.feature_update_log.append(event['entry'])
+        else:
+            logger.warning(f"未知的事件类型: {op}")
+            continue
+        count += 1
+    return count
+
+
+def load_feature_tree(session_dir: Path) -> Tuple[Optional[Any], int]:
+    """从快照和事件日志恢复功能树构建器
+
+    Args:
+        session_dir: 会话目录
+
+    Returns:
+        Tuple[FeatureTreeBuilder, int]: (构建器, 最后一个事件的序号)；没有任何持久化数据时构建器为None
+    """
+    from .feature_tree_builder import FeatureTreeBuilder
+
+    session_dir = Path(session_dir)
+    snapshot_path = session_dir / SNAPSHOT_FILENAME
+    events_path = session_dir / EVENTS_FILENAME
+    if not snapshot_path.exists() and not events_path.exists():
+        return None, 0
+
+    seq = 0
+    if snapshot_path.exists():
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot: Dict[str, Any] = json.load(f)
+        seq = snapshot['seq']
+        tree = FeatureTree.from_dict_compressed(snapshot['tree'])
+        builder = FeatureTreeBuilder(tree=tree)
+        builder.current_path = [tree.steps[step_id] for step_id in snapshot['current_path'] if step_id in tree.steps]
+        builder.previous_state_id = snapshot['previous_state_id']
+        builder.feature_update_log = snapshot['feature_update_log']
+    else:
+        builder = FeatureTreeBuilder(tree=FeatureTree(root_feature_id="root"))
+
+    events = list(_read_events(events_path, seq))
+    replayed = replay_events(builder, events)
+    if events:
+        seq = events[-1]['seq']
+    logger.info(f"功能树已恢复: 快照之后重放 {replayed} 个事件, {len(builder.tree.states)} 个状态")
+    return builder, seq
+
+
+def export_feature_tree(session_dir: Path) -> bool:
+    """由快照和事件日志重新生成 feature_tree.json / feature_updates.json（用于中断后的会话）
+
+    Args:
+        session_dir: 会话目录
+
+    Returns:
+        bool: 是否生成
+    """
+    builder, _ = load_feature_tree(session_dir)
+    if builder is None:
+        logger.warning(f"未找到功能树日志: {session_dir}")
+        return False
+    builder.save_tree(Path(session_dir) / "feature_tree.json")
+    builder.save_update_log(Path(session_dir) / "feature_updates.json")
+    return True
@@ -5,8 +5,10 @@
 """
 
 import json
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
 
 def load_compressed_tree(compressed_path: Path) -> Dict[str, Any]:
@@ -32,6 +34,8 @@ def expand_compressed_tree(compressed_data: Dict[str, Any]) -> Dict[str, Any]:
 
     Returns:
         完整版字典（states中path_from_root包含完整step对象）
+
+    注意：会复制并还原整棵树，只需查询路径/功能时使用 FeatureTreeView
     """
     # 深拷贝以避免修改原数据
     import copy
@@ -100,6 +104,117 @@ def get_feature_states(compressed_data: Dict[str, Any], feature_name: str) -> Li
     raise ValueError(f"Feature '{feature_name}' not found")
 
 
+class FeatureTreeView:
+    """压缩版feature_tree的只读视图
+
+    不复制、不还原整棵树：states中的path_from_root保持为step_id列表，
+    访问某个state的路径时才按step_id解析为step对象，解析结果按LRU缓存。
+    返回的字典均为只读代理（MappingProxyType），路径为元组。
+
+    适合步骤数很多（数万级）的功能树：查询路径/功能的开销只与被查询的路径长度有关。
+
+    Attributes:
+        root_feature_id: 根功能ID
+        features: 功能ID到功能字典的只读映射
+        states: 状态ID到压缩版状态字典的只读映射
+        steps: 步骤ID到步骤字典的只读映射
+    """
+
+    def __init__(self, compressed_data: Dict[str, Any], path_cache_size: int = 1024):
+        """
+        Args:
+            compressed_data: 压缩版字典（视图直接引用，不复制；调用方不应再修改它）
+            path_cache_size: 缓存的已解析路径数量
+        """
+        self._data = compressed_data
+        self.root_feature_id = compressed_data.get('root_feature_id')
+        self.features: Mapping[str, Dict[str, Any]] = MappingProxyType(compressed_data.get('features', {}))
+        self.states: Mapping[str, Dict[str, Any]] = MappingProxyType(compressed_data.get('states', {}))
+        self.steps: Mapping[str, Dict[str, Any]] = MappingProxyType(compressed_data.get('steps', {}))
+        self._path_cache: "OrderedDict[str, Tuple[Mapping[str, Any], ...]]" = OrderedDict()
+        self._path_cache_size = path_cache_size
+        self._feature_name_index: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def open(cls, compressed_path: Path, path_cache_size: int = 1024) -> "FeatureTreeView":
+        """从压缩版feature_tree文件创建视图（文件只解析一次）
+
+        Args:
+            compressed_path: 压缩版feature_tree.json路径
+            path_cache_size: 缓存的已解析路径数量
+
+        Returns:
+            FeatureTreeView
+        """
+        return cls(load_compressed_tree(compressed_path), path_cache_size=path_cache_size)
+
+    def __contains__(self, state_id: str) -> bool:
+        return state_id in self.states
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def get_step(self, step_id: str) -> Optional[Mapping[str, Any]]:
+        """按ID获取步骤（只读），不存在时返回None"""
+        step = self.steps.get(step_id)
+        return MappingProxyType(step) if step is not None else None
+
+    def get_state(self, state_id: str) -> Mapping[str, Any]:
+        """按ID获取压缩版状态（只读，path_from_root为step_id列表）"""
+        if state_id not in self.states:
+            raise ValueError(f"State '{state_id}' not found")
+        return MappingProxyType(self.states[state_id])
+
+    def iter_state_path(self, state_id: str) -> Iterator[Mapping[str, Any]]:
+        """逐个解析到达某个state的step（不缓存、不构建列表）"""
+        for step_id in self.get_state(state_id)['path_from_root']:
+            step = self.get_step(step_id)
+            if step is None:
+                print(f"⚠️  警告: step_id '{step_id}' 在steps字典中不存在")
+                continue
+            yield step
+
+    def get_state_path(self, state_id: str) -> Tuple[Mapping[str, Any], ...]:
+        """获取到达某个state的完整路径（解析结果缓存）
+
+        Args:
+            state_id: 状态ID
+
+        Returns:
+            只读step对象元组
+        """
+        path = self._path_cache.get(state_id)
+        if path is not None:
+            self._path_cache.move_to_end(state_id)
+            return path
+        path = tuple(self.iter_state_path(state_id))
+        self._path_cache[state_id] = path
+        if len(self._path_cache) > self._path_cache_size:
+            self._path_cache.popitem(last=False)
+        return path
+
+    def find_feature(self, feature_name: str) -> Optional[Mapping[str, Any]]:
+        """按名称查找功能（首次调用时建立名称索引），不存在时返回None"""
+        if self._feature_name_index is None:
+            self._feature_name_index = {}
+            for feature_id, feature in self.features.items():
+                self._feature_name_index.setdefault(feature['feature_name'], feature_id)
+        feature_id = self._feature_name_index.get(feature_name)
+        return MappingProxyType(self.features[feature_id]) if feature_id is not None else None
+
+    def get_feature_states(self, feature_name: str) -> Tuple[str, ...]:
+        """获取某个功能包含的所有状态ID"""
+        feature = self.find_feature(feature_name)
+        if feature is None:
+            raise ValueError(f"Feature '{feature_name}' not found")
+        return tuple(feature['states'])
+
+    def get_feature_paths(self, feature_name: str) -> Dict[str, Tuple[Mapping[str, Any], ...]]:
+        """获取某个功能下每个状态的路径 {state_id: 路径}"""
+        return {state_id: self.get_state_path(state_id) for state_id in self.get_feature_states(feature_name)
+                if state_id in self.states}
+
+
 def print_tree_summary(compressed_data: Dict[str, Any]):
     """打印feature_tree摘要信息
 
@@ -10,6 +10,7 @@ from pathlib import Path
 from PIL import Image as PILImage
 
 from Fairy.tools.screen_perceptor.ssip_new.perceptor.perceptor import ScreenStructuredInfoPerception
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
 from Fairy.config.model_config import ModelConfig
 from Fairy.entity.info_entity import ScreenFileInfo
 
@@ -73,26 +74,28 @@ class PerceptionWrapper:
         1. 捕获屏幕（截图 + XML）
         2. 视觉感知（SoM标记）
         3. XML压缩
-        4. 保存所有输出文件
+        4. 产物保留在内存中（调用方 bind/materialize 后写出）
 
         Args:
             non_visual_mode: 是否使用非视觉模式（不使用SoM）
             target_app: 目标应用包名（可选）
 
         Returns:
-            PerceptionOutput: 包含所有输出文件路径的对象
+            PerceptionOutput: 感知输出（原始截图/XML为文件，其余产物在内存中）
         """
         logger.info("开始捕获和感知屏幕...")
 
         # 1. 捕获当前屏幕（使用单例 uiautomator2）
+        # ⭐ 连接与截图都是阻塞调用，放到线程中执行，不阻塞同一事件循环上的其他设备的探索
         logger.debug("捕获屏幕数据...")
-        capturer = UIAutomatorCapture(
+        capturer = await asyncio.to_thread(
+            UIAutomatorCapture,
             adb_path=self.adb_path,
             output_dir=str(self.output_dir),
             use_singleton=True,  # 使用单例模式
             device_id=self.device_id
         )
-        capture_data = capturer.capture()
+        capture_data = await asyncio.to_thread(capturer.capture)
 
         logger.debug(f"截图路径: {capture_data['screenshot_path']}")
         logger.debug(f"XML路径: {capture_data['xml_path']}")
@@ -118,56 +121,37 @@ class PerceptionWrapper:
                capture_data['screenshot_path'] != original_screenshot_path:
                 os.remove(capture_data['screenshot_path'])
 
-        ui_xml = capture_data['ui_xml']
+        # ⭐ 层次结构只解析一次，SoM标记与XML压缩共享解析结果
+        hierarchy = ParsedHierarchy(capture_data['ui_xml'])
 
         # 3. 屏幕感知（SoM标记）
         logger.info("执行屏幕感知...")
         screenshot_file_info, perception_infos = await self.ssip.get_perception_infos(
             raw_screenshot_file_info=screenshot_file_info,
-            ui_hierarchy_xml=ui_xml,
+            ui_hierarchy_xml=hierarchy,
             non_visual_mode=non_visual_mode,
             target_app=target_app
         )
 
-        # 4. 压缩XML (仅用于生成旧格式的compressed_xml，compressed_txt改用som_compressed_txt)
+        # 4. 在内存中压缩XML (仅用于生成旧格式的compressed_xml，compressed_txt改用som_compressed_txt)
         logger.debug("压缩XML...")
-        compressor = XMLCompressor(output_dir=capture_data['capture_folder'])
-        compressed_xml_path, _ = await compressor.compress_xml(
-            ui_xml=ui_xml,
-            timestamp=capture_data['timestamp'],
-            target_app=target_app
-        )
-
-        # 5. 保存SoM映射和对应的compressed文本（确保索引一致）
-        import json
-        som_mapping_path = os.path.join(
-            capture_data['capture_folder'],
-            f"som_mapping_{capture_data['timestamp']}.json"
-        )
-        with open(som_mapping_path, 'w', encoding='utf-8') as f:
-            json.dump(perception_infos.SoM_mapping, f, indent=2)
-
-        # ⭐ 保存与SoM_mapping索引对应的compressed文本
-        compressed_txt_path = os.path.join(
-            capture_data['capture_folder'],
-            f"compressed_{capture_data['timestamp']}.txt"
-        )
-        with open(compressed_txt_path, 'w', encoding='utf-8') as f:
-            f.write(perception_infos.som_compressed_txt if perception_infos.som_compressed_txt else "")
-
-        # 6. 构建输出对象
-        marked_screenshot_path = screenshot_file_info.get_screenshot_fullpath()
-
-        perception_output = PerceptionOutput(
-            screenshot_path=original_screenshot_path,
-            marked_screenshot_path=marked_screenshot_path,
-            xml_path=capture_data['xml_path'],
-            compressed_xml_path=compressed_xml_path,
-            compressed_txt_path=compressed_txt_path,
-            som_mapping_path=som_mapping_path,
-            timestamp=capture_data['timestamp'],
-            screen_size=capture_data['screen_size']
+        compressed_xml, _ = await asyncio.to_thread(XMLCompressor().compress_xml_in_memory, hierarchy)
+
+        # 5. 构建输出对象：SoM映射、对应的compressed文本（确保索引一致）和标记截图保留在内存中，
+        # 由调用方 bind/materialize 到最终目录；原始截图和XML已由采集工具落盘
+        timestamp = capture_data['timestamp']
+        perception_output = PerceptionOutput.from_artifacts(
+            timestamp=timestamp,
+            screen_size=capture_data['screen_size'],
+            artifacts={
+                'marked_screenshot': (screenshot_file_info.get_screenshot_filename(), screenshot_file_info),
+                'compressed_xml': (f"compressed_{timestamp}.xml", compressed_xml),
+                'compressed_txt': (f"compressed_{timestamp}.txt", perception_infos.som_compressed_txt or ""),
+                'som_mapping': (f"som_mapping_{timestamp}.json", perception_infos.SoM_mapping),
+            }
         )
+        perception_output.screenshot_path = original_screenshot_path
+        perception_output.xml_path = capture_data['xml_path']
 
         logger.success(f"屏幕感知完成，输出目录: {capture_data['capture_folder']}")
 
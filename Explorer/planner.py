@@ -19,6 +19,7 @@ from .entities import (
     PerceptionOutput
 )
 from .tips_loader import get_tips_loader  # ⭐ 新增
+from .prompt_context import PromptSection, ReplanContextAssembler
 from .logger import get_logger
 
 logger = get_logger("ExplorationPlanner")
@@ -55,6 +56,10 @@ class ExplorationPlanner:
         # ⭐ 初始化Tips加载器
         self.tips_loader = get_tips_loader()
 
+        # ⭐ Replan提示词组装器（按部分缓存渲染结果，超出token预算时按优先级截断）
+        self.context_assembler = ReplanContextAssembler(token_budget=config.replan_prompt_token_budget)
+        self.last_prompt_report = None
+
         logger.info(f"ExplorationPlanner初始化，模型: {config.llm_model_name}")
 
     async def create_initial_plan(
@@ -73,13 +78,11 @@ class ExplorationPlanner:
         """
         logger.info("开始生成初始探索计划...")
 
-        # 读取压缩后的屏幕信息
-        with open(initial_perception.compressed_txt_path, 'r', encoding='utf-8') as f:
-            screen_text = f.read()
+        # 读取压缩后的屏幕信息（优先使用内存中的内容）
+        screen_text = initial_perception.read_text('compressed_txt')
 
         # 加载带SoM标记的截图
-        from PIL import Image
-        marked_screenshot = Image.open(initial_perception.marked_screenshot_path)
+        marked_screenshot = initial_perception.get_image('marked_screenshot')
 
         # 构建Prompt
         prompt = self._build_initial_plan_prompt(target, screen_text)
@@ -146,13 +149,11 @@ class ExplorationPlanner:
         """
         logger.info(f"开始重新规划（上一步: {last_step.step_id}）...")
 
-        # 读取当前屏幕信息（稳定截图，5秒）
-        with open(current_perception.compressed_txt_path, 'r', encoding='utf-8') as f:
-            screen_text = f.read()
+        # 读取当前屏幕信息（稳定截图，5秒，优先使用内存中的内容）
+        screen_text = current_perception.read_text('compressed_txt')
 
         # 加载带SoM标记的截图（稳定截图，5秒）
-        from PIL import Image
-        marked_screenshot = Image.open(current_perception.marked_screenshot_path)
+        marked_screenshot = current_perception.get_image('marked_screenshot')
 
         # ⭐ 准备图像列表（可能包含双截图）
         images = []
@@ -161,15 +162,13 @@ class ExplorationPlanner:
         immediate_screen_text = None
         if (current_perception.immediate_screenshot_path and
             current_perception.immediate_screenshot_path is not None):
-            immediate_screenshot = Image.open(current_perception.immediate_screenshot_path)
+            immediate_screenshot = current_perception.get_image('immediate_screenshot')
             images.append(immediate_screenshot)
             logger.info("检测到立刻截图（0.2秒），将一起传递给LLM")
 
             # 读取立刻截图的文本描述
-            if (current_perception.immediate_compressed_txt_path and
-                current_perception.immediate_compressed_txt_path is not None):
-                with open(current_perception.immediate_compressed_txt_path, 'r', encoding='utf-8') as f:
-                    immediate_screen_text = f.read()
+            if current_perception.has_artifact('immediate_compressed_txt'):
+                immediate_screen_text = current_perception.read_text('immediate_compressed_txt')
         else:
             logger.info("单截图模式，只传递stable截图（5秒）")
 
@@ -205,7 +204,8 @@ class ExplorationPlanner:
                 prompt_text=prompt,
                 images=image_paths,
                 system_message="你是一个应用功能探索助手，擅长分析应用界面并制定探索计划。你的探索结果将后续作为对该APP的知识，交给测试计划Agent进行app的测试用例生成，包括等价类划分和边界条件等。",
-                output_path=output_path
+                output_path=output_path,
+                token_report=self.last_prompt_report.format_report() if self.last_prompt_report else None
             )
 
         # 调用LLM
@@ -444,14 +444,9 @@ class ExplorationPlanner:
             # 兜底：基于已完成步骤数量计算
             next_step_num = len(current_plan.completed_steps) + 2
 
-        # ⭐ 获取应用特定提示（用于后续判断是否有禁止项）
-        tips = self._get_app_specific_tips(target)
-        forbidden_note = ""
-        if tips and "⚠️" in tips:
-            forbidden_note = "\n\n⚠️ **禁止项提醒**: 请严格遵守下方的应用特定禁止事项"
-
+        # ⭐ 各部分：执行上下文和屏幕信息每步都不同，直接格式化；探索指引/功能进度/历史按缓存键复用
         # ========== 第1部分：执行上下文 ==========
-        prompt = f"""# 应用功能探索 - 重新规划
+        header = f"""# 应用功能探索 - 重新规划
 
 ## 📊 执行上下文
 
@@ -471,7 +466,7 @@ class ExplorationPlanner:
 
         # ========== 第2部分：屏幕信息 ==========
         if immediate_screen_text:
-            prompt += f"""
+            screen = f"""
 ### 双截图模式
 我们提供了两张截图：
 1. **立刻截图（0.2秒）**: 捕获快速消失的toast/bubble
@@ -490,33 +485,14 @@ class ExplorationPlanner:
 ⚠️ 比较两张截图，关注只在立刻截图出现的提示/错误！
 """
         else:
-            prompt += f"""
+            screen = f"""
 ```
 {screen_text}
 ```
 """
 
-        # ========== 第3部分：探索指引 ==========
-        prompt += f"""
-
----
-
-## 📋 探索指引
-
-### 核心目标
-探索 = **发现功能** + **理解结构** + **记录交互**（为测试用例设计提供基础）
-
-### 关键原则
-1. ✅ **要做**: 发现按钮、识别功能、理解流程、记录页面结构
-2. ❌ **不做**: 边界测试、异常输入、压力测试、重复操作
-3. ⚠️ **安全**: 金钱交易→探索到确认页即停，失败2-3次→换路径
-4. 📱 **多样**: 点击+滑动+长按组合，避免过度点击{forbidden_note}
-
-{tips}
-
----
-
-## 🎯 重新规划任务
+        # ========== 第3部分：重新规划任务与输出要求 ==========
+        task = f"""## 🎯 重新规划任务
 
 ### ⭐ 思考步骤（CoT - 必须完整包含在plan_thought中）
 
@@ -585,18 +561,71 @@ class ExplorationPlanner:
 - 最多 {self.config.max_plan_steps} 个步骤
 """
 
-        # ⭐ 添加功能状态和历史信息
-        prompt += self._build_feature_progress_section(current_plan, feature_tree, recent_state_sequence)
+        feature_path = tuple(current_plan.current_feature.get('feature_path', [target.feature_to_explore]))
+        recent_states = tuple(recent_state_sequence or ())
+        sections = [
+            PromptSection("context", lambda: header),
+            PromptSection("screen", lambda: screen, priority=1, truncatable=True),
+            # 探索指引只取决于应用（应用特定提示）
+            PromptSection(
+                "guide", lambda: self._render_guide_section(target),
+                cache_key=(target.app_package, target.app_name)
+            ),
+            PromptSection("task", lambda: task),
+            # ⭐ 功能进度只在功能节点变化或最近3个状态变化时重新渲染
+            PromptSection(
+                "feature_progress",
+                lambda: self._build_feature_progress_section(current_plan, feature_tree, recent_state_sequence),
+                cache_key=(id(feature_tree), getattr(feature_tree, 'feature_revision', None), recent_states[-3:]),
+                priority=3, truncatable=True
+            ),
+        ]
 
         # ⭐ 添加历史状态信息和循环检测
         if recent_state_sequence and feature_tree:
-            prompt += self._build_history_section(
-                recent_state_sequence,
-                feature_tree,
-                current_plan
-            )
+            sections.append(PromptSection(
+                "history",
+                lambda: self._build_history_section(recent_state_sequence, feature_tree, current_plan),
+                cache_key=(id(feature_tree), recent_states[-10:], len(feature_tree.states),
+                           len(feature_tree.state_transitions), feature_path),
+                priority=4, truncatable=True
+            ))
+
+        assembled = self.context_assembler.assemble(sections)
+        self.last_prompt_report = assembled
+        logger.debug(f"Replan提示词: ~{assembled.total_tokens} tokens, 复用缓存 {assembled.cache_hits}"
+                     + (f", 截断 {assembled.truncated + assembled.dropped}" if assembled.truncated or assembled.dropped else ""))
+        return assembled.text
+
+    def _render_guide_section(self, target: ExplorationTarget) -> str:
+        """渲染探索指引部分（包含应用特定提示）"""
+        # ⭐ 获取应用特定提示（用于后续判断是否有禁止项）
+        tips = self._get_app_specific_tips(target)
+        forbidden_note = ""
+        if tips and "⚠️" in tips:
+            forbidden_note = "\n\n⚠️ **禁止项提醒**: 请严格遵守下方的应用特定禁止事项"
+
+        return f"""
+
+---
+
+## 📋 探索指引
+
+### 核心目标
+探索 = **发现功能** + **理解结构** + **记录交互**（为测试用例设计提供基础）
+
+### 关键原则
+1. ✅ **要做**: 发现按钮、识别功能、理解流程、记录页面结构
+2. ❌ **不做**: 边界测试、异常输入、压力测试、重复操作
+3. ⚠️ **安全**: 金钱交易→探索到确认页即停，失败2-3次→换路径
+4. 📱 **多样**: 点击+滑动+长按组合，避免过度点击{forbidden_note}
+
+{tips}
+
+---
+
+"""
 
-        return prompt
 
     def _parse_plan_response(
         self,
@@ -743,9 +772,8 @@ class ExplorationPlanner:
             if hasattr(feature_tree, 'states') and state_id in feature_tree.states:
                 state = feature_tree.states[state_id]
 
-                # ⭐ 从state_transitions动态计算访问次数
-                # state_transitions格式: (from_state_id, to_state_id, step_id)
-                visit_count = sum(1 for trans in feature_tree.state_transitions if trans[1] == state_id)
+                # ⭐ 访问次数由功能树索引增量维护
+                visit_count = feature_tree.get_visit_count(state_id)
 
                 lines.append(
                     f"{step_num}. {state.state_name} "
@@ -770,12 +798,9 @@ class ExplorationPlanner:
             if hasattr(feature_tree, 'states') and state_id in feature_tree.states:
                 state = feature_tree.states[state_id]
 
-                # ⭐ 从state_transitions动态计算访问次数
-                # state_transitions格式: (from_state_id, to_state_id, step_id)
-                visit_count = sum(1 for trans in feature_tree.state_transitions if trans[1] == state_id)
-
-                # ⭐ 从state_transitions提取在此状态执行的步骤
-                steps_in_state = [trans[2] for trans in feature_tree.state_transitions if trans[1] == state_id]
+                # ⭐ 访问次数和到达此状态的步骤由功能树索引增量维护
+                visit_count = feature_tree.get_visit_count(state_id)
+                steps_in_state = feature_tree.state_steps.get(state_id, [])
                 steps_str = ', '.join(steps_in_state[-5:]) if steps_in_state else 'N/A'
 
                 return f"""
@@ -929,7 +954,8 @@ class ExplorationPlanner:
         prompt_text: str,
         images: list,
         system_message: str,
-        output_path
+        output_path,
+        token_report: str = None
     ):
         """保存prompt到文件
 
@@ -938,6 +964,7 @@ class ExplorationPlanner:
             images: 图片路径列表
             system_message: 系统消息文本
             output_path: 输出文件路径（Path对象）
+            token_report: 各部分token统计（可选）
         """
         try:
             output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -960,6 +987,12 @@ class ExplorationPlanner:
                     f.write(f"Image {i}: {img_path}\n")
                 f.write("\n")
 
+                if token_report:
+                    f.write("=" * 80 + "\n")
+                    f.write("TOKEN REPORT\n")
+                    f.write("=" * 80 + "\n")
+                    f.write(token_report + "\n")
+
             logger.info(f"Prompt已保存到: {output_path}")
         except Exception as e:
             logger.error(f"保存prompt失败: {e}")
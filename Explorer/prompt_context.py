@@ -0,0 +1,188 @@
+"""
+重新规划提示词的上下文组装
+
+重新规划的提示词由多个部分（section）组成：执行上下文、屏幕信息、探索指引、功能进度、历史状态等。
+ReplanContextAssembler 负责：
+- 缓存：每个部分带一个缓存键，键与上一步相同时直接复用上次的渲染结果（不再重新渲染）
+- 预算：估算各部分的token数，总量超出预算时按优先级从低到高截断/丢弃可截断的部分
+- 报告：记录每个部分的token数、是否命中缓存、是否被截断
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .logger import get_logger
+
+logger = get_logger("ReplanContextAssembler")
+
+_NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+TRUNCATION_NOTICE = "\n...（以下内容超出提示词预算，已截断）\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：非ASCII字符（中文、emoji等）按1个token，ASCII字符按4个字符1个token
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: 估算的token数
+    """
+    if not text:
+        return 0
+    non_ascii = len(_NON_ASCII_PATTERN.findall(text))
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+@dataclass
+class PromptSection:
+    """提示词的一个部分
+
+    Attributes:
+        name: 部分名称（缓存和报告使用）
+        render: 渲染函数，返回该部分的文本
+        cache_key: 缓存键，与上次相同时复用上次的渲染结果；为None时每次都重新渲染
+        priority: 优先级，数值越小越重要；超出预算时从数值最大的部分开始截断
+        truncatable: 是否允许截断/丢弃（必需的部分永远完整保留）
+        min_tokens: 截断后至少保留的token数，不足时整个部分被丢弃
+    """
+    name: str
+    render: Callable[[], str]
+    cache_key: Optional[Hashable] = None
+    priority: int = 0
+    truncatable: bool = False
+    min_tokens: int = 200
+
+
+@dataclass
+class AssembledPrompt:
+    """组装结果
+
+    Attributes:
+        text: 最终提示词
+        section_tokens: 各部分最终的token数 {name: tokens}
+        cache_hits: 复用缓存的部分
+        truncated: 被截断的部分
+        dropped: 被整体丢弃的部分
+        total_tokens: 最终提示词的token数
+        budget: token预算（0 表示不限制）
+    """
+    text: str
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    cache_hits: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    total_tokens: int = 0
+    budget: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_tokens': self.total_tokens,
+            'budget': self.budget,
+            'section_tokens': self.section_tokens,
+            'cache_hits': self.cache_hits,
+            'truncated': self.truncated,
+            'dropped': self.dropped
+        }
+
+    def format_report(self) -> str:
+        """格式化的token报告（每个部分一行）"""
+        lines = [f"total: ~{self.total_tokens} tokens (budget: {self.budget or 'unlimited'})"]
+        for name, tokens in self.section_tokens.items():
+            flags = []
+            if name in self.cache_hits:
+                flags.append("cached")
+            if name in self.truncated:
+                flags.append("truncated")
+            if name in self.dropped:
+                flags.append("dropped")
+            lines.append(f"  - {name}: ~{tokens}" + (f" [{', '.join(flags)}]" if flags else ""))
+        return "\n".join(lines)
+
+
+class ReplanContextAssembler:
+    """带缓存和token预算的提示词组装器
+
+    Attributes:
+        token_budget: 提示词token预算（0 表示不限制）
+    """
+
+    def __init__(self, token_budget: int = 0):
+        """
+        Args:
+            token_budget: 提示词token预算（0 表示不限制）
+        """
+        self.token_budget = token_budget
+        self._cache: Dict[str, tuple] = {}  # {name: (cache_key, text, tokens)}
+
+    def _render(self, section: PromptSection, report: AssembledPrompt):
+        cached = self._cache.get(section.name)
+        if section.cache_key is not None and cached is not None and cached[0] == section.cache_key:
+            report.cache_hits.append(section.name)
+            return cached[1], cached[2]
+        text = section.render() or ""
+        tokens = estimate_tokens(text)
+        self._cache[section.name] = (section.cache_key, text, tokens)
+        return text, tokens
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        """保留开头不超过 max_tokens 的内容（按行截断，单行超长时按字符截断），并附加截断说明"""
+        kept, used = [], estimate_tokens(TRUNCATION_NOTICE)
+        for line in text.splitlines(keepends=True):
+            line_tokens = estimate_tokens(line)
+            if used + line_tokens > max_tokens:
+                # 二分查找该行能保留的最长前缀
+                low, high = 0, len(line)
+                while low < high:
+                    mid = (low + high + 1) // 2
+                    if used + estimate_tokens(line[:mid]) <= max_tokens:
+                        low = mid
+                    else:
+                        high = mid - 1
+                kept.append(line[:low])
+                break
+            kept.append(line)
+            used += line_tokens
+        return "".join(kept) + TRUNCATION_NOTICE
+
+    def assemble(self, sections: List[PromptSection]) -> AssembledPrompt:
+        """渲染并拼接各部分，超出预算时按优先级截断
+
+        Args:
+            sections: 按出现顺序排列的部分
+
+        Returns:
+            AssembledPrompt: 组装结果
+        """
+        report = AssembledPrompt(text="", budget=self.token_budget)
+        texts: Dict[str, str] = {}
+        tokens: Dict[str, int] = {}
+        for section in sections:
+            texts[section.name], tokens[section.name] = self._render(section, report)
+
+        overflow = sum(tokens.values()) - self.token_budget if self.token_budget > 0 else 0
+        if overflow > 0:
+            candidates = sorted((s for s in sections if s.truncatable), key=lambda s: -s.priority)
+            for section in candidates:
+                if overflow <= 0:
+                    break
+                remaining = tokens[section.name] - overflow
+                if remaining >= section.min_tokens:
+                    texts[section.name] = self._truncate(texts[section.name], remaining)
+                    report.truncated.append(section.name)
+                else:
+                    texts[section.name] = ""
+                    report.dropped.append(section.name)
+                new_tokens = estimate_tokens(texts[section.name])
+                overflow -= tokens[section.name] - new_tokens
+                tokens[section.name] = new_tokens
+            if overflow > 0:
+                logger.warning(f"必需部分已超出提示词预算 {overflow} tokens（预算 {self.token_budget}）")
+
+        report.text = "".join(texts[section.name] for section in sections)
+        report.section_tokens = tokens
+        report.total_tokens = sum(tokens.values())
+        return report
@@ -0,0 +1,136 @@
+"""
+自适应重新规划策略
+
+默认每一步都调用LLM重新规划（带截图），开销随步数线性增长。自适应策略在每步执行后先检查几个本地信号，
+判断当前计划是否仍在正轨上；只有出现失败、循环、意外状态等情况时才重新规划，否则直接执行计划中的下一步。
+
+强制重新规划的情况（按检查顺序）：
+- step_failed: 上一步执行失败
+- plan_exhausted: 计划中没有待执行的步骤
+- left_target_app: 执行后离开了目标应用
+- loop_detected: 最近的状态序列出现循环（连续停留在同一状态，或 A→B→A→B 往返）
+- state_unchanged: 执行后状态指纹与执行前相同（操作没有产生预期的页面变化）
+- unknown_state: 无法识别执行后的状态
+- periodic_refresh: 已连续跳过的次数达到上限
+其余情况跳过重新规划（on_track）。
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .entities import ExplorationPlan, ExplorationStep
+from .logger import get_logger
+
+logger = get_logger("ReplanPolicy")
+
+
+@dataclass
+class ReplanDecision:
+    """一次重新规划判断的结果
+
+    Attributes:
+        replan: 是否重新规划
+        reason: 原因（见模块说明）
+    """
+    replan: bool
+    reason: str
+
+
+class AdaptiveReplanPolicy:
+    """基于本地进度信号的自适应重新规划策略
+
+    Attributes:
+        max_consecutive_skips: 最多连续跳过的次数，达到后强制重新规划一次
+        consecutive_skips: 当前已连续跳过的次数
+        reasons: 各原因的决策次数
+    """
+
+    def __init__(self, max_consecutive_skips: int = 3):
+        """
+        Args:
+            max_consecutive_skips: 最多连续跳过的次数
+        """
+        self.max_consecutive_skips = max_consecutive_skips
+        self.consecutive_skips = 0
+        self.reasons: Counter = Counter()
+        self.decisions: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def detect_loop(recent_states: List[str]) -> bool:
+        """最近3步停留在同一状态，或最近4步在两个状态间往返"""
+        if len(recent_states) >= 3 and len(set(recent_states[-3:])) == 1:
+            return True
+        if len(recent_states) >= 4:
+            a, b, c, d = recent_states[-4:]
+            return a == c and b == d and a != b
+        return False
+
+    def _check(self, plan, last_result, previous_state_id, current_state_id,
+               recent_states, target_package, current_package) -> str:
+        if not last_result.get('success', False):
+            return "step_failed"
+        if not any(step.status == "pending" for step in plan.steps):
+            return "plan_exhausted"
+        if target_package and current_package and current_package != target_package:
+            return "left_target_app"
+        if self.detect_loop(recent_states):
+            return "loop_detected"
+        if current_state_id is None:
+            return "unknown_state"
+        if previous_state_id is not None and current_state_id == previous_state_id:
+            return "state_unchanged"
+        if self.consecutive_skips >= self.max_consecutive_skips:
+            return "periodic_refresh"
+        return "on_track"
+
+    def decide(
+        self,
+        plan: ExplorationPlan,
+        last_step: ExplorationStep,
+        last_result: dict,
+        previous_state_id: Optional[str],
+        current_state_id: Optional[str],
+        recent_states: List[str],
+        target_package: Optional[str] = None,
+        current_package: Optional[str] = None
+    ) -> ReplanDecision:
+        """判断上一步执行后是否需要重新规划
+
+        Args:
+            plan: 当前计划
+            last_step: 上一步执行的步骤
+            last_result: 上一步Executor的执行结果（to_dict）
+            previous_state_id: 执行前的状态ID
+            current_state_id: 执行后的状态ID（无法识别时为None）
+            recent_states: 最近到达的状态ID序列
+            target_package: 目标应用包名
+            current_package: 执行后前台应用包名
+
+        Returns:
+            ReplanDecision: 判断结果
+        """
+        reason = self._check(plan, last_result, previous_state_id, current_state_id,
+                             recent_states, target_package, current_package)
+        decision = ReplanDecision(replan=reason != "on_track", reason=reason)
+
+        self.consecutive_skips = 0 if decision.replan else self.consecutive_skips + 1
+        self.reasons[reason] += 1
+        self.decisions.append({'step_id': last_step.step_id, 'replan': decision.replan, 'reason': reason})
+
+        if decision.replan:
+            logger.info(f"[{last_step.step_id}] 重新规划: {reason}")
+        else:
+            logger.info(f"[{last_step.step_id}] 计划在正轨上，跳过重新规划（已连续跳过 {self.consecutive_skips} 次）")
+        return decision
+
+    def get_stats(self) -> Dict[str, Any]:
+        """统计信息（节省的LLM调用次数 = 跳过的次数）"""
+        skipped = self.reasons.get("on_track", 0)
+        return {
+            'decisions': len(self.decisions),
+            'replans': len(self.decisions) - skipped,
+            'llm_calls_saved': skipped,
+            'reasons': dict(self.reasons),
+            'history': self.decisions
+        }
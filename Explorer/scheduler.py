@@ -0,0 +1,386 @@
+"""
+多设备并行探索调度器
+
+将一批探索目标（应用 × 功能）分发到设备池中的多台设备上并行执行：
+- 每台设备运行一个 FairyExplorer，空闲即从队列领取下一个目标
+- 设备故障时将目标重新入队，由其他（或重连后的）设备继续执行
+- 同一应用的探索结果合并为一棵应用级功能树
+- 输出批次报告（步骤数/小时、新发现状态数/小时等吞吐指标）
+"""
+
+import asyncio
+import json
+import signal
+import time
+from dataclasses import dataclass, field, replace, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from shared import DeviceManager
+
+from .config import ExplorerConfig
+from .entities import ExplorationTarget, ExplorationResult, FeatureNode, FeatureTree
+from .explorer import FairyExplorer
+from .logger import get_logger
+
+logger = get_logger("ExplorationScheduler")
+
+
+@dataclass
+class ExplorationJob:
+    """调度队列中的一个探索任务
+
+    Attributes:
+        job_id: 任务ID
+        target: 探索目标
+        attempts: 已尝试次数
+        device_history: 执行过该任务的设备序列号
+    """
+    job_id: str
+    target: ExplorationTarget
+    attempts: int = 0
+    device_history: List[str] = field(default_factory=list)
+
+
+@dataclass
+class JobRecord:
+    """单个任务的执行记录（用于批次报告）"""
+    job_id: str
+    app_package: str
+    feature: str
+    device: Optional[str]
+    attempts: int
+    success: bool
+    total_steps: int = 0
+    states_discovered: int = 0
+    elapsed: float = 0.0
+    output_dir: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BatchReport:
+    """批次报告
+
+    Attributes:
+        started_at: 批次开始时间
+        wall_time: 批次总耗时（秒）
+        devices: 参与调度的设备
+        jobs: 各任务执行记录
+        states_per_app: 每个应用合并后的状态数
+    """
+    started_at: str
+    wall_time: float
+    devices: List[str]
+    jobs: List[JobRecord]
+    states_per_app: Dict[str, int]
+
+    @property
+    def total_steps(self) -> int:
+        return sum(job.total_steps for job in self.jobs)
+
+    @property
+    def total_states(self) -> int:
+        return sum(self.states_per_app.values())
+
+    def _per_hour(self, value: float) -> float:
+        return value * 3600 / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        per_device = {}
+        for job in self.jobs:
+            stats = per_device.setdefault(job.device or "<none>", {"jobs": 0, "succeeded": 0, "steps": 0, "busy_time": 0.0})
+            stats["jobs"] += 1
+            stats["succeeded"] += int(job.success)
+            stats["steps"] += job.total_steps
+            stats["busy_time"] += job.elapsed
+
+        return {
+            "started_at": self.started_at,
+            "wall_time": self.wall_time,
+            "devices": self.devices,
+            "total_jobs": len(self.jobs),
+            "succeeded_jobs": sum(1 for job in self.jobs if job.success),
+            "total_steps": self.total_steps,
+            "total_states": self.total_states,
+            "steps_per_hour": self._per_hour(self.total_steps),
+            "states_per_hour": self._per_hour(self.total_states),
+            "states_per_app": self.states_per_app,
+            "per_device": per_device,
+            "jobs": [job.to_dict() for job in self.jobs]
+        }
+
+    def save_to_file(self, filepath: Path):
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def __str__(self) -> str:
+        return (
+            f"BatchReport:\n"
+            f"  Devices: {len(self.devices)} ({', '.join(self.devices)})\n"
+            f"  Jobs: {sum(1 for job in self.jobs if job.success)}/{len(self.jobs)} succeeded\n"
+            f"  Wall Time: {self.wall_time:.1f}s\n"
+            f"  Steps: {self.total_steps} ({self._per_hour(self.total_steps):.1f}/h)\n"
+            f"  States: {self.total_states} ({self._per_hour(self.total_states):.1f}/h)"
+        )
+
+
+def merge_feature_tree(app_tree: FeatureTree, tree: FeatureTree, namespace: str):
+    """将一次探索得到的功能树合并到应用级功能树
+
+    功能节点和步骤ID加上命名空间前缀挂到应用根节点下；状态ID由界面内容决定，
+    不同设备发现的同一状态合并为一个，可达状态取并集。
+
+    Args:
+        app_tree: 应用级功能树（就地修改）
+        tree: 单次探索的功能树
+        namespace: 命名空间（任务ID）
+    """
+    def _fid(feature_id):
+        return f"{namespace}/{feature_id}"
+
+    def _step(step):
+        return replace(step, step_id=_fid(step.step_id))
+
+    for feature_id, feature in tree.features.items():
+        app_tree.features[_fid(feature_id)] = replace(
+            feature,
+            feature_id=_fid(feature_id),
+            parent_feature_id=_fid(feature.parent_feature_id) if feature.parent_feature_id else app_tree.root_feature_id,
+            states=list(feature.states),
+            sub_features=[_fid(sub_id) for sub_id in feature.sub_features]
+        )
+        app_tree.index_feature(_fid(feature_id))
+    app_tree.features[app_tree.root_feature_id].sub_features.append(_fid(tree.root_feature_id))
+
+    for state_id, state in tree.states.items():
+        existing = app_tree.states.get(state_id)
+        if existing is None:
+            app_tree.states[state_id] = replace(
+                state,
+                path_from_root=[_step(step) for step in state.path_from_root],
+                reachable_states=list(state.reachable_states)
+            )
+        else:
+            for reachable in state.reachable_states:
+                if reachable not in existing.reachable_states:
+                    existing.reachable_states.append(reachable)
+
+    for step_id, step in tree.steps.items():
+        app_tree.steps[_fid(step_id)] = _step(step)
+
+    for from_state, to_state, step_id in tree.state_transitions:
+        app_tree.record_transition(from_state, to_state, _fid(step_id))
+
+
+class MultiDeviceExplorationScheduler:
+    """多设备并行探索调度器
+
+    用法：
+        scheduler = MultiDeviceExplorationScheduler(ExplorerConfig.from_env())
+        report = await scheduler.run(targets)
+    """
+
+    def __init__(self, config: ExplorerConfig, serials: Optional[List[str]] = None, max_attempts: int = 2):
+        """
+        Args:
+            config: Explorer配置（device_id 会被调度器按设备覆盖）
+            serials: 参与调度的设备序列号，为None时使用所有已连接的设备
+            max_attempts: 单个任务的最大尝试次数（设备故障时重新入队）
+        """
+        self.config = config
+        self.max_attempts = max_attempts
+        registered = DeviceManager.register(serials)
+        self.serials = registered if serials is None else list(serials)
+
+        self.batch_dir = config.output_dir / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+
+        self.app_trees: Dict[str, FeatureTree] = {}
+        self.records: List[JobRecord] = []
+        self._active_explorers: Dict[str, FairyExplorer] = {}
+
+        logger.info(f"调度器初始化完成，设备: {self.serials}，批次目录: {self.batch_dir}")
+
+    def _register_signal_handlers(self):
+        """中断时保存所有正在运行的探索的功能树与已合并的应用功能树"""
+        def signal_handler(signum, frame):
+            logger.warning(f"收到信号 {signal.Signals(signum).name}，正在保存所有设备的探索数据...")
+            for explorer in list(self._active_explorers.values()):
+                explorer._save_feature_tree(reason="调度器中断")
+            self._save_app_trees()
+            import sys
+            sys.exit(0)
+
+        signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGTERM, signal_handler)
+
+    def _get_app_tree(self, target: ExplorationTarget) -> FeatureTree:
+        if target.app_package not in self.app_trees:
+            root = FeatureNode(
+                feature_id="root",
+                feature_name=target.app_name,
+                feature_description=target.app_description,
+                parent_feature_id=None
+            )
+            self.app_trees[target.app_package] = FeatureTree(root_feature_id="root", features={"root": root})
+        return self.app_trees[target.app_package]
+
+    def _save_app_trees(self):
+        for app_package, tree in self.app_trees.items():
+            tree.save_to_file_compressed(self.batch_dir / app_package / "feature_tree.json")
+
+    async def _run_job(self, serial: str, job: ExplorationJob) -> Tuple[ExplorationResult, Optional[FeatureTree]]:
+        """在指定设备上执行一个探索任务（不合并功能树，由调用方只合并最终记录的那次尝试）
+
+        Returns:
+            Tuple[ExplorationResult, Optional[FeatureTree]]: (探索结果, 本次探索的功能树)
+        """
+        config = replace(
+            self.config,
+            device_id=serial,
+            output_dir=self.batch_dir / job.target.app_package
+        )
+        explorer = FairyExplorer(
+            config,
+            session_name=f"{job.job_id}_{serial.replace(':', '_')}_try{job.attempts}",
+            register_signal_handlers=False
+        )
+        self._active_explorers[serial] = explorer
+        try:
+            result = await explorer.explore(job.target)
+        finally:
+            self._active_explorers.pop(serial, None)
+
+        if explorer.feature_tree_builder is None:
+            return result, None
+        return result, explorer.feature_tree_builder.tree
+
+    async def _worker(self, serial: str, queue: asyncio.Queue):
+        """单台设备的工作循环：领取任务 → 租用设备 → 探索 → 归还设备"""
+        while True:
+            job: ExplorationJob = await queue.get()
+            job.attempts += 1
+            job.device_history.append(serial)
+            t0 = time.time()
+            device_failed = False
+            record = None
+            tree = None
+
+            try:
+                await DeviceManager.acquire(serial)
+            except Exception as e:
+                # 设备无法连接：任务重新入队，本设备退出调度
+                logger.error(f"设备 {serial} 不可用，退出调度: {e}")
+                job.attempts -= 1
+                await queue.put(job)
+                queue.task_done()
+                return
+
+            try:
+                logger.info(f"[{serial}] 开始任务 {job.job_id}: {job.target.app_name} - {job.target.feature_to_explore}（第{job.attempts}次尝试）")
+                result, tree = await self._run_job(serial, job)
+                record = JobRecord(
+                    job_id=job.job_id,
+                    app_package=job.target.app_package,
+                    feature=job.target.feature_to_explore,
+                    device=serial,
+                    attempts=job.attempts,
+                    success=result.success,
+                    total_steps=result.total_steps,
+                    states_discovered=len(tree.states) if tree is not None else 0,
+                    elapsed=time.time() - t0,
+                    output_dir=result.output_dir,
+                    error=result.error
+                )
+                # 探索失败时区分设备故障与任务本身失败
+                if not result.success:
+                    device_failed = not await asyncio.to_thread(DeviceManager.check_health, serial)
+            except Exception as e:
+                logger.error(f"[{serial}] 任务 {job.job_id} 异常: {e}")
+                device_failed = True
+                record = JobRecord(
+                    job_id=job.job_id,
+                    app_package=job.target.app_package,
+                    feature=job.target.feature_to_explore,
+                    device=serial,
+                    attempts=job.attempts,
+                    success=False,
+                    elapsed=time.time() - t0,
+                    error=str(e)
+                )
+            finally:
+                await DeviceManager.release(serial, failed=device_failed)
+
+            if device_failed and job.attempts < self.max_attempts:
+                logger.warning(f"[{serial}] 设备故障，任务 {job.job_id} 重新入队")
+                await queue.put(job)
+            else:
+                # ⭐ 只合并最终记录的尝试：重新入队的失败尝试不进入应用级功能树，避免重复的功能节点与转换计数
+                if tree is not None:
+                    merge_feature_tree(self._get_app_tree(job.target), tree, job.job_id)
+                self.records.append(record)
+                logger.info(f"[{serial}] 任务 {job.job_id} 结束: success={record.success}, steps={record.total_steps}")
+            queue.task_done()
+
+    async def run(self, targets: List[ExplorationTarget]) -> BatchReport:
+        """并行执行一批探索目标
+
+        Args:
+            targets: 探索目标列表（应用 × 功能）
+
+        Returns:
+            BatchReport: 批次报告
+        """
+        if not self.serials:
+            raise RuntimeError("没有可用设备")
+
+        self._register_signal_handlers()
+        started_at = datetime.now().isoformat()
+        t0 = time.time()
+
+        queue = asyncio.Queue()
+        for idx, target in enumerate(targets):
+            queue.put_nowait(ExplorationJob(job_id=f"job_{idx + 1:03d}", target=target))
+
+        workers = [asyncio.create_task(self._worker(serial, queue)) for serial in self.serials]
+        join_task = asyncio.create_task(queue.join())
+
+        # 等待队列清空；若所有设备都已退出调度，剩余任务记为失败
+        while not join_task.done():
+            await asyncio.wait([join_task, *[w for w in workers if not w.done()]], return_when=asyncio.FIRST_COMPLETED)
+            if not join_task.done() and all(w.done() for w in workers):
+                while not queue.empty():
+                    job = queue.get_nowait()
+                    self.records.append(JobRecord(
+                        job_id=job.job_id,
+                        app_package=job.target.app_package,
+                        feature=job.target.feature_to_explore,
+                        device=None,
+                        attempts=job.attempts,
+                        success=False,
+                        error="No healthy device available"
+                    ))
+                    queue.task_done()
+                await join_task
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        self._save_app_trees()
+        report = BatchReport(
+            started_at=started_at,
+            wall_time=time.time() - t0,
+            devices=self.serials,
+            jobs=sorted(self.records, key=lambda record: record.job_id),
+            states_per_app={app: len(tree.states) for app, tree in self.app_trees.items()}
+        )
+        report.save_to_file(self.batch_dir / "batch_report.json")
+        logger.success(str(report))
+        return report
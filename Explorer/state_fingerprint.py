@@ -0,0 +1,190 @@
+"""
+页面结构指纹
+
+从内存中的UI层次结构提取"骨架"特征（忽略文本）：
+- 路径特征：每个节点及其最近两层祖先的 class/resource-id 路径
+- 布局特征：可交互节点（可点击/可滚动/可长按）中心点所在的网格单元
+
+基于特征集合计算精确摘要（默认的 state_id 后缀，只有骨架完全相同的页面才相同）、SimHash（64位）
+与 MinHash 签名（估计 Jaccard 相似度）；启用模糊合并时用 LSH 分桶索引在亚线性时间内找到相似的已知状态。
+"""
+
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# 布局网格划分（列 x 行）
+GRID_COLS = 6
+GRID_ROWS = 12
+# 路径特征包含的祖先层数
+PATH_ANCESTORS = 2
+
+INTERACTIVE_ATTRS = ("clickable", "scrollable", "long-clickable")
+BOUNDS_PATTERN = re.compile(r'\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]')
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _node_token(node) -> str:
+    class_name = (node.get('class') or '').split('.')[-1]
+    resource_id = (node.get('resource-id') or '').split('/')[-1]
+    return f"{class_name}#{resource_id}" if resource_id else class_name
+
+
+def _parse_bounds(bounds: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+    match = BOUNDS_PATTERN.match(bounds or '')
+    return tuple(int(v) for v in match.groups()) if match else None
+
+
+def extract_skeleton_features(root, screen_size: Optional[Tuple[int, int]] = None) -> FrozenSet[str]:
+    """提取层次结构的骨架特征集合（不包含文本，列表项数量变化只影响少量特征）
+
+    Args:
+        root: 层次结构根节点（ElementTree，<hierarchy>）
+        screen_size: 屏幕宽高，用于布局网格；不指定时取顶层节点 bounds 的范围
+
+    Returns:
+        FrozenSet[str]: 特征集合
+    """
+    if screen_size is None:
+        right = bottom = 0
+        for top_node in root.findall('node'):
+            bounds = _parse_bounds(top_node.get('bounds'))
+            if bounds:
+                right, bottom = max(right, bounds[2]), max(bottom, bounds[3])
+        screen_size = (right, bottom)
+    width, height = max(screen_size[0], 1), max(screen_size[1], 1)
+
+    features: Set[str] = set()
+    stack = [(child, ()) for child in reversed(root.findall('node'))]
+    while stack:
+        node, ancestors = stack.pop()
+        token = _node_token(node)
+        path = ancestors + (token,)
+        features.add("p:" + "/".join(path))
+
+        if any(node.get(attr) == "true" for attr in INTERACTIVE_ATTRS):
+            bounds = _parse_bounds(node.get('bounds'))
+            if bounds:
+                center_x, center_y = (bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2
+                col = min(max(int(center_x * GRID_COLS / width), 0), GRID_COLS - 1)
+                row = min(max(int(center_y * GRID_ROWS / height), 0), GRID_ROWS - 1)
+                features.add(f"g:{col}:{row}:{token}")
+
+        child_ancestors = path[-PATH_ANCESTORS:]
+        stack.extend((child, child_ancestors) for child in reversed(node.findall('node')))
+    return frozenset(features)
+
+
+def simhash(features: Iterable[str], bits: int = 64) -> int:
+    """SimHash：相似的特征集合得到汉明距离小的指纹"""
+    weights = [0] * bits
+    for feature in features:
+        h = _hash64(feature)
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, weight in enumerate(weights) if weight > 0)
+
+
+def feature_digest(features: Iterable[str]) -> str:
+    """特征集合的精确摘要（与顺序无关，8位十六进制）"""
+    return hashlib.md5("\n".join(sorted(features)).encode('utf-8')).hexdigest()[:8]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class MinHasher:
+    """MinHash 签名生成器（固定种子，签名在不同进程/会话间可比较）"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [_hash64(feature) for feature in features]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._params)
+
+
+def estimate_jaccard(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """由两个 MinHash 签名估计 Jaccard 相似度"""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+@dataclass(frozen=True)
+class StateFingerprint:
+    """一个页面的结构指纹"""
+    simhash: int
+    minhash: Tuple[int, ...]
+    feature_count: int
+    digest: str = ""  # 特征集合的精确摘要（精确匹配时的 state_id 后缀）
+
+    @property
+    def short_hash(self) -> str:
+        """SimHash 高32位的8位十六进制（模糊合并时的 state_id 后缀）"""
+        return f"{self.simhash >> 32:08x}"
+
+
+class StateLSHIndex:
+    """MinHash LSH 索引：签名按 band 分桶，查询只比较落在同一桶中的候选状态
+
+    Attributes:
+        threshold: 判定为同一状态的最低相似度
+        bands: band 数（bands * rows = num_perm）
+    """
+
+    def __init__(self, threshold: float = 1.0, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: Dict[Tuple, Set[str]] = {}
+        self._entries: Dict[str, Tuple[str, StateFingerprint]] = {}  # {state_id: (分区, 指纹)}
+
+    def _band_keys(self, partition: str, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield partition, band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, state_id: str, fingerprint: StateFingerprint, partition: str = ""):
+        """加入一个状态
+
+        Args:
+            state_id: 状态ID
+            fingerprint: 状态指纹
+            partition: 分区（如 Activity），不同分区的状态不会相互匹配
+        """
+        self._entries[state_id] = (partition, fingerprint)
+        for key in self._band_keys(partition, fingerprint.minhash):
+            self._buckets.setdefault(key, set()).add(state_id)
+
+    def query(self, fingerprint: StateFingerprint, partition: str = "") -> Optional[Tuple[str, float]]:
+        """查找最相似的已知状态
+
+        Returns:
+            Optional[Tuple[str, float]]: (状态ID, 估计相似度)，没有达到阈值的候选时返回 None
+        """
+        candidates: Set[str] = set()
+        for key in self._band_keys(partition, fingerprint.minhash):
+            candidates |= self._buckets.get(key, set())
+
+        best = None
+        for state_id in candidates:
+            similarity = estimate_jaccard(fingerprint.minhash, self._entries[state_id][1].minhash)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (state_id, similarity)
+        return best
+
+    def __len__(self):
+        return len(self._entries)
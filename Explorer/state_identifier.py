@@ -7,6 +7,12 @@ State识别器
 import hashlib
 import json
 from typing import Optional
+
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
+
+from .state_fingerprint import (
+    MinHasher, StateFingerprint, StateLSHIndex, extract_skeleton_features, feature_digest, simhash
+)
 from .logger import get_logger
 
 logger = get_logger("StateIdentifier")
@@ -15,15 +21,33 @@ logger = get_logger("StateIdentifier")
 class StateIdentifier:
     """State识别器
 
-    根据Activity和UI结构识别页面状态
+    根据Activity和UI结构识别页面状态：从内存中的层次结构提取骨架特征（class/resource-id路径、
+    可交互元素的布局网格，不含文本）。默认只有骨架完全相同的页面才是同一状态（state_id 由特征集合的
+    精确摘要生成，与发现顺序无关，不同设备上同一页面得到相同的 state_id）；相似度阈值小于 1.0 时
+    启用模糊合并，通过 MinHash LSH 索引将新页面匹配到相似度达到阈值的已知状态
 
     Attributes:
-        state_cache: 已识别的state_id缓存
+        state_cache: 已识别的状态 {state_id: StateFingerprint}
+        similarity_threshold: 判定为同一状态的最低结构相似度（估计的 Jaccard 相似度）
     """
 
-    def __init__(self):
-        self.state_cache = {}  # {state_id: ui_hash}
-        logger.info("StateIdentifier初始化完成")
+    def __init__(self, similarity_threshold: float = 1.0, num_perm: int = 64, bands: int = 16):
+        """
+        Args:
+            similarity_threshold: 判定为同一状态的最低相似度（1.0 表示只合并骨架完全相同的页面，小于 1.0 启用模糊合并）
+            num_perm: MinHash 签名长度
+            bands: LSH 分桶的 band 数
+        """
+        self.state_cache = {}  # {state_id: StateFingerprint}
+        self.similarity_threshold = similarity_threshold
+        self._minhasher = MinHasher(num_perm)
+        self._index = StateLSHIndex(similarity_threshold, num_perm, bands)
+        logger.info(f"StateIdentifier初始化完成（相似度阈值: {similarity_threshold}）")
+
+    @property
+    def fuzzy_matching(self) -> bool:
+        """是否启用模糊合并（阈值小于 1.0）"""
+        return self.similarity_threshold < 1.0
 
     def identify_state(self, screen_info, perception_output) -> str:
         """识别State，返回state_id
@@ -39,21 +63,77 @@ class StateIdentifier:
         activity = screen_info.current_activity_info.activity
         activity_short = self._shorten_activity(activity)
 
-        # 生成UI结构哈希
-        ui_hash = self._hash_ui_structure(perception_output)
-
-        # 生成state_id
-        state_id = f"state_{activity_short}_{ui_hash}"
-
-        # 检查是否是新状态
+        # ⭐ 生成UI结构指纹
+        fingerprint = self._fingerprint_ui_structure(screen_info, perception_output)
+        if fingerprint is None:
+            # 无法获取层次结构时退回文本哈希（确定性，不会把同一页面拆成多个状态）
+            text_hash = self._hash_ui_structure(perception_output)
+            if text_hash is None:
+                return self._unidentified_state_id(activity_short, perception_output)
+            state_id = f"state_{activity_short}_{text_hash}"
+            if state_id not in self.state_cache:
+                self.state_cache[state_id] = None
+                logger.info(f"发现新状态: {state_id}（文本哈希）")
+            return state_id
+
+        # ⭐ 精确匹配：骨架完全相同即同一状态
+        if not self.fuzzy_matching:
+            state_id = f"state_{activity_short}_{fingerprint.digest}"
+            if state_id not in self.state_cache:
+                self.state_cache[state_id] = fingerprint
+                logger.info(f"发现新状态: {state_id}（{fingerprint.feature_count} 个结构特征）")
+            else:
+                logger.debug(f"状态已存在: {state_id}")
+            return state_id
+
+        # ⭐ 模糊合并：在同一Activity的已知状态中查找结构相似的状态
+        match = self._index.query(fingerprint, partition=activity_short)
+        if match is not None:
+            state_id, similarity = match
+            logger.debug(f"状态已存在: {state_id}（结构相似度 {similarity:.2f}）")
+            return state_id
+
+        state_id = f"state_{activity_short}_{fingerprint.short_hash}"
         if state_id not in self.state_cache:
-            self.state_cache[state_id] = ui_hash
-            logger.info(f"发现新状态: {state_id}")
+            self.state_cache[state_id] = fingerprint
+            self._index.add(state_id, fingerprint, partition=activity_short)
+            logger.info(f"发现新状态: {state_id}（{fingerprint.feature_count} 个结构特征）")
         else:
             logger.debug(f"状态已存在: {state_id}")
 
         return state_id
 
+    def _fingerprint_ui_structure(self, screen_info, perception_output) -> Optional[StateFingerprint]:
+        """基于内存中的层次结构生成结构指纹（同一帧的解析结果与特征在 ParsedHierarchy 上缓存）
+
+        Args:
+            screen_info: ScreenInfo对象（perception_infos 上带有共享的解析结果或原始XML）
+            perception_output: PerceptionOutput对象（没有解析结果时读取原始XML）
+
+        Returns:
+            StateFingerprint，无法获取层次结构时返回None
+        """
+        perception_infos = getattr(screen_info, 'perception_infos', None)
+        try:
+            hierarchy = getattr(perception_infos, 'hierarchy', None)
+            if hierarchy is None:
+                ui_xml = perception_infos.infos[0] if perception_infos is not None else perception_output.read_text('xml')
+                hierarchy = ParsedHierarchy.of(ui_xml)
+            screen_size = None
+            if perception_infos is not None and perception_infos.width and perception_infos.height:
+                screen_size = (perception_infos.width, perception_infos.height)
+            features = hierarchy.derive("state_skeleton", lambda h: extract_skeleton_features(h.root, screen_size))
+        except Exception as e:
+            logger.warning(f"UI结构指纹生成失败: {e}")
+            return None
+
+        return StateFingerprint(
+            simhash=simhash(features),
+            minhash=self._minhasher.signature(features),
+            feature_count=len(features),
+            digest=feature_digest(features)
+        )
+
     def _shorten_activity(self, activity: str) -> str:
         """缩短Activity名称
 
@@ -71,35 +151,50 @@ class StateIdentifier:
             return short_name.lower()
         return activity.lower()
 
-    def _hash_ui_structure(self, perception_output) -> str:
-        """基于UI结构生成哈希
-
-        使用压缩后的XML来生成哈希，过滤动态内容
+    def _unidentified_state_id(self, activity_short: str, perception_output) -> str:
+        """无法识别的页面：生成不与任何其他页面合并的状态ID（带 unidentified 标记）
 
         Args:
-            perception_output: PerceptionOutput对象
+            activity_short: 简化的Activity名称
+            perception_output: PerceptionOutput对象（使用其时间戳）
 
         Returns:
-            8位哈希值
+            state_id: 格式为 "state_<activity>_unidentified_<timestamp>"
         """
-        try:
-            # 读取压缩后的文本描述（已经过滤了大部分动态内容）
-            with open(perception_output.compressed_txt_path, 'r', encoding='utf-8') as f:
-                ui_text = f.read()
+        timestamp = getattr(perception_output, 'timestamp', None) or "unknown"
+        state_id = f"state_{activity_short}_unidentified_{timestamp}"
+        suffix = 1
+        while state_id in self.state_cache:
+            suffix += 1
+            state_id = f"state_{activity_short}_unidentified_{timestamp}_{suffix}"
+        self.state_cache[state_id] = None
+        logger.warning(f"无法识别页面结构，使用独立的状态ID: {state_id}")
+        return state_id
 
-            # 进一步过滤：移除数字（可能是动态的计数、时间等）
-            # 保留结构和文本标签
-            filtered_text = self._filter_dynamic_content(ui_text)
+    def _hash_ui_structure(self, perception_output) -> Optional[str]:
+        """基于压缩文本生成哈希（无法获取层次结构时的兜底方式）
 
-            # 计算哈希
-            hash_obj = hashlib.md5(filtered_text.encode('utf-8'))
-            return hash_obj.hexdigest()[:8]
+        Args:
+            perception_output: PerceptionOutput对象
 
+        Returns:
+            8位哈希值，无法读取压缩文本或文本为空时返回None（不能用空文本的哈希代表页面）
+        """
+        try:
+            # 读取压缩后的文本描述（已经过滤了大部分动态内容，优先使用内存中的内容）
+            ui_text = perception_output.read_text('compressed_txt')
         except Exception as e:
             logger.warning(f"UI哈希生成失败: {e}")
-            # 兜底：使用时间戳
-            import time
-            return hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
+            return None
+        if not ui_text or not ui_text.strip():
+            return None
+
+        # 进一步过滤：移除数字（可能是动态的计数、时间等）
+        # 保留结构和文本标签
+        filtered_text = self._filter_dynamic_content(ui_text)
+
+        # 计算哈希
+        return hashlib.md5(filtered_text.encode('utf-8')).hexdigest()[:8]
 
     def _filter_dynamic_content(self, ui_text: str) -> str:
         """过滤动态内容
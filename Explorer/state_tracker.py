@@ -4,12 +4,16 @@
 负责记录执行路径、保存状态快照、维护导航历史
 """
 
+import asyncio
 import json
 import shutil
+from dataclasses import replace
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
 
+from shared import BlobStore
+
 from .entities import (
     ExplorationStep,
     ExecutionSnapshot,
@@ -28,18 +32,21 @@ class StateTracker:
 
     Attributes:
         output_dir: 输出根目录
+        blob_store: 内容寻址存储（可选），步骤目录中的产物以 blob 硬链接的方式保存
         execution_history: 执行历史列表
         navigation_path: 导航路径（页面名称列表）
         step_counter: 步骤计数器
     """
 
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, blob_store: Optional[BlobStore] = None):
         """
         Args:
             output_dir: 输出根目录
+            blob_store: 内容寻址存储，不指定时直接写文件/复制文件
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.blob_store = blob_store
 
         self.execution_history: List[ExecutionSnapshot] = []
         self.navigation_path: List[str] = ["首页"]
@@ -50,6 +57,35 @@ class StateTracker:
 
         logger.info(f"StateTracker初始化，输出目录: {self.output_dir}")
 
+    def _create_step_artifact_dirs(self, step_id: str):
+        """创建步骤目录及其 stable/、immediate/ 子目录
+
+        Returns:
+            Tuple[Path, Path, Path]: (步骤目录, stable目录, immediate目录)
+        """
+        step_dir = self.create_step_output_dir(step_id)
+        stable_dir = step_dir / "stable"
+        immediate_dir = step_dir / "immediate"
+        stable_dir.mkdir(exist_ok=True)
+        immediate_dir.mkdir(exist_ok=True)
+        return step_dir, stable_dir, immediate_dir
+
+    def bind_step_outputs(self, step_id: str, perception_output: PerceptionOutput) -> Path:
+        """为感知输出的内存产物预先指定步骤目录中的最终路径（不写文件）
+
+        之后 Planner 保存的 prompt、功能树中的路径都直接指向步骤目录，record_step 时写出
+
+        Args:
+            step_id: 步骤ID
+            perception_output: 感知输出
+
+        Returns:
+            步骤输出目录路径
+        """
+        step_dir, stable_dir, immediate_dir = self._create_step_artifact_dirs(step_id)
+        perception_output.bind(stable_dir, immediate_dir)
+        return step_dir
+
     def create_step_output_dir(self, step_id: str) -> Path:
         """为步骤创建输出目录
 
@@ -67,91 +103,67 @@ class StateTracker:
         self,
         step: ExplorationStep,
         perception_output: PerceptionOutput,
-        executor_result: dict
+        executor_result: dict,
+        navigation_path: Optional[List[str]] = None
     ) -> ExecutionSnapshot:
         """记录一步的执行状态
 
-        将Perceptor输出的所有文件复制到步骤目录（包括双截图），并保存执行结果
+        将感知产物保存到步骤目录（包括双截图）：内存产物直接写出，已落盘的文件复制过去，并保存执行结果。
+        文件读写在线程中执行，不阻塞事件循环
 
         Args:
             step: 执行的步骤
             perception_output: Perceptor输出（包含双截图信息）
             executor_result: Executor执行结果（ExecutionOutput.to_dict()）
+            navigation_path: 该步骤时的导航路径（后台记录时由调用方提前取快照），默认取当前路径
 
         Returns:
             ExecutionSnapshot: 执行快照
         """
+        if navigation_path is None:
+            navigation_path = self.navigation_path.copy()
+        return await asyncio.to_thread(self._record_step, step, perception_output, executor_result, navigation_path)
+
+    def _record_step(
+        self,
+        step: ExplorationStep,
+        perception_output: PerceptionOutput,
+        executor_result: dict,
+        navigation_path: List[str]
+    ) -> ExecutionSnapshot:
         self.step_counter += 1
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         logger.info(f"记录步骤: {step.step_id}")
 
-        # 1. 创建步骤输出目录结构
-        step_dir = self.create_step_output_dir(step.step_id)
-
-        # ⭐ 创建 immediate 和 stable 子目录
-        immediate_dir = step_dir / "immediate"
-        stable_dir = step_dir / "stable"
-        immediate_dir.mkdir(exist_ok=True)
-        stable_dir.mkdir(exist_ok=True)
-
-        # 2. 复制稳定截图（5秒）到 stable/ 目录
-        stable_files = {
-            'screenshot': perception_output.screenshot_path,
-            'marked_screenshot': perception_output.marked_screenshot_path,
-            'xml': perception_output.xml_path,
-            'compressed_xml': perception_output.compressed_xml_path,
-            'compressed_txt': perception_output.compressed_txt_path,
-            'som_mapping': perception_output.som_mapping_path
-        }
-
-        for file_type, src_path in stable_files.items():
-            if src_path and Path(src_path).exists():
-                dst_path = stable_dir / Path(src_path).name
-                shutil.copy2(src_path, dst_path)
-                logger.debug(f"复制稳定截图文件: stable/{Path(src_path).name}")
+        # 1. 创建步骤输出目录结构（stable/ 与 immediate/ 子目录）
+        step_dir, stable_dir, immediate_dir = self._create_step_artifact_dirs(step.step_id)
+
+        # 2. 内存中的产物直接写入步骤目录（每个文件只写一次，不再经过临时目录复制）
+        perception_output.materialize(stable_dir, immediate_dir, blob_store=self.blob_store)
+
+        # 3. 仅存在于磁盘上的产物（如由Perceptor/Executor落盘的文件）复制到步骤目录
+        #    使用 blob store 时以硬链接引用，与Executor输出目录中的同一张截图共享存储
+        copied_paths = {}
+        for name in PerceptionOutput.ARTIFACTS:
+            src_path = getattr(perception_output, f"{name}_path")
+            if perception_output.is_in_memory(name) or not src_path:
+                continue
+            target_dir = immediate_dir if name.startswith('immediate_') else stable_dir
+            dst_path = target_dir / Path(src_path).name
+            copied_paths[f"{name}_path"] = str(dst_path)
+            if Path(src_path).exists() and Path(src_path).resolve() != dst_path.resolve():
+                if self.blob_store is not None:
+                    self.blob_store.store_file(src_path, dst_path)
+                else:
+                    shutil.copy2(src_path, dst_path)
+                logger.debug(f"复制文件: {target_dir.name}/{dst_path.name}")
 
-        # ⭐ 3. 复制立刻截图（0.2秒）到 immediate/ 目录（完整文件）
-        has_immediate = False
         if perception_output.immediate_screenshot_path:
-            immediate_files = {
-                'immediate_screenshot': perception_output.immediate_screenshot_path,
-                'immediate_marked_screenshot': perception_output.immediate_marked_screenshot_path,
-                'immediate_xml': perception_output.immediate_xml_path,
-                'immediate_compressed_xml': perception_output.immediate_compressed_xml_path,
-                'immediate_compressed_txt': perception_output.immediate_compressed_txt_path,
-                'immediate_som_mapping': perception_output.immediate_som_mapping_path
-            }
-
-            for file_type, src_path in immediate_files.items():
-                if src_path and Path(src_path).exists():
-                    dst_path = immediate_dir / Path(src_path).name
-                    shutil.copy2(src_path, dst_path)
-                    logger.debug(f"复制立刻截图文件: immediate/{Path(src_path).name}")
-                    has_immediate = True
-
-            if has_immediate:
-                logger.info(f"✓ 双截图已保存: immediate/ 和 stable/（包含完整的SoM标记文件）")
-
-        # 4. 构建更新后的 PerceptionOutput（指向新位置）
-        # stable文件路径
-        copied_perception = PerceptionOutput(
-            screenshot_path=str(stable_dir / Path(perception_output.screenshot_path).name),
-            marked_screenshot_path=str(stable_dir / Path(perception_output.marked_screenshot_path).name),
-            xml_path=str(stable_dir / Path(perception_output.xml_path).name),
-            compressed_xml_path=str(stable_dir / Path(perception_output.compressed_xml_path).name),
-            compressed_txt_path=str(stable_dir / Path(perception_output.compressed_txt_path).name),
-            som_mapping_path=str(stable_dir / Path(perception_output.som_mapping_path).name),
-            timestamp=perception_output.timestamp,
-            screen_size=perception_output.screen_size,
-            # immediate文件路径
-            immediate_screenshot_path=str(immediate_dir / Path(perception_output.immediate_screenshot_path).name) if perception_output.immediate_screenshot_path else None,
-            immediate_marked_screenshot_path=str(immediate_dir / Path(perception_output.immediate_marked_screenshot_path).name) if perception_output.immediate_marked_screenshot_path else None,
-            immediate_xml_path=str(immediate_dir / Path(perception_output.immediate_xml_path).name) if perception_output.immediate_xml_path else None,
-            immediate_compressed_xml_path=str(immediate_dir / Path(perception_output.immediate_compressed_xml_path).name) if perception_output.immediate_compressed_xml_path else None,
-            immediate_compressed_txt_path=str(immediate_dir / Path(perception_output.immediate_compressed_txt_path).name) if perception_output.immediate_compressed_txt_path else None,
-            immediate_som_mapping_path=str(immediate_dir / Path(perception_output.immediate_som_mapping_path).name) if perception_output.immediate_som_mapping_path else None
-        )
+            logger.info(f"✓ 双截图已保存: immediate/ 和 stable/（包含完整的SoM标记文件）")
+
+        # 4. 构建指向步骤目录的 PerceptionOutput（内存产物已写在步骤目录中）
+        copied_perception = replace(perception_output, **copied_paths) if copied_paths else perception_output
 
         # 5. 保存Executor结果
         executor_result_path = step_dir / "executor_result.json"
@@ -164,7 +176,7 @@ class StateTracker:
             timestamp=timestamp,
             perception_output=copied_perception,
             executor_result=executor_result,
-            navigation_path=self.navigation_path.copy(),
+            navigation_path=navigation_path,
             step_output_dir=str(step_dir)
         )
 
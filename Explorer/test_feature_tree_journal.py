@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+测试功能树增量持久化（FeatureTreeJournal / load_feature_tree）
+
+在临时目录中驱动一个挂载了事件日志的功能树构建器，验证"快照 + 重放事件"恢复出的功能树与内存中的一致
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from Explorer.entities import PerceptionOutput
+from Explorer.feature_tree_builder import FeatureTreeBuilder
+from Explorer.feature_tree_journal import EVENTS_FILENAME, FeatureTreeJournal, load_feature_tree
+
+
+def make_perception_output(name: str) -> PerceptionOutput:
+    return PerceptionOutput(
+        screenshot_path=f"captures/{name}/screenshot.jpeg", marked_screenshot_path=f"captures/{name}/marked.jpeg",
+        xml_path=f"captures/{name}/ui.xml", compressed_xml_path=f"captures/{name}/compressed.xml",
+        compressed_txt_path=f"captures/{name}/compressed.txt", som_mapping_path=f"captures/{name}/som.json",
+        timestamp="20260101_000000", screen_size=(1080, 2400)
+    )
+
+
+def add_state(builder, step: int, state_id: str, feature_path):
+    builder.add_state(
+        state_id=state_id, state_name=f"{state_id}_page", activity_name=".MainActivity",
+        perception_output=make_perception_output(state_id), feature_path=feature_path,
+        step_id=f"step_{step}", instruction=f"第{step}步", actions=[{'name': 'Tap', 'arguments': {'x': step, 'y': step}}],
+        success=True
+    )
+
+
+def explore(session_dir: Path, snapshot_interval: int) -> FeatureTreeBuilder:
+    """模拟一次探索：每步一个修改并提交，结束时不写最终快照（相当于进程在此时中断）"""
+    journal = FeatureTreeJournal(session_dir, snapshot_interval=snapshot_interval)
+    builder = FeatureTreeBuilder("设置", "探索设置功能", journal=journal)
+    builder.initialize_from_plan({'sub_features': [{'name': "显示", 'description': "显示设置"}, {'name': "声音"}]})
+    journal.commit_step(builder)
+
+    add_state(builder, 1, "state_main_a", ["设置"])
+    journal.commit_step(builder)
+    add_state(builder, 2, "state_display_b", ["设置", "显示"])
+    journal.commit_step(builder)
+    add_state(builder, 3, "state_main_a", ["设置"])  # 回到已知状态：只记录转换
+    builder.update_feature_structure({'action': 'rename', 'details': {'rename_from': "声音", 'rename_to': "声音与振动"}}, "step_3")
+    journal.commit_step(builder)
+    add_state(builder, 4, "state_sound_c", ["设置", "声音与振动"])
+    builder.update_feature_structure({'action': 'add_new', 'details': {'new_feature': {'name': "铃声", 'parent_path': ["设置", "声音与振动"]}}}, "step_4")
+    journal.commit_step(builder)
+    builder.mark_feature_completed(["设置", "显示"], "step_5")
+    add_state(builder, 5, "state_ringtone_d", ["设置", "声音与振动", "铃声"])
+    journal.commit_step(builder)
+
+    journal.close()
+    return builder
+
+
+def normalized(data):
+    """经过一次 JSON 往返，消除 tuple/list 等表示差异"""
+    return json.loads(json.dumps(data, ensure_ascii=False))
+
+
+def assert_same_builder(recovered: FeatureTreeBuilder, live: FeatureTreeBuilder):
+    assert normalized(recovered.tree.to_dict_compressed()) == normalized(live.tree.to_dict_compressed())
+    assert [step.step_id for step in recovered.current_path] == [step.step_id for step in live.current_path]
+    assert recovered.previous_state_id == live.previous_state_id
+    assert recovered.feature_update_log == live.feature_update_log
+    # 增量维护的索引也一致
+    assert recovered.tree.adjacency == live.tree.adjacency
+    assert recovered.tree.visit_counts == live.tree.visit_counts
+    assert recovered.tree.get_recent_states() == live.tree.get_recent_states()
+    assert recovered.tree.find_feature_id("声音与振动") == live.tree.find_feature_id("声音与振动")
+    assert recovered.tree.find_feature_id("声音") is None
+
+
+def test_replay_after_snapshot():
+    """快照之后还有事件：读取快照并只重放快照之后的事件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        session_dir = Path(tmp)
+        live = explore(session_dir, snapshot_interval=4)
+
+        snapshot = json.loads((session_dir / "feature_tree_snapshot.json").read_text(encoding='utf-8'))
+        recovered, seq = load_feature_tree(session_dir)
+        assert 0 < snapshot['seq'] < seq, "快照之后应还有未写入快照的事件"
+        assert len(snapshot['tree']['states']) < len(live.tree.states)
+        assert_same_builder(recovered, live)
+    print("✓ 快照 + 重放快照之后的事件")
+
+
+def test_replay_without_snapshot():
+    """没有快照：从空树重放全部事件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        session_dir = Path(tmp)
+        live = explore(session_dir, snapshot_interval=0)
+        assert not (session_dir / "feature_tree_snapshot.json").exists()
+
+        recovered, _ = load_feature_tree(session_dir)
+        assert_same_builder(recovered, live)
+    print("✓ 无快照时重放全部事件")
+
+
+def test_torn_final_line():
+    """最后一行只写了一半（进程在写日志时崩溃）：忽略该行，其余事件正常恢复"""
+    with tempfile.TemporaryDirectory() as tmp:
+        session_dir = Path(tmp)
+        live = explore(session_dir, snapshot_interval=4)
+        _, seq = load_feature_tree(session_dir)
+
+        with open(session_dir / EVENTS_FILENAME, 'a', encoding='utf-8') as f:
+            f.write(f'{{"seq":{seq + 1},"op":"add_transition","from":"state_ringtone_d","to":"state_ma')
+
+        recovered, recovered_seq = load_feature_tree(session_dir)
+        assert recovered_seq == seq
+        assert_same_builder(recovered, live)
+    print("✓ 末尾写了一半的事件被忽略")
+
+
+def main():
+    test_replay_after_snapshot()
+    test_replay_without_snapshot()
+    test_torn_final_line()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+测试状态识别（StateLSHIndex / StateIdentifier）
+
+使用手写的层次结构 XML，无需连接设备
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from Explorer.entities import PerceptionOutput
+from Explorer.state_fingerprint import MinHasher, StateFingerprint, StateLSHIndex, feature_digest
+from Explorer.state_identifier import StateIdentifier
+
+
+def make_xml(rows, title="设置", clock="12:00"):
+    """列表页面：状态栏时钟 + 标题 + rows 个列表项"""
+    items = "".join(
+        f'<node class="android.widget.LinearLayout" resource-id="com.example:id/item" clickable="true" '
+        f'text="" bounds="[0,{300 + i * 150}][1080,{450 + i * 150}]">'
+        f'<node class="android.widget.TextView" resource-id="com.example:id/item_title" text="第{i}项" '
+        f'bounds="[40,{320 + i * 150}][800,{430 + i * 150}]"/></node>'
+        for i in range(rows)
+    )
+    return (
+        '<hierarchy rotation="0">'
+        '<node class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">'
+        f'<node class="android.widget.TextView" resource-id="com.android.systemui:id/clock" text="{clock}" bounds="[0,0][200,80]"/>'
+        f'<node class="android.widget.TextView" resource-id="com.example:id/title" text="{title}" bounds="[0,100][1080,250]"/>'
+        f'<node class="androidx.recyclerview.widget.RecyclerView" resource-id="com.example:id/list" scrollable="true" '
+        f'bounds="[0,280][1080,2400]">{items}</node>'
+        '</node></hierarchy>'
+    )
+
+
+def make_screen(ui_xml, activity="com.example.SettingsActivity"):
+    perception_infos = SimpleNamespace(infos=[ui_xml, "", []], width=1080, height=2400)
+    return SimpleNamespace(
+        perception_infos=perception_infos,
+        current_activity_info=SimpleNamespace(activity=activity)
+    )
+
+
+def make_perception_output(compressed_txt=""):
+    return PerceptionOutput.from_artifacts("20260101_000000", (1080, 2400), {
+        'compressed_txt': ("compressed.txt", compressed_txt)
+    })
+
+
+def make_fingerprint(minhasher, features):
+    return StateFingerprint(simhash=0, minhash=minhasher.signature(features), feature_count=len(features),
+                            digest=feature_digest(features))
+
+
+def test_lsh_query():
+    """StateLSHIndex.query：相似的签名命中、不相似的不命中、不同分区互不匹配"""
+    minhasher = MinHasher(64)
+    base = {f"p:f{i}" for i in range(100)}
+    similar = (base - {f"p:f{i}" for i in range(10)}) | {f"p:g{i}" for i in range(10)}  # Jaccard ≈ 0.82
+    different = {f"p:h{i}" for i in range(100)}
+
+    index = StateLSHIndex(threshold=0.7, num_perm=64, bands=16)
+    index.add("state_a", make_fingerprint(minhasher, base), partition="settings")
+    assert len(index) == 1
+
+    state_id, similarity = index.query(make_fingerprint(minhasher, base), partition="settings")
+    assert state_id == "state_a" and similarity == 1.0
+
+    match = index.query(make_fingerprint(minhasher, similar), partition="settings")
+    assert match is not None and match[0] == "state_a" and 0.7 <= match[1] < 1.0
+
+    assert index.query(make_fingerprint(minhasher, different), partition="settings") is None
+    assert index.query(make_fingerprint(minhasher, base), partition="main") is None
+
+    # 阈值为 1.0 时只有签名完全相同才命中
+    exact_index = StateLSHIndex(threshold=1.0)
+    exact_index.add("state_a", make_fingerprint(minhasher, base))
+    assert exact_index.query(make_fingerprint(minhasher, similar)) is None
+    assert exact_index.query(make_fingerprint(minhasher, base))[0] == "state_a"
+
+    try:
+        StateLSHIndex(num_perm=64, bands=10)
+        assert False, "num_perm 不能被 bands 整除时应抛出 ValueError"
+    except ValueError:
+        pass
+    print("✓ StateLSHIndex.query")
+
+
+def test_identify_exact():
+    """默认精确匹配：文本/时钟变化不影响 state_id，骨架变化得到新状态，不同 Activity 互不合并"""
+    identifier = StateIdentifier()
+    assert not identifier.fuzzy_matching
+    output = make_perception_output()
+
+    state_id = identifier.identify_state(make_screen(make_xml(5)), output)
+    assert state_id.startswith("state_settings_")
+    assert identifier.identify_state(make_screen(make_xml(5, title="Settings", clock="12:01")), output) == state_id
+
+    # 列表多一项：骨架不同，精确匹配下是新状态
+    assert identifier.identify_state(make_screen(make_xml(6)), output) != state_id
+    assert identifier.identify_state(make_screen(make_xml(5), activity="com.example.MainActivity"), output) != state_id
+    assert len(identifier.state_cache) == 3
+
+    # state_id 与发现顺序无关，不同实例（设备）上同一页面得到相同的 state_id
+    other = StateIdentifier()
+    other.identify_state(make_screen(make_xml(6)), output)
+    assert other.identify_state(make_screen(make_xml(5)), output) == state_id
+    print("✓ identify_state 精确匹配")
+
+
+def test_identify_fuzzy():
+    """阈值小于 1.0 时启用模糊合并：列表项数量的小变化合并到已知状态"""
+    identifier = StateIdentifier(similarity_threshold=0.7)
+    assert identifier.fuzzy_matching
+    output = make_perception_output()
+
+    state_id = identifier.identify_state(make_screen(make_xml(8)), output)
+    assert identifier.identify_state(make_screen(make_xml(9)), output) == state_id
+    assert identifier.identify_state(make_screen(make_xml(8), activity="com.example.MainActivity"), output) != state_id
+    print("✓ identify_state 模糊合并")
+
+
+def test_identify_fallback():
+    """无法解析层次结构时退回压缩文本哈希（数字/时间被过滤）"""
+    identifier = StateIdentifier()
+    broken_screen = make_screen("<not-xml")
+
+    state_id = identifier.identify_state(broken_screen, make_perception_output("设置 12:00 共 3 项"))
+    assert state_id.startswith("state_settings_")
+    assert identifier.state_cache[state_id] is None
+    assert identifier.identify_state(broken_screen, make_perception_output("设置 12:30 共 5 项")) == state_id
+    assert identifier.identify_state(broken_screen, make_perception_output("通知")) != state_id
+
+    # perception_infos 缺失时从 PerceptionOutput 读取 XML；XML 产物也不存在则退回文本哈希
+    no_infos = SimpleNamespace(perception_infos=None, current_activity_info=SimpleNamespace(activity="com.example.SettingsActivity"))
+    assert identifier.identify_state(no_infos, make_perception_output("设置 12:00 共 3 项")) == state_id
+    print("✓ identify_state 文本哈希兜底")
+
+
+def test_identify_unidentified():
+    """层次结构与压缩文本都无法读取：每次得到独立的 unidentified 状态，不会合并为同一个状态"""
+    identifier = StateIdentifier()
+    broken_screen = make_screen("<not-xml")
+    no_text = PerceptionOutput.from_artifacts("20260101_000000", (1080, 2400), {})
+
+    first = identifier.identify_state(broken_screen, no_text)
+    second = identifier.identify_state(broken_screen, no_text)
+    empty = identifier.identify_state(broken_screen, make_perception_output("  "))
+    assert first == "state_settings_unidentified_20260101_000000"
+    assert len({first, second, empty}) == 3 and all("_unidentified_" in s for s in (second, empty))
+    print("✓ 无法识别的页面使用独立的状态ID")
+
+
+def main():
+    test_lsh_query()
+    test_identify_exact()
+    test_identify_fuzzy()
+    test_identify_fallback()
+    test_identify_unidentified()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
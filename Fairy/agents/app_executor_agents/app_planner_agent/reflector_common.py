@@ -37,6 +37,8 @@ def old_and_new_screen_comparison(previous_screen_info: ScreenInfo, current_scre
     prompt += f"- Page after the Action: {current_screen_info.current_activity_info.activity}\n"
     prompt += current_screen_info.perception_infos.get_screen_info_prompt(
         "after the Action")  # Call this function to get the content of the prompt "Screen Perception Information and Keyboard Status".
+    prompt += current_screen_info.perception_infos.get_screen_diff_prompt(
+        "after the Action")  # Call this function to get the structural change compared with the previous screen (SSIP only).
 
     prompt += f"Please scrutinize the above screen information to infer the type of  previous and current pages (e.g., home page, search page, results page, details page, etc.) and thus the main function of these pages. Please carefully identify whether the page has jumped or not! This will help you to find the mistakes in the execution just now and avoid the wrong plan.\n" \
               f"\n"
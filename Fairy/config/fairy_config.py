@@ -36,7 +36,9 @@ class FairyConfig:
                  non_visual_mode: bool=False,
                  interaction_mode: InteractionMode=InteractionMode.Dialog,
                  manual_collect_app_info: bool=False,
-                 reflection_policy: str='hybrid'):
+                 reflection_policy: str='hybrid',
+                 adb_screencap_mode: str='file',
+                 adb_shell_session: bool=True):
 
         self.model_client = model.build() if model else None
         self.rag_model_client = rag_model.build() if rag_model else None
@@ -70,6 +72,11 @@ class FairyConfig:
 
         self.reflection_policy = reflection_policy
 
+        # ADB screenshot strategy: 'file' (screencap -p + pull) or 'raw' (exec-out raw framebuffer, no PNG)
+        self.adb_screencap_mode = adb_screencap_mode
+        # ADB actions: keep one persistent `adb shell` session per device and batch back-to-back actions
+        self.adb_shell_session = adb_shell_session
+
     def get_user_mobile_record_path(self) -> str:
         os.makedirs(os.path.join(self.temp_path, self.device, "record"), exist_ok=True)
         return str(os.path.join(self.temp_path, self.device, "record"))
@@ -130,5 +137,7 @@ class FairyEnvConfig(FairyConfig):
                           interaction_mode = InteractionMode(os.getenv("INTERACTION_MODE")),
                           non_visual_mode=os.getenv("NON_VISUAL_MODE").lower() == 'true',
                           manual_collect_app_info=os.getenv("MANUAL_COLLECT_APP_INFO").lower() == 'true',
-                          reflection_policy=os.getenv("REFLECTION_POLICY"))
+                          reflection_policy=os.getenv("REFLECTION_POLICY"),
+                          adb_screencap_mode=os.getenv("ADB_SCREENCAP_MODE", "file"),
+                          adb_shell_session=os.getenv("ADB_SHELL_SESSION", "True").lower() == 'true')
     
\ No newline at end of file
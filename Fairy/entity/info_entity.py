@@ -1,3 +1,4 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict
 
@@ -8,6 +9,9 @@ from Fairy.tools.screen_perceptor.entity import ScreenPerceptionInfo
 
 
 class ScreenFileInfo:
+    # 后台落盘线程（所有截图共享；线程非守护，进程退出前会写完已提交的图像）
+    _writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="screenshot-writer")
+
     def __init__(self,file_path, file_name, file_type, file_build_timestamp=None):
         self.file_path = file_path
         self.file_name = file_name
@@ -15,6 +19,20 @@ class ScreenFileInfo:
         self.file_type = file_type
         self.file_build_timestamp = int(datetime.now().timestamp()) if file_build_timestamp is None else file_build_timestamp
 
+        # ⭐ 内存中的已解码图像，所有消费者共享同一份（视为只读），磁盘文件按需在后台写入
+        self._image: PILImage.Image | None = None
+        self._citlali_image: Image | None = None
+        self._pending_save_kwargs = None  # 尚未落盘时为保存参数，已提交落盘后为None
+        self._persist_future: Future | None = None
+
+    def __deepcopy__(self, memo):
+        # 复制元数据并共享内存图像，不复制落盘任务
+        copied = ScreenFileInfo(self.file_path, self.file_name, self.file_type, self.file_build_timestamp)
+        copied.file_extra_name = self.file_extra_name
+        copied._image = self._image
+        copied._citlali_image = self._citlali_image
+        return copied
+
     def set_extra_name(self, extra_name):
         self.file_extra_name = extra_name
 
@@ -26,17 +44,53 @@ class ScreenFileInfo:
     def get_screenshot_fullpath(self):
         return f"{self.file_path}/{self.get_screenshot_filename()}"
 
+    def set_image(self, image: PILImage.Image, **save_kwargs):
+        """设置内存图像（不立即写盘，调用 persist/ensure_persisted 时落盘）
+
+        Args:
+            image: PIL图像
+            save_kwargs: 落盘时传给 PIL save 的参数（如 quality）
+        """
+        self._image = image
+        self._citlali_image = None
+        self._pending_save_kwargs = save_kwargs
+
+    def persist(self):
+        """将内存图像提交到后台线程写盘（没有待写入的图像时不做任何事）"""
+        if self._image is None or self._pending_save_kwargs is None:
+            return self._persist_future
+        image_format = 'JPEG' if self.file_type in ('jpeg', 'jpg') else self.file_type.upper()
+        self._persist_future = self._writer.submit(self._image.save, self.get_screenshot_fullpath(), image_format, **self._pending_save_kwargs)
+        self._pending_save_kwargs = None
+        return self._persist_future
+
+    def ensure_persisted(self) -> str:
+        """确保截图已写入磁盘（需要按路径读取文件前调用）
+
+        Returns:
+            str: 截图完整路径
+        """
+        future = self.persist()
+        if future is not None:
+            future.result()
+        return self.get_screenshot_fullpath()
+
     def get_screenshot_PILImage_file(self):
-        return PILImage.open(self.get_screenshot_fullpath())
+        if self._image is None:
+            self._image = PILImage.open(self.get_screenshot_fullpath())
+            self._image.load()
+        return self._image
 
     def get_screenshot_Image_file(self):
-        return Image(PILImage.open(self.get_screenshot_fullpath()))
+        if self._citlali_image is None:
+            self._citlali_image = Image(self.get_screenshot_PILImage_file())
+        return self._citlali_image
 
     def compress_image_to_jpeg(self, quality=50):
-        with PILImage.open(self.get_screenshot_fullpath()) as img:
-            img = img.convert('RGB')
-            self.file_type = 'jpeg'
-            img.save(self.get_screenshot_fullpath(), 'JPEG', quality=quality)
+        img = self.get_screenshot_PILImage_file().convert('RGB')
+        self.file_type = 'jpeg'
+        self.set_image(img, quality=quality)
+        self.persist()
 
 class ActivityInfo:
     def __init__(self, package_name, activity, user_id, window_id):
@@ -45,6 +99,26 @@ class ActivityInfo:
         self.user_id = user_id
         self.window_id = window_id
 
+class ScreenSnapshot:
+    def __init__(self, screenshot_file_info: ScreenFileInfo, ui_hierarchy_xml: str | None, activity_info: ActivityInfo, keyboard_status, timings: Dict[str, float]):
+        self.screenshot_file_info = screenshot_file_info
+        self.ui_hierarchy_xml = ui_hierarchy_xml
+        self.activity_info = activity_info
+        self.keyboard_status = keyboard_status  # [输入法ID, "true"/"false"]
+        self.timings = timings  # 各阶段耗时（秒）
+
+    @property
+    def keyboard_activated(self) -> bool:
+        return self.keyboard_status[1] == "true"
+
+    def __str__(self):
+        return (f"\n -------------Screen Snapshot-------------"
+                f"\n - Package Name: {self.activity_info.package_name}"
+                f"\n - Activity: {self.activity_info.activity}"
+                f"\n - Keyboard Activated: {self.keyboard_activated}"
+                f"\n - Timings: {', '.join(f'{k}={v:.2f}s' for k, v in self.timings.items())}"
+                f"\n -----------Screen Snapshot END-----------")
+
 class ScreenInfo:
     def __init__(self, screenshot_file_info: ScreenFileInfo, perception_infos: ScreenPerceptionInfo, current_activity_info: ActivityInfo):
         self.current_activity_info = current_activity_info
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from typing import List, Tuple
+
+from loguru import logger
+
+# 遇错即停模式下，因之前的命令失败而未执行的命令的退出码
+SKIPPED_EXIT_CODE = -1
+ABORT_VAR = "__fairy_abort"
+RC_VAR = "__fairy_rc"
+
+
+class AdbShellSession:
+    """常驻的 adb shell 会话（每台设备一个 asyncio 子进程）
+
+    命令通过 stdin 写入同一个 `adb shell` 进程，每条命令后追加一条带唯一标记的 echo，
+    以此切分各条命令的输出并取得退出码；多条命令可一次写入，只需一次往返。
+    """
+
+    def __init__(self, adb_path: str, command_timeout: float = 60):
+        """
+        Args:
+            adb_path: adb 路径（可带 -s 设备参数），也可以是 fake_adb 的启动命令
+            command_timeout: 单次往返的超时时间（秒）
+        """
+        self.adb_path = adb_path
+        self.command_timeout = command_timeout
+        self._process = None
+        self._lock = asyncio.Lock()
+        self._marker = f"__FAIRY_END_{uuid.uuid4().hex[:8]}__"
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def _ensure_started(self):
+        if self.is_alive:
+            return
+        logger.bind(log_tag="fairy_sys").debug(f"[ADB Shell Session] Starting persistent shell: {self.adb_path} shell")
+        self._process = await asyncio.create_subprocess_shell(
+            f"{self.adb_path} shell",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+
+    async def _read_until_marker(self) -> Tuple[str, int]:
+        lines = []
+        while True:
+            line = await self._process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"[ADB Shell Session] Shell exited unexpectedly, partial output: {''.join(lines)}")
+            text = line.decode('utf-8', errors='ignore').replace('\r', '')
+            if text.startswith(self._marker):
+                return "".join(lines), int(text[len(self._marker):].strip() or 0)
+            lines.append(text)
+
+    def _guarded_line(self, command: str, first: bool) -> str:
+        """遇错即停的命令行：之前的命令失败后不再执行，退出码记为 SKIPPED_EXIT_CODE"""
+        reset = f"{ABORT_VAR}=; " if first else ""
+        return (f'{reset}if [ -z "${ABORT_VAR}" ]; then {command}; {RC_VAR}=$?; else {RC_VAR}={SKIPPED_EXIT_CODE}; fi; '
+                f'[ ${RC_VAR} -eq 0 ] || {ABORT_VAR}=1; echo "{self._marker} ${RC_VAR}"\n')
+
+    async def run_batch(self, commands: List[str], stop_on_error: bool = False) -> List[Tuple[str, int]]:
+        """在一次往返中执行多条命令（按顺序执行）
+
+        Args:
+            commands: 设备端 shell 命令列表（不带 `adb shell` 前缀）
+            stop_on_error: 遇错即停：某条命令失败后，其后的命令不再执行（退出码为 SKIPPED_EXIT_CODE）
+
+        Returns:
+            List[Tuple[str, int]]: 每条命令的 (输出, 退出码)
+        """
+        async with self._lock:
+            await self._ensure_started()
+            if stop_on_error:
+                payload = "".join(self._guarded_line(command, i == 0) for i, command in enumerate(commands))
+            else:
+                payload = "".join(f'{command}; echo "{self._marker} $?"\n' for command in commands)
+            try:
+                self._process.stdin.write(payload.encode('utf-8'))
+                await self._process.stdin.drain()
+                return [await asyncio.wait_for(self._read_until_marker(), self.command_timeout) for _ in commands]
+            except Exception:
+                # 输出流已错位，丢弃会话，下次调用时重建
+                await self.close()
+                raise
+
+    async def run(self, command: str) -> Tuple[str, int]:
+        """执行单条命令
+
+        Args:
+            command: 设备端 shell 命令
+
+        Returns:
+            Tuple[str, int]: (输出, 退出码)
+        """
+        return (await self.run_batch([command]))[0]
+
+    async def close(self):
+        """关闭会话：先关闭 stdin 让 shell 正常退出，超时再强制结束"""
+        if self.is_alive:
+            self._process.stdin.close()
+            try:
+                await asyncio.wait_for(self._process.wait(), 5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+        self._process = None
+
+
+async def run_adb_command(command: str) -> Tuple[str, int]:
+    """异步执行一条完整的 adb 命令（一次性进程，不阻塞事件循环）
+
+    Args:
+        command: 完整命令（包含 adb 路径）
+
+    Returns:
+        Tuple[str, int]: (输出（含 stderr）, 退出码)
+    """
+    process = await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode('utf-8', errors='ignore'), process.returncode
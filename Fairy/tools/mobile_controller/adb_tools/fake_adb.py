@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+离线替身：模拟 adb 命令行，用于在没有设备的环境下测试 ADB 工具
+
+用法（作为 adb_path 使用）：
+    adb_path = f"{sys.executable} Fairy/tools/mobile_controller/adb_tools/fake_adb.py"
+
+支持：
+- `shell`（无参数）：交互式会话，逐行读取命令，识别 AdbShellSession 追加的结束标记
+- `shell <command>`：一次性命令
+- `-s <serial>`：忽略
+
+所有收到的设备端命令会追加写入环境变量 FAKE_ADB_LOG 指定的文件（每行一条）。
+以环境变量 FAKE_ADB_FAIL_ONCE 指定的前缀开头的命令，在每个进程中第一次执行时返回退出码 1（模拟偶发失败）。
+"""
+
+import os
+import re
+import sys
+
+# 设备端命令前缀 → 模拟输出
+CANNED_OUTPUTS = {
+    "pm list packages": "package:com.example.app\npackage:com.example.mail\n",
+    "dumpsys window": "  mCurrentFocus=Window{1a2b3c u0 com.example.app/com.example.app.MainActivity}\n",
+    "dumpsys input_method": "  mCurMethodId=com.example.ime/.Ime\n  mInputShown=false\n",
+}
+
+SESSION_LINE_PATTERN = re.compile(r'^(.*); echo "(\S+) \$\?"$')
+# AdbShellSession 遇错即停模式的命令行
+GUARDED_LINE_PATTERN = re.compile(
+    r'^(__fairy_abort=; )?if \[ -z "\$__fairy_abort" \]; then (.*); __fairy_rc=\$\?; else __fairy_rc=(-?\d+); fi; '
+    r'\[ \$__fairy_rc -eq 0 \] \|\| __fairy_abort=1; echo "(\S+) \$__fairy_rc"$')
+
+
+_failed_once = set()
+
+
+def exit_code_of(command: str) -> int:
+    fail_prefix = os.getenv("FAKE_ADB_FAIL_ONCE")
+    if fail_prefix and command.strip().startswith(fail_prefix) and fail_prefix not in _failed_once:
+        _failed_once.add(fail_prefix)
+        return 1
+    return 0
+
+
+def handle_command(command: str) -> str:
+    log_path = os.getenv("FAKE_ADB_LOG")
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(command + "\n")
+
+    outputs = []
+    for sub_command in command.split(";"):
+        for prefix, output in CANNED_OUTPUTS.items():
+            if sub_command.strip().startswith(prefix):
+                outputs.append(output)
+    return "".join(outputs)
+
+
+def run_interactive_shell():
+    aborted = False
+    for line in sys.stdin:
+        line = line.rstrip("\n")
+        guarded = GUARDED_LINE_PATTERN.match(line)
+        match = SESSION_LINE_PATTERN.match(line)
+        if guarded is not None:
+            reset, command, skipped_code, marker = guarded.groups()
+            aborted = aborted and not reset
+            if aborted:
+                exit_code = int(skipped_code)
+            else:
+                sys.stdout.write(handle_command(command))
+                exit_code = exit_code_of(command)
+                aborted = exit_code != 0
+            sys.stdout.write(f"{marker} {exit_code}\n")
+        elif match is not None:
+            command, marker = match.groups()
+            sys.stdout.write(handle_command(command))
+            sys.stdout.write(f"{marker} {exit_code_of(command)}\n")
+        else:
+            sys.stdout.write(handle_command(line.strip()))
+        sys.stdout.flush()
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == "-s":
+        argv = argv[2:]
+    if not argv or argv[0] != "shell":
+        sys.stderr.write(f"fake_adb: unsupported command: {' '.join(argv)}\n")
+        return 1
+    if len(argv) == 1:
+        run_interactive_shell()
+    else:
+        sys.stdout.write(handle_command(" ".join(argv[1:])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
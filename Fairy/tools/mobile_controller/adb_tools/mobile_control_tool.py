@@ -1,4 +1,5 @@
 import asyncio
+import shlex
 import subprocess
 from re import escape
 from typing import List, Dict
@@ -7,6 +8,7 @@ from loguru import logger
 
 from Fairy.entity.log_template import LogEventType, LogTemplate
 from Fairy.tools.mobile_controller.action_type import AtomicActionType
+from Fairy.tools.mobile_controller.adb_tools.adb_shell_session import AdbShellSession
 from Fairy.tools.mobile_controller.entity import MobileController
 from Fairy.utils.task_executor import TaskExecutor
 
@@ -21,27 +23,113 @@ ATOMIC_ACTION_COMMAND = {
     AtomicActionType.StartApp: lambda args: f"shell monkey -p {args['app_package_name']} -c android.intent.category.LAUNCHER 1",
 }
 
+# Device-side commands for the persistent shell session (no `adb shell` prefix, quoted for the device shell)
+SHELL_ACTION_COMMAND = {
+    AtomicActionType.Tap: lambda args: f"input tap {args['x']} {args['y']}",
+    AtomicActionType.Swipe: lambda args: f"input swipe {args['x1']} {args['y1']} {args['x2']} {args['y2']} {args['duration']}",
+    AtomicActionType.LongPress: lambda args: f"input swipe {args['x']} {args['y']} {args['x']} {args['y']} {args['duration']}",
+    AtomicActionType.Input: lambda args: f"am broadcast -a ADB_INPUT_TEXT --es msg {shlex.quote(args['text'])}",
+    AtomicActionType.ClearInput: lambda args: "am broadcast -a ADB_CLEAR_TEXT",
+    AtomicActionType.KeyEvent: lambda args: f"input keyevent {args['type']}",
+    AtomicActionType.ListApps: lambda args: "pm list packages -3",
+    AtomicActionType.StartApp: lambda args: f"monkey -p {args['app_package_name']} -c android.intent.category.LAUNCHER 1",
+}
+
+# Actions that can be sent back-to-back in one round trip (e.g. Input + Enter, several Taps)
+BATCHABLE_ACTIONS = {
+    AtomicActionType.Tap, AtomicActionType.Swipe, AtomicActionType.LongPress,
+    AtomicActionType.Input, AtomicActionType.ClearInput, AtomicActionType.KeyEvent,
+}
+
 class AdbMobileController(MobileController):
-    def __init__(self, config):
+    def __init__(self, config, use_shell_session: bool = None, batch_interval: float = 0.5):
+        """
+        Args:
+            config: FairyConfig
+            use_shell_session: use a persistent `adb shell` session instead of one subprocess per action
+                               (defaults to config.adb_shell_session)
+            batch_interval: on-device pause between batched actions (seconds)
+        """
         self.adb_path = config.get_adb_path()
+        self.use_shell_session = config.adb_shell_session if use_shell_session is None else use_shell_session
+        self.batch_interval = batch_interval
+        self.shell_session = AdbShellSession(self.adb_path) if self.use_shell_session else None
+
+        self.log_t = LogTemplate(self, "AdbMobileController")  # 日志模板
+
+    async def execute_actions(self, actions: List[Dict[str, AtomicActionType | dict]]) -> None:
+        if self.shell_session is None:
+            return await super().execute_actions(actions)
+
+        # 连续的可批量动作合并为一次往返，其余动作逐个执行
+        batch = []
+        for action in actions:
+            atomic_action, args = AtomicActionType(action["name"]), action["arguments"]
+            if atomic_action in BATCHABLE_ACTIONS:
+                batch.append((atomic_action, args))
+                continue
+            await self._execute_batch(batch)
+            batch = []
+            await self.execute_action(atomic_action, args)
+        await self._execute_batch(batch)
+
+    async def _execute_batch(self, batch):
+        if len(batch) == 0:
+            return
+        if len(batch) == 1:
+            await self.execute_action(*batch[0])
+            return
+
+        commands, action_indices = [], []  # action_indices: 每条命令对应的动作序号（sleep 归属其后的动作）
+        for i, (atomic_action, args) in enumerate(batch):
+            logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(f"Executing Action (batched): {atomic_action} (args: {args})"))
+            if i > 0:
+                commands.append(f"sleep {self.batch_interval}")
+                action_indices.append(i)
+            commands.append(SHELL_ACTION_COMMAND[atomic_action](args))
+            action_indices.append(i)
+
+        # 批量命令不整体重试（已执行的点击/输入会被重复执行）：设备端遇错即停，
+        # 之后从第一个失败的动作开始逐个执行（单个动作各自重试）
+        results = await self.shell_session.run_batch(commands, stop_on_error=True)
+        failed = next((i for i, (_, exit_code) in enumerate(results) if exit_code != 0), None)
+        if failed is not None:
+            output, exit_code = results[failed]
+            first_failed_action = action_indices[failed]
+            logger.bind(log_tag="fairy_sys").warning(self.log_t.log(LogEventType.Notice)(
+                f"Batched ADB command '{commands[failed]}' failed (exit code {exit_code}): {output}. "
+                f"Re-running the remaining {len(batch) - first_failed_action} action(s) one by one"))
+            for atomic_action, args in batch[first_failed_action:]:
+                await self.execute_action(atomic_action, args)
+            return
+        await asyncio.sleep(2) # Avoid screen not updating due to phone lag
 
     async def custom_execute_action(self, atomic_action: AtomicActionType, args) -> str | None | list[str]:
         match atomic_action:
             case AtomicActionType.ListApps:
-                result = await self._run_command(AtomicActionType.ListApps, ATOMIC_ACTION_COMMAND[AtomicActionType.ListApps], args)
+                result = await self._run_command(AtomicActionType.ListApps, args)
                 result = result.replace("package:","").splitlines()
                 return result
             case _:
-                result = await self._run_command(atomic_action, ATOMIC_ACTION_COMMAND[atomic_action], args)
+                result = await self._run_command(atomic_action, args)
                 await asyncio.sleep(2) # Avoid screen not updating due to phone lag
                 return result
 
-    async def _run_command(self, action: AtomicActionType, command_builder, args):
+    async def _run_command(self, action: AtomicActionType, args):
         async def _command():
-            command = command_builder(args)
+            if self.shell_session is not None:
+                command = SHELL_ACTION_COMMAND[action](args)
+            else:
+                command = ATOMIC_ACTION_COMMAND[action](args)
             logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(f"Executing Action: {action} (args: {args})"))
             logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(f"Executing ADB Command: {command}"))
 
+            if self.shell_session is not None:
+                output, exit_code = await self.shell_session.run(command)
+                if exit_code != 0:
+                    raise RuntimeError(f"Error while executing ADB command: {output}")
+                return output
+
             result = subprocess.run(f"{self.adb_path} {command}", capture_output=True, text=True, shell=True)
             if result.returncode != 0:
                 raise RuntimeError(f"Error while executing ADB command: {result.stderr}")
@@ -0,0 +1,71 @@
+import asyncio
+import struct
+
+import numpy as np
+from PIL import Image as PILImage
+
+# screencap 原始帧头：width, height, format（uint32 小端），Android 9+ 额外带 colorspace
+RAW_HEADER_SIZES = (16, 12)
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+
+
+def parse_raw_framebuffer(data: bytes) -> np.ndarray:
+    """将 `adb exec-out screencap` 的原始输出解析为 (H, W, 4) 的 RGBA 数组（零拷贝视图）
+
+    Args:
+        data: screencap 原始输出
+
+    Returns:
+        np.ndarray: RGBA 像素数组
+    """
+    if len(data) < 12:
+        raise RuntimeError(f"[ADB] Raw screencap output too short: {len(data)} bytes")
+    width, height, pixel_format = struct.unpack_from("<III", data, 0)
+    if pixel_format not in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888):
+        raise RuntimeError(f"[ADB] Unsupported raw screencap pixel format: {pixel_format}")
+
+    pixel_bytes = width * height * 4
+    for header_size in RAW_HEADER_SIZES:
+        if len(data) - header_size == pixel_bytes:
+            return np.frombuffer(data, dtype=np.uint8, count=pixel_bytes, offset=header_size).reshape(height, width, 4)
+    raise RuntimeError(f"[ADB] Raw screencap size mismatch: {len(data)} bytes for {width}x{height}")
+
+
+def framebuffer_to_image(frame: np.ndarray) -> PILImage.Image:
+    """将 RGBA 帧转换为 RGB PIL 图像（保持设备分辨率，图像坐标即设备坐标）
+
+    Args:
+        frame: (H, W, 4) RGBA 数组
+
+    Returns:
+        PILImage.Image: RGB 图像
+    """
+    return PILImage.fromarray(frame[:, :, :3], "RGB")
+
+
+def encode_raw_framebuffer(image: PILImage.Image) -> bytes:
+    """将图像编码为 screencap 原始格式（16字节帧头），用于录制基准测试的帧缓冲样本"""
+    rgba = image.convert("RGBA")
+    header = struct.pack("<IIII", rgba.width, rgba.height, PIXEL_FORMAT_RGBA_8888, 0)
+    return header + rgba.tobytes()
+
+
+async def capture_raw_framebuffer(adb_path: str) -> bytes:
+    """通过一次 adb 连接读取原始帧缓冲（不经过手机存储和PNG编码）
+
+    Args:
+        adb_path: adb 路径（可带 -s 设备参数）
+
+    Returns:
+        bytes: screencap 原始输出
+    """
+    process = await asyncio.create_subprocess_shell(
+        f"{adb_path} exec-out screencap",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"[ADB] Error occurred while capturing raw framebuffer: {stderr.decode(errors='ignore')}")
+    return stdout
@@ -1,14 +1,23 @@
 import asyncio
 import re
-import subprocess
+import shlex
+import time
 
 from loguru import logger
 
-from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo
+from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo, ScreenSnapshot
 from Fairy.entity.log_template import LogTemplate
+from Fairy.tools.mobile_controller.adb_tools.adb_shell_session import AdbShellSession, run_adb_command
+from Fairy.tools.mobile_controller.adb_tools.raw_screencap import capture_raw_framebuffer, parse_raw_framebuffer, framebuffer_to_image
 from Fairy.tools.mobile_controller.entity import MobileScreenCapturer
 from Fairy.utils.task_executor import TaskExecutor
 
+# 焦点窗口与输入法状态在同一次 shell 往返中获取，过滤在主机侧完成（不依赖 powershell/findstr/grep）
+DUMPSYS_FOCUS_AND_IME_COMMAND = "dumpsys window; dumpsys input_method"
+CURRENT_FOCUS_PATTERN = re.compile(r"mCurrentFocus=Window\{([a-f0-9]+) u(\d+) ([^/:}\s]+)[/:]([^}]*)\}")
+CUR_METHOD_ID_PATTERN = re.compile(r"mCurMethodId=(\S+)")
+INPUT_SHOWN_PATTERN = re.compile(r"mInputShown=(\w+)")
+
 
 class AdbMobileScreenCapturer(MobileScreenCapturer):
     def __init__(self, config):
@@ -18,11 +27,16 @@ class AdbMobileScreenCapturer(MobileScreenCapturer):
         # Path of mobile phone screenshot
         self.screenshot_phone_path = config.screenshot_phone_path
         self.screenshot_filename = config.screenshot_filename
+        # Screenshot strategy: 'file' or 'raw' (raw framebuffer streamed over one adb connection)
+        self.screencap_mode = config.adb_screencap_mode
+        self.shell_session = AdbShellSession(self.adb_path) if config.adb_shell_session else None
 
         self.log_t = LogTemplate(self, "ADBScreenCapturer")  # 日志模板
 
 
     async def get_screen(self):
+        if self.screencap_mode == "raw":
+            return await self._get_screen_from_raw_framebuffer()
 
         screenshot_file_info = ScreenFileInfo(self.screenshot_temp_path, self.screenshot_filename, 'png')
 
@@ -36,9 +50,9 @@ class AdbMobileScreenCapturer(MobileScreenCapturer):
         async def _get_screen():
             logger.bind(log_tag="fairy_sys").info("[Get Screenshot] TASK in progress...")
             for command in commands:
-                result = subprocess.run(command, capture_output=True, text=True, shell=True)
-                if result.returncode != 0:
-                    raise RuntimeError(f"[ADB] Error occurred while getting screenshot: {result.stderr}")
+                output, exit_code = await run_adb_command(command)
+                if exit_code != 0:
+                    raise RuntimeError(f"[ADB] Error occurred while getting screenshot: {output}")
                 await asyncio.sleep(1)
 
         await TaskExecutor("Get_Screenshot", None).run(_get_screen)
@@ -46,32 +60,92 @@ class AdbMobileScreenCapturer(MobileScreenCapturer):
         logger.bind(log_tag="fairy_sys").info("[Get Screenshot] TASK completed.")
         return screenshot_file_info, None
 
-    async def get_current_activity(self):
-        async def _get_current_activity_info():
-            logger.bind(log_tag="fairy_sys").info("[Get Current Activity] TASK in progress...")
-            result = subprocess.run(["powershell", "-Command", f"{self.adb_path} shell dumpsys window | findstr 'mCurrentFocus'"], capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                pattern = r"mCurrentFocus=Window\{([a-f0-9]+) u(\d+) ([^/]+)/(.*)\}"
-                current_activity_info = re.match(pattern, result.stdout)
-                if current_activity_info:
-                    return current_activity_info.groups()
-                else:
-                    raise RuntimeError(f"[ADB] Error occurred while getting current activity: {result.stderr}")
-            else:
-                raise RuntimeError(f"[ADB] Error occurred while getting current activity, Abnormal Exit: {result.returncode}")
-
-        result = await TaskExecutor("Get_Screenshot", None).run(_get_current_activity_info)
+    async def _get_screen_from_raw_framebuffer(self):
+        logger.bind(log_tag="fairy_sys").info("[Get Screenshot (raw framebuffer)] TASK in progress...")
+
+        async def _get_raw_framebuffer():
+            return parse_raw_framebuffer(await capture_raw_framebuffer(self.adb_path))
+
+        frame = await TaskExecutor("Get_Raw_Framebuffer", None).run(_get_raw_framebuffer)
+
+        screenshot_file_info = ScreenFileInfo(self.screenshot_temp_path, self.screenshot_filename, 'png')
+        # 截图保留在内存中，按需落盘（跳过手机端PNG编码、pull和rm）
+        screenshot_file_info.set_image(framebuffer_to_image(frame))
+
+        logger.bind(log_tag="fairy_sys").info("[Get Screenshot (raw framebuffer)] TASK completed.")
+        return screenshot_file_info, None
+
+    async def _run_shell(self, command):
+        """执行一条设备端 shell 命令（优先复用常驻 shell 会话，否则异步启动一次 adb 进程）
+
+        Args:
+            command: 设备端 shell 命令（不带 `adb shell` 前缀）
+
+        Returns:
+            Tuple[str, int]: (输出, 退出码)
+        """
+        if self.shell_session is not None:
+            return await self.shell_session.run(command)
+        return await run_adb_command(f"{self.adb_path} shell {shlex.quote(command)}")
+
+    async def _get_focus_and_ime_status(self):
+        """一次 dumpsys 往返同时获取当前焦点窗口和输入法状态，在 Python 侧用预编译正则过滤
+
+        Returns:
+            Tuple[ActivityInfo, list]: (当前Activity信息, [输入法ID, 键盘是否弹出])
+        """
+        async def _dumpsys():
+            output, exit_code = await self._run_shell(DUMPSYS_FOCUS_AND_IME_COMMAND)
+            if exit_code != 0:
+                raise RuntimeError(f"[ADB] Error occurred while running dumpsys, Abnormal Exit: {exit_code}")
+            return self._parse_current_activity(output), self._parse_keyboard_activation_status(output)
+
+        return await TaskExecutor("Get_Focus_And_IME_Status", None).run(_dumpsys)
+
+    @staticmethod
+    def _parse_current_activity(output):
+        current_activity_info = CURRENT_FOCUS_PATTERN.search(output)
+        if current_activity_info is None:
+            raise RuntimeError("[ADB] Error occurred while getting current activity, Regular Expression Parsing Failed")
+        result = current_activity_info.groups()
         return ActivityInfo(package_name=result[2], activity=result[3], user_id=result[1], window_id=result[0])
 
+    @staticmethod
+    def _parse_keyboard_activation_status(output):
+        method_id = CUR_METHOD_ID_PATTERN.search(output)
+        input_shown = INPUT_SHOWN_PATTERN.search(output)
+        if method_id is None or input_shown is None:
+            raise RuntimeError("[ADB] Error occurred while getting current keyboard activation status, Regular Expression Parsing Failed")
+        return [method_id.group(1), input_shown.group(1)]
+
+    async def get_current_activity(self):
+        logger.bind(log_tag="fairy_sys").info("[Get Current Activity] TASK in progress...")
+        activity_info, _ = await self._get_focus_and_ime_status()
+        return activity_info
+
     async def get_keyboard_activation_status(self):
         logger.bind(log_tag="fairy_sys").info("[Get Keyboard Activation Status] TASK in progress...")
-        result = subprocess.run(["powershell", "-Command", f"{self.adb_path} shell dumpsys input_method | findstr 'mCurMethodId mInputShown'"], capture_output=True, text=True, shell=True)
-        if result.returncode == 0:
-            matches = re.findall(r'mCurMethodId=(\S+)|mInputShown=(\w+)', result.stdout.lstrip())
-            if len(matches) == 2:
-                keyboard_activation_status = [match[0] or match[1] for match in matches]
-            else:
-                raise RuntimeError(f"[ADB] Error occurred while getting current keyboard activation status, Regular Expression Parsing Failed: {result.stderr.lstrip()}")
-        else:
-            raise RuntimeError(f"[ADB] Error occurred while getting current keyboard activation status, Abnormal Exit: {result.returncode}")
-        return keyboard_activation_status
\ No newline at end of file
+        _, keyboard_activation_status = await self._get_focus_and_ime_status()
+        return keyboard_activation_status
+
+    async def capture_snapshot(self) -> ScreenSnapshot:
+        """并发获取截图与（一次 dumpsys 往返获取的）Activity和输入法状态
+
+        Returns:
+            ScreenSnapshot: 屏幕快照（包含各阶段耗时）
+        """
+        timings = {}
+
+        async def _timed(name, coroutine):
+            t0 = time.perf_counter()
+            result = await coroutine
+            timings[name] = time.perf_counter() - t0
+            return result
+
+        t0 = time.perf_counter()
+        (screenshot_file_info, ui_hierarchy_xml), (activity_info, keyboard_status) = await asyncio.gather(
+            _timed("screen", self.get_screen()),
+            _timed("dumpsys", self._get_focus_and_ime_status())
+        )
+        timings["total"] = time.perf_counter() - t0
+        return ScreenSnapshot(screenshot_file_info, ui_hierarchy_xml, activity_info, keyboard_status, timings)
@@ -1,9 +1,10 @@
 import asyncio
+import time
 from typing import List, Dict, Tuple
 
 from loguru import logger
 
-from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo
+from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo, ScreenSnapshot
 from Fairy.tools.mobile_controller.action_type import AtomicActionType
 
 
@@ -41,4 +42,27 @@ class MobileScreenCapturer:
         ...
 
     async def get_keyboard_activation_status(self) -> Tuple[str, bool]:
-        ...
\ No newline at end of file
+        ...
+
+    async def capture_snapshot(self) -> ScreenSnapshot:
+        """并发获取截图、UI层次结构、当前Activity和输入法状态，返回一次一致的屏幕快照
+
+        Returns:
+            ScreenSnapshot: 屏幕快照（包含各阶段耗时）
+        """
+        timings = {}
+
+        async def _timed(name, coroutine):
+            t0 = time.perf_counter()
+            result = await coroutine
+            timings[name] = time.perf_counter() - t0
+            return result
+
+        t0 = time.perf_counter()
+        (screenshot_file_info, ui_hierarchy_xml), activity_info, keyboard_status = await asyncio.gather(
+            _timed("screen", self.get_screen()),
+            _timed("activity", self.get_current_activity()),
+            _timed("keyboard", self.get_keyboard_activation_status())
+        )
+        timings["total"] = time.perf_counter() - t0
+        return ScreenSnapshot(screenshot_file_info, ui_hierarchy_xml, activity_info, keyboard_status, timings)
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from Fairy.entity.log_template import LogTemplate, LogEventType
+
+# 层次结构信号忽略的属性：文本类内容（时钟、计数、倒计时等）持续变化不代表页面仍在加载/过渡
+SKELETON_IGNORED_ATTRS = ("text", "content-desc")
+
+
+def hierarchy_skeleton_hash(ui_xml: str) -> str:
+    """层次结构骨架哈希：保留节点类型、resource-id、位置与状态，忽略文本内容
+
+    Args:
+        ui_xml: UI层次结构XML
+
+    Returns:
+        str: 骨架的MD5哈希（XML无法解析时对原文哈希）
+    """
+    try:
+        root = ET.fromstring(ui_xml)
+    except ET.ParseError:
+        return hashlib.md5(ui_xml.encode('utf-8')).hexdigest()
+    digest = hashlib.md5()
+    for node in root.iter():
+        attrs = sorted((k, v) for k, v in node.attrib.items() if k not in SKELETON_IGNORED_ATTRS)
+        digest.update(f"{node.tag}{attrs}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+@dataclass
+class SettleConfig:
+    """屏幕稳定检测配置"""
+    max_timeout: float = 5.0  # 最长等待时间（秒），与原先的固定等待时间一致
+    min_wait: float = 0.2  # 首次采样前的最短等待时间（秒）
+    poll_interval: float = 0.25  # 采样间隔（秒）
+    stable_rounds: int = 1  # 连续多少次采样与前一次一致才判定为稳定
+    pixel_diff_threshold: float = 2.0  # 降采样截图的平均像素差阈值（0-255）
+    signals: Tuple[str, ...] = ("activity", "hierarchy")  # 使用的信号：activity / hierarchy / screenshot
+    use_statistics: bool = True  # 是否根据历史稳定时间调整首次采样延迟
+
+
+@dataclass
+class SettleSample:
+    """一次屏幕采样（未启用的信号为None）"""
+    activity: Optional[str] = None  # 焦点窗口（mCurrentFocus）
+    package_name: Optional[str] = None  # 焦点窗口所属包名
+    hierarchy_hash: Optional[str] = None  # UI层次结构骨架哈希（忽略文本）
+    hierarchy_xml: Optional[str] = None  # UI层次结构原文（稳定后可直接复用，避免重复dump）
+    thumbnail: Optional[List[int]] = None  # 降采样灰度截图像素
+
+    def is_similar(self, other: "SettleSample", pixel_diff_threshold: float) -> bool:
+        if other is None:
+            return False
+        if self.activity != other.activity or self.hierarchy_hash != other.hierarchy_hash:
+            return False
+        if self.thumbnail is not None and other.thumbnail is not None:
+            if len(self.thumbnail) != len(other.thumbnail):
+                return False
+            diff = sum(abs(a - b) for a, b in zip(self.thumbnail, other.thumbnail)) / max(len(self.thumbnail), 1)
+            return diff <= pixel_diff_threshold
+        return True
+
+
+@dataclass
+class SettleResult:
+    """屏幕稳定检测结果"""
+    settled: bool  # 是否在超时前稳定
+    elapsed: float  # 总耗时（秒）
+    polls: int  # 采样次数
+    last_sample: Optional[SettleSample] = None
+
+
+@dataclass
+class SettleStatistics:
+    """按应用统计的屏幕稳定耗时，用于调整轮询参数"""
+    history_size: int = 50
+    settle_times: Dict[str, deque] = field(default_factory=dict)
+    timeouts: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, app_key: str, result: SettleResult):
+        app_key = app_key or "unknown"
+        self.settle_times.setdefault(app_key, deque(maxlen=self.history_size)).append(result.elapsed)
+        if not result.settled:
+            self.timeouts[app_key] = self.timeouts.get(app_key, 0) + 1
+
+    def suggest_initial_delay(self, app_key: str, config: SettleConfig) -> float:
+        """根据历史数据给出首次采样前的等待时间
+
+        该应用历史上最快的25%稳定时间之前基本不会稳定，跳过这段时间的轮询可减少采样次数。
+
+        Args:
+            app_key: 应用包名
+            config: 稳定检测配置
+
+        Returns:
+            float: 首次采样前等待时间（秒）
+        """
+        times = self.settle_times.get(app_key or "unknown")
+        if not config.use_statistics or not times or len(times) < 5:
+            return config.min_wait
+        p25 = sorted(times)[len(times) // 4]
+        return min(max(config.min_wait, p25 - config.poll_interval), config.max_timeout / 2)
+
+    def to_dict(self) -> Dict:
+        summary = {}
+        for app_key, times in self.settle_times.items():
+            ordered = sorted(times)
+            summary[app_key] = {
+                'count': len(ordered),
+                'median': ordered[len(ordered) // 2],
+                'p90': ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+                'timeouts': self.timeouts.get(app_key, 0)
+            }
+        return summary
+
+
+class ScreenSettleDetector:
+    """屏幕稳定检测器
+
+    轮询廉价信号（焦点窗口、UI层次结构哈希、降采样截图），直到连续采样不再变化或达到最长等待时间，
+    用于替代动作执行后/截图前的固定等待。
+    """
+
+    def __init__(self, sampler: Callable[[], Awaitable[SettleSample]], config: SettleConfig = None, statistics: SettleStatistics = None):
+        """
+        Args:
+            sampler: 异步采样函数，返回 SettleSample
+            config: 稳定检测配置
+            statistics: 稳定耗时统计（可在多个检测器间共享）
+        """
+        self.sampler = sampler
+        self.config = config if config is not None else SettleConfig()
+        self.statistics = statistics if statistics is not None else SettleStatistics()
+        self.last_app_key = None  # 最近一次稳定时的前台应用，作为下一次等待的统计键
+        self.log_t = LogTemplate(self, "ScreenSettleDetector")  # 日志模板
+
+    async def wait_until_settled(self, max_timeout: float = None, app_key: str = None) -> SettleResult:
+        """等待屏幕稳定
+
+        Args:
+            max_timeout: 本次最长等待时间（秒），默认使用配置值
+            app_key: 统计键（应用包名），默认使用最近一次采样到的前台应用
+
+        Returns:
+            SettleResult: 稳定检测结果
+        """
+        max_timeout = self.config.max_timeout if max_timeout is None else max_timeout
+        app_key = app_key or self.last_app_key
+        start = time.monotonic()
+
+        await asyncio.sleep(min(self.statistics.suggest_initial_delay(app_key, self.config), max_timeout))
+
+        previous, sample, polls, stable_count = None, None, 0, 0
+        while True:
+            sample = await self.sampler()
+            polls += 1
+            if sample.is_similar(previous, self.config.pixel_diff_threshold):
+                stable_count += 1
+                if stable_count >= self.config.stable_rounds:
+                    break
+            else:
+                stable_count = 0
+            previous = sample
+
+            if time.monotonic() - start + self.config.poll_interval > max_timeout:
+                break
+            await asyncio.sleep(self.config.poll_interval)
+
+        result = SettleResult(settled=stable_count >= self.config.stable_rounds, elapsed=time.monotonic() - start, polls=polls, last_sample=sample)
+        self.last_app_key = sample.package_name or app_key
+        self.statistics.record(self.last_app_key, result)
+
+        logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(
+            f"Screen {'settled' if result.settled else 'not settled (timeout)'} after {result.elapsed:.2f}s ({result.polls} polls, app: {self.last_app_key})"))
+        return result
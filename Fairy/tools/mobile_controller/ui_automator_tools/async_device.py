@@ -0,0 +1,99 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class AsyncDevice:
+    """uiautomator2 设备的异步门面
+
+    uiautomator2 的调用（截图、dump、shell、点击等）都是同步HTTP请求，直接在协程中调用会阻塞整个事件循环。
+    该门面把调用放到每台设备专属的线程池中执行：
+    - 控制类调用（点击、滑动、输入等）在单线程通道中按提交顺序串行执行；
+    - 读取类调用（截图、dump、dumpsys）在读取线程池中执行，彼此可以并发，
+      但会先等待此前提交的控制调用完成，保证读到的是动作之后的屏幕。
+    """
+
+    _instances = {}  # {设备序列号: AsyncDevice}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, dev, read_workers: int = 3):
+        """
+        Args:
+            dev: uiautomator2 设备对象
+            read_workers: 读取线程池大小
+        """
+        self.dev = dev
+        self._control_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"u2-control-{dev.serial}")
+        self._read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix=f"u2-read-{dev.serial}")
+        self._pending_control = None  # 最近一次提交的控制调用（concurrent.futures.Future）
+
+    @classmethod
+    def of(cls, dev) -> "AsyncDevice":
+        """获取设备对应的异步门面（每台设备序列号一个实例，共享同一组线程）
+
+        同一序列号的多个设备对象（各工具分别 u2.connect、断线重连）共用一个门面：传入新的设备对象时
+        原地替换 dev，已持有该门面的调用方继续可用，之后的调用使用新的连接。线程池只由 shutdown() 显式关闭。
+        """
+        with cls._instances_lock:
+            instance = cls._instances.get(dev.serial)
+            if instance is None:
+                instance = cls(dev)
+                cls._instances[dev.serial] = instance
+            elif instance.dev is not dev:
+                instance.dev = dev
+            return instance
+
+    async def _run_control(self, func, *args, **kwargs):
+        future = self._control_executor.submit(partial(func, *args, **kwargs))
+        self._pending_control = future
+        return await asyncio.wrap_future(future)
+
+    async def _run_read(self, func, *args, **kwargs):
+        pending_control = self._pending_control
+        if pending_control is not None and not pending_control.done():
+            await asyncio.wrap_future(pending_control)
+        return await asyncio.wrap_future(self._read_executor.submit(partial(func, *args, **kwargs)))
+
+    # ---------- 读取类调用 ----------
+    async def screenshot(self, *args, **kwargs):
+        return await self._run_read(self.dev.screenshot, *args, **kwargs)
+
+    async def dump_hierarchy(self, *args, **kwargs):
+        return await self._run_read(self.dev.dump_hierarchy, *args, **kwargs)
+
+    async def shell(self, *args, **kwargs):
+        return await self._run_read(self.dev.shell, *args, **kwargs)
+
+    async def app_list(self, *args, **kwargs):
+        return await self._run_read(self.dev.app_list, *args, **kwargs)
+
+    # ---------- 控制类调用 ----------
+    async def click(self, *args, **kwargs):
+        return await self._run_control(self.dev.click, *args, **kwargs)
+
+    async def long_click(self, *args, **kwargs):
+        return await self._run_control(self.dev.long_click, *args, **kwargs)
+
+    async def swipe(self, *args, **kwargs):
+        return await self._run_control(self.dev.swipe, *args, **kwargs)
+
+    async def send_keys(self, *args, **kwargs):
+        return await self._run_control(self.dev.send_keys, *args, **kwargs)
+
+    async def clear_text(self, *args, **kwargs):
+        return await self._run_control(self.dev.clear_text, *args, **kwargs)
+
+    async def press(self, *args, **kwargs):
+        return await self._run_control(self.dev.press, *args, **kwargs)
+
+    async def app_start(self, *args, **kwargs):
+        return await self._run_control(self.dev.app_start, *args, **kwargs)
+
+    def shutdown(self):
+        """关闭线程池（等待已提交的调用完成）"""
+        self._control_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+        with self._instances_lock:
+            if self._instances.get(self.dev.serial) is self:
+                del self._instances[self.dev.serial]
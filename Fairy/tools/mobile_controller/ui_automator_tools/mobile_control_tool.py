@@ -8,6 +8,9 @@ from Fairy.tools.mobile_controller.action_type import AtomicActionType
 import uiautomator2 as u2
 
 from Fairy.tools.mobile_controller.entity import MobileController
+from Fairy.tools.mobile_controller.screen_settle_detector import SettleConfig
+from Fairy.tools.mobile_controller.ui_automator_tools.async_device import AsyncDevice
+from Fairy.tools.mobile_controller.ui_automator_tools.screen_settle_sampler import build_settle_detector
 
 keycode_list = {
     "KEYCODE_BACK": "back",
@@ -18,6 +21,10 @@ keycode_list = {
 class UiAutomatorMobileController(MobileController):
     def __init__(self, config):
         self.dev = u2.connect(config.device)
+        self.adev = AsyncDevice.of(self.dev)  # 异步门面，动作按提交顺序在设备专属线程中执行
+
+        # 动作后的屏幕稳定检测器（最长2秒，为None时退回固定等待2秒）
+        self.settle_detector = build_settle_detector(self.adev, SettleConfig(max_timeout=2.0))
 
         self.log_t = LogTemplate(self, "UiAutomatorMobileController")  # 日志模板
 
@@ -25,23 +32,26 @@ class UiAutomatorMobileController(MobileController):
         logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(f"Executing Action: {atomic_action} (args: {args})"))
         match atomic_action:
             case AtomicActionType.Swipe:
-                result = self.dev.swipe(args['x1'],args['y1'],args['x2'],args['y2'], args['duration']/1000) # 单位是s而不是ms
+                result = await self.adev.swipe(args['x1'],args['y1'],args['x2'],args['y2'], args['duration']/1000) # 单位是s而不是ms
             case AtomicActionType.Tap:
-                result = self.dev.click(args['x'],args['y'])
+                result = await self.adev.click(args['x'],args['y'])
             case AtomicActionType.LongPress:
                 duration = args.get('duration', 1000)
-                result = self.dev.long_click(args['x'],args['y'],duration/1000)
+                result = await self.adev.long_click(args['x'],args['y'],duration/1000)
             case AtomicActionType.Input:
-                result = self.dev.send_keys(args['text']) # input from pasteboard
+                result = await self.adev.send_keys(args['text']) # input from pasteboard
             case AtomicActionType.ClearInput:
-                result = self.dev.clear_text()
+                result = await self.adev.clear_text()
             case AtomicActionType.KeyEvent:
-                result = self.dev.press(keycode_list[args['type']])
+                result = await self.adev.press(keycode_list[args['type']])
             case AtomicActionType.ListApps:
-                result = self.dev.app_list(filter="-3")
+                result = await self.adev.app_list(filter="-3")
             case AtomicActionType.StartApp:
-                result = self.dev.app_start(args['app_package_name'], wait=True)
+                result = await self.adev.app_start(args['app_package_name'], wait=True)
             case _:
                 raise RuntimeError(f"Unknown atomic action: {atomic_action}")
-        await asyncio.sleep(2)
+        if self.settle_detector is None:
+            await asyncio.sleep(2)
+        else:
+            await self.settle_detector.wait_until_settled()
         return result
@@ -1,13 +1,16 @@
 import asyncio
 import re
+import time
 
 from loguru import logger
 
-from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo
+from Fairy.entity.info_entity import ScreenFileInfo, ActivityInfo, ScreenSnapshot
 import uiautomator2 as u2
 
 from Fairy.entity.log_template import LogTemplate, LogEventType
 from Fairy.tools.mobile_controller.entity import MobileScreenCapturer
+from Fairy.tools.mobile_controller.ui_automator_tools.async_device import AsyncDevice
+from Fairy.tools.mobile_controller.ui_automator_tools.screen_settle_sampler import build_settle_detector
 
 
 class UiAutomatorMobileScreenCapturer(MobileScreenCapturer):
@@ -16,53 +19,120 @@ class UiAutomatorMobileScreenCapturer(MobileScreenCapturer):
         self.screenshot_filename = config.screenshot_filename
 
         self.dev = u2.connect(config.device)
+        self.adev = AsyncDevice.of(self.dev)  # 异步门面，设备调用不阻塞事件循环
+
+        # 屏幕稳定检测器（为None时退回固定等待5秒）
+        self.settle_detector = build_settle_detector(self.adev)
 
         self.log_t = LogTemplate(self, "UiAutomatorScreenCapturer")  # 日志模板
 
+    async def _wait_for_settle(self):
+        """避免速度过快导致屏幕内容没有完成加载：轮询直到屏幕稳定（最长5秒）
+
+        Returns:
+            str | None: 屏幕稳定时最后一次采样的UI层次结构（可直接复用），否则为None
+        """
+        if self.settle_detector is None:
+            await asyncio.sleep(5)
+            return None
+        settle_result = await self.settle_detector.wait_until_settled()
+        return settle_result.last_sample.hierarchy_xml if settle_result.settled else None
+
+    async def _capture_screen(self, settled_hierarchy_xml=None):
+        screenshot_file_info = ScreenFileInfo(self.screenshot_temp_path, self.screenshot_filename, 'png')
+        if settled_hierarchy_xml is not None:
+            # get screenshot（屏幕已稳定时复用最后一次采样的层次结构）
+            screenshot_image = await self.adev.screenshot()
+            ui_hierarchy_xml = settled_hierarchy_xml
+        else:
+            # get screenshot & ui hierarchy（并发读取）
+            screenshot_image, ui_hierarchy_xml = await asyncio.gather(
+                self.adev.screenshot(),
+                self.adev.dump_hierarchy()
+            )
+        # 截图保留在内存中，按需落盘
+        screenshot_file_info.set_image(screenshot_image)
+        return screenshot_file_info, ui_hierarchy_xml
 
     async def get_screen(self):
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Screenshot & UI-Hierarchy Caption"))
 
-        await asyncio.sleep(5) # 避免速度过快导致屏幕内容没有完成加载
-
-        screenshot_file_info = ScreenFileInfo(self.screenshot_temp_path, self.screenshot_filename, 'png')
-        # get screenshot
-        self.dev.screenshot(screenshot_file_info.get_screenshot_fullpath())
-        # get ui hierarchy
-        ui_hierarchy_xml = self.dev.dump_hierarchy()
+        settled_hierarchy_xml = await self._wait_for_settle()
+        screenshot_file_info, ui_hierarchy_xml = await self._capture_screen(settled_hierarchy_xml)
 
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Screenshot & UI-Hierarchy Caption"))
         return screenshot_file_info, ui_hierarchy_xml
 
+    @staticmethod
+    def _parse_current_activity(output):
+        pattern = r"mCurrentFocus=Window\{([a-f0-9]+) u(\d+) ([^/:}]+)[/:]([^}]*)\}"
+        current_activity_info = re.search(pattern, output)
+        if current_activity_info is None:
+            raise RuntimeError(f"[UiAutomator] Error occurred while getting current activity, Regular Expression Parsing Failed: {output.lstrip()}")
+        result = current_activity_info.groups()
+        return ActivityInfo(package_name=result[2], activity=result[3], user_id=result[1], window_id=result[0])
+
+    @staticmethod
+    def _parse_keyboard_activation_status(output):
+        matches = re.findall(r'mCurMethodId=(\S+)|mInputShown=(\w+)', output.lstrip())
+        if len(matches) != 2:
+            raise RuntimeError(f"[UiAutomator] Error occurred while getting current keyboard activation status, Regular Expression Parsing Failed: {output.lstrip()}")
+        return [match[0] or match[1] for match in matches]
+
     async def get_current_activity(self):
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Current Activity Getting"))
 
-        output, exit_code = self.dev.shell("dumpsys window | grep -E 'mCurrentFocus'", timeout=60)
-        if exit_code == 0:
-            pattern = r"mCurrentFocus=Window\{([a-f0-9]+) u(\d+) ([^/:}]+)[/:]([^}]*)\}"
-            current_activity_info = re.match(pattern, output.lstrip())
-            if current_activity_info:
-                result = current_activity_info.groups()
-            else:
-                raise RuntimeError(f"[UiAutomator] Error occurred while getting current activity, Regular Expression Parsing Failed: {output.lstrip()}")
-        else:
+        output, exit_code = await self.adev.shell("dumpsys window | grep -E 'mCurrentFocus'", timeout=60)
+        if exit_code != 0:
             raise RuntimeError(f"[UiAutomator] Error occurred while getting current activity, Abnormal Exit: {exit_code}")
+        activity_info = self._parse_current_activity(output.lstrip())
 
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Current Activity Getting"))
-        return ActivityInfo(package_name=result[2], activity=result[3], user_id=result[1], window_id=result[0])
+        return activity_info
 
     async def get_keyboard_activation_status(self):
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Keyboard Status Getting"))
 
-        output, exit_code = self.dev.shell("dumpsys input_method | grep -E 'mCurMethodId|mInputShown'", timeout=60)
-        if exit_code == 0:
-            matches = re.findall(r'mCurMethodId=(\S+)|mInputShown=(\w+)', output.lstrip())
-            if len(matches) == 2:
-                keyboard_activation_status = [match[0] or match[1] for match in matches]
-            else:
-                raise RuntimeError(f"[UiAutomator] Error occurred while getting current keyboard activation status, Regular Expression Parsing Failed: {output.lstrip()}")
-        else:
+        output, exit_code = await self.adev.shell("dumpsys input_method | grep -E 'mCurMethodId|mInputShown'", timeout=60)
+        if exit_code != 0:
             raise RuntimeError(f"[UiAutomator] Error occurred while getting current keyboard activation status, Abnormal Exit: {exit_code}")
+        keyboard_activation_status = self._parse_keyboard_activation_status(output)
 
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Keyboard Status Getting"))
-        return keyboard_activation_status
\ No newline at end of file
+        return keyboard_activation_status
+
+    async def capture_snapshot(self) -> ScreenSnapshot:
+        """等待屏幕稳定后，并发获取截图/UI层次结构与（一次批量shell获取的）Activity和输入法状态
+
+        Returns:
+            ScreenSnapshot: 屏幕快照（包含各阶段耗时）
+        """
+        logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Screen Snapshot Capture"))
+        timings = {}
+        t_start = time.perf_counter()
+
+        t0 = time.perf_counter()
+        settled_hierarchy_xml = await self._wait_for_settle()
+        timings["settle"] = time.perf_counter() - t0
+
+        async def _timed(name, coroutine):
+            t0 = time.perf_counter()
+            result = await coroutine
+            timings[name] = time.perf_counter() - t0
+            return result
+
+        # 两个 dumpsys 查询合并为一次 shell 往返
+        (screenshot_file_info, ui_hierarchy_xml), (output, exit_code) = await asyncio.gather(
+            _timed("screen", self._capture_screen(settled_hierarchy_xml)),
+            _timed("dumpsys", self.adev.shell(
+                "dumpsys window | grep -E 'mCurrentFocus'; dumpsys input_method | grep -E 'mCurMethodId|mInputShown'", timeout=60))
+        )
+        if exit_code != 0:
+            raise RuntimeError(f"[UiAutomator] Error occurred while getting activity and keyboard status, Abnormal Exit: {exit_code}")
+        activity_info = self._parse_current_activity(output)
+        keyboard_status = self._parse_keyboard_activation_status(output)
+        timings["total"] = time.perf_counter() - t_start
+
+        snapshot = ScreenSnapshot(screenshot_file_info, ui_hierarchy_xml, activity_info, keyboard_status, timings)
+        logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Screen Snapshot Capture"))
+        return snapshot
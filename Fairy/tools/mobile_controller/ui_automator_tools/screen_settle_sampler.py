@@ -0,0 +1,53 @@
+import re
+
+from Fairy.tools.mobile_controller.screen_settle_detector import (
+    ScreenSettleDetector, SettleConfig, SettleSample, SettleStatistics, hierarchy_skeleton_hash
+)
+
+# 形如 mCurrentFocus=Window{1a2b3c u0 com.example/com.example.MainActivity}
+FOCUS_PACKAGE_PATTERN = re.compile(r"mCurrentFocus=Window\{[a-f0-9]+ u\d+ ([^/:}]+)")
+
+
+class UiAutomatorSettleSampler:
+    """基于 uiautomator2 的屏幕稳定采样器"""
+
+    def __init__(self, adev, signals=("activity", "hierarchy"), thumbnail_size=(36, 64)):
+        """
+        Args:
+            adev: uiautomator2 设备的异步门面（AsyncDevice）
+            signals: 采样信号，可选 activity / hierarchy / screenshot
+            thumbnail_size: 截图信号的降采样尺寸
+        """
+        self.adev = adev
+        self.signals = signals
+        self.thumbnail_size = thumbnail_size
+
+    async def __call__(self) -> SettleSample:
+        sample = SettleSample()
+        if "activity" in self.signals:
+            output, _ = await self.adev.shell("dumpsys window | grep -E 'mCurrentFocus'", timeout=60)
+            sample.activity = output.strip()
+            match = FOCUS_PACKAGE_PATTERN.search(sample.activity)
+            sample.package_name = match.group(1) if match else None
+        if "hierarchy" in self.signals:
+            sample.hierarchy_xml = await self.adev.dump_hierarchy()
+            sample.hierarchy_hash = hierarchy_skeleton_hash(sample.hierarchy_xml)
+        if "screenshot" in self.signals:
+            image = await self.adev.screenshot()  # PIL Image
+            sample.thumbnail = list(image.convert("L").resize(self.thumbnail_size).getdata())
+        return sample
+
+
+def build_settle_detector(adev, config: SettleConfig = None, statistics: SettleStatistics = None) -> ScreenSettleDetector:
+    """构建基于 uiautomator2 的屏幕稳定检测器（采样信号取自 config.signals）
+
+    Args:
+        adev: uiautomator2 设备的异步门面（AsyncDevice）
+        config: 稳定检测配置
+        statistics: 稳定耗时统计
+
+    Returns:
+        ScreenSettleDetector: 屏幕稳定检测器
+    """
+    config = config if config is not None else SettleConfig()
+    return ScreenSettleDetector(UiAutomatorSettleSampler(adev, signals=config.signals), config, statistics)
@@ -32,4 +32,7 @@ class ScreenPerceptionInfo:
         ...
 
     def get_screen_info_note_prompt(self, description_prefix):
-        ...
\ No newline at end of file
+        ...
+
+    def get_screen_diff_prompt(self, extra_suffix=None):
+        return ""
\ No newline at end of file
@@ -17,6 +17,7 @@ class FineGrainedVisualPerceptor:
 
 
     def get_perception_infos(self, screenshot_file_info: ScreenFileInfo):
+        screenshot_file_info.ensure_persisted()  # FVP 的各模块按路径读取截图
         width, height = Image.open(screenshot_file_info.get_screenshot_fullpath()).size
         perception_infos = []
 
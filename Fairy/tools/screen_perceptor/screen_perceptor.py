@@ -38,6 +38,10 @@ class ScreenPerceptor(Worker):
         self.text_summarization_model_config = config.text_summarization_model_config
         self.non_visual_mode = config.non_visual_mode
 
+        # SSIP 实例需跨帧复用，以保留上一帧的层次结构和描述缓存（增量感知）
+        self.ssip = ScreenStructuredInfoPerception(self.visual_prompt_model_config, self.text_summarization_model_config) \
+            if self.screen_perception_type == ScreenPerceptionType.SSIP else None
+
     @listener(ListenerType.ON_NOTIFIED, channel=EventChannel.APP_CHANNEL,
               listen_filter=lambda msg: msg.match(EventType.ActionExecution, EventStatus.DONE))
     async def on_screen_percept(self, message: EventMessage, message_context):
@@ -53,11 +57,12 @@ class ScreenPerceptor(Worker):
         await self.publish(EventChannel.APP_CHANNEL, EventMessage(EventType.ScreenPerception, EventStatus.CREATED))
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Screen Perception"))
 
-        # 获取当前活动信息
-        current_activity_info = await self.screenshot_tool.get_current_activity()
+        # 并发获取截图、UI层次结构、当前活动信息和输入法状态
+        snapshot = await self.screenshot_tool.capture_snapshot()
+        current_activity_info = snapshot.activity_info
 
         # 获取当前屏幕描述信息
-        screenshot_file_info, perception_infos = await self.get_screen_description(current_activity_info.package_name)
+        screenshot_file_info, perception_infos = await self.get_screen_description(current_activity_info.package_name, snapshot)
         screen_info = ScreenInfo(screenshot_file_info, perception_infos, current_activity_info)
 
         logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.IntermediateResult)("Screen perception result", screen_info))
@@ -66,18 +71,19 @@ class ScreenPerceptor(Worker):
         await self.publish(EventChannel.APP_CHANNEL, EventMessage(EventType.ScreenPerception, EventStatus.DONE, screen_info))
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Screen Perception"))
 
-    async def get_screen_description(self, target_app):
-        # 获取屏幕截图信息和UI层次结构XML(AccessibilityTree)
-        screenshot_file_info, ui_hierarchy_xml = await self.screenshot_tool.get_screen()
+    async def get_screen_description(self, target_app, snapshot=None):
+        if snapshot is None:
+            snapshot = await self.screenshot_tool.capture_snapshot()
+        # 屏幕截图信息和UI层次结构XML(AccessibilityTree)
+        screenshot_file_info, ui_hierarchy_xml = snapshot.screenshot_file_info, snapshot.ui_hierarchy_xml
         screenshot_file_info.compress_image_to_jpeg() # 压缩图片
 
-        # 获取当前输入法激活状态
-        get_keyboard_activation_status = await self.screenshot_tool.get_keyboard_activation_status()
+        # 当前输入法激活状态
+        get_keyboard_activation_status = snapshot.keyboard_status
 
         if self.screen_perception_type == ScreenPerceptionType.SSIP:
             # Use SSIP
-            ssip = ScreenStructuredInfoPerception(self.visual_prompt_model_config, self.text_summarization_model_config)
-            screenshot_file_info, perception_infos = await ssip.get_perception_infos(screenshot_file_info, ui_hierarchy_xml, non_visual_mode=self.non_visual_mode, target_app=target_app)
+            screenshot_file_info, perception_infos = await self.ssip.get_perception_infos(screenshot_file_info, ui_hierarchy_xml, non_visual_mode=self.non_visual_mode, target_app=target_app)
 
         elif self.screen_perception_type == ScreenPerceptionType.FVP:
             # Use FVP
@@ -0,0 +1,53 @@
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Union
+
+
+class ParsedHierarchy:
+    """一次采集的 UI 层次结构解析结果（每帧只解析一次）
+
+    SoM 标记（ScreenAccessibilityTree）、XML 压缩（XMLCompressor）以及状态识别使用的文本都从同一个
+    ElementTree 派生，派生结果通过 derive() 按名称缓存在对象上，同一帧的多个消费者不会重复解析/遍历。
+
+    注意：root 由所有消费者共享，消费者不能就地修改它（需要修改时先复制）。
+    """
+
+    def __init__(self, xml: str):
+        """
+        Args:
+            xml: uiautomator dump 得到的层次结构 XML 字符串
+        """
+        self.xml = xml
+        self.root = ET.fromstring(xml)
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def of(cls, xml_or_hierarchy: Union[str, 'ParsedHierarchy']) -> 'ParsedHierarchy':
+        """接受 XML 字符串或已解析的层次结构，统一返回 ParsedHierarchy"""
+        if isinstance(xml_or_hierarchy, ParsedHierarchy):
+            return xml_or_hierarchy
+        return cls(xml_or_hierarchy)
+
+    @property
+    def top_nodes(self) -> List[ET.Element]:
+        """<hierarchy> 下的顶层 node（每个窗口一个）"""
+        return self.root.findall('node')
+
+    def derive(self, name: str, builder: Callable[['ParsedHierarchy'], Any]) -> Any:
+        """获取按名称缓存的派生结果，首次调用时由 builder 生成
+
+        Args:
+            name: 派生结果名称（如 "xml_compressor"）
+            builder: 生成函数，参数为本对象
+
+        Returns:
+            派生结果
+        """
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    def __str__(self):
+        return self.xml
@@ -2,10 +2,12 @@ from Fairy.tools.screen_perceptor.entity import ScreenPerceptionInfo
 
 
 class SSIPInfo(ScreenPerceptionInfo):
-    def __init__(self, width, height, perception_infos, non_visual_mode, SoM_mapping, som_compressed_txt=None):
+    def __init__(self, width, height, perception_infos, non_visual_mode, SoM_mapping, som_compressed_txt=None, screen_diff=None, hierarchy=None):
         self.non_visual_mode = non_visual_mode
         self.SoM_mapping = SoM_mapping
         self.som_compressed_txt = som_compressed_txt  # 与SoM_mapping索引对应的compressed文本
+        self.screen_diff = screen_diff  # 与上一帧UI层次结构的差异（ScreenHierarchyDiff，无上一帧时为None）
+        self.hierarchy = hierarchy  # 本帧的共享解析结果（ParsedHierarchy），供XML压缩等下游复用
 
         super().__init__(width, height, perception_infos, use_set_of_marks_mapping=not self.non_visual_mode)
 
@@ -43,6 +45,14 @@ class SSIPInfo(ScreenPerceptionInfo):
 
         return prompt
 
+    def get_screen_diff_prompt(self, extra_suffix=None):
+        if self.screen_diff is None:
+            return ""
+        prompt = f"- UI Structure Change {'for '+extra_suffix if extra_suffix else ''} (compared with the previous screen, nodes keyed by resource-id/class/bounds): \n"
+        prompt += self.screen_diff.get_summary()
+        prompt += "\n"
+        return prompt
+
     def get_screen_info_note_prompt(self, description_prefix):
         prompt = f"{description_prefix}, with a width and height of {self.width} and {self.height} pixels respectively.\n"
         if self.non_visual_mode:
@@ -1,3 +1,5 @@
+import hashlib
+import json
 from copy import deepcopy
 
 from loguru import logger
@@ -7,15 +9,91 @@ from Fairy.entity.log_template import LogTemplate, LogEventType
 from Fairy.tools.screen_perceptor.ssip_new.perceptor.entity import SSIPInfo
 from Fairy.tools.screen_perceptor.ssip_new.llm_tools.text_summarizer import TextSummarizer
 from Fairy.tools.screen_perceptor.ssip_new.perceptor.tools import draw_transparent_boxes_with_labels
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
 from Fairy.tools.screen_perceptor.ssip_new.perceptor.screen_perception_AT import ScreenPerceptionAccessibilityTree
+from Fairy.tools.screen_perceptor.ssip_new.perceptor.screen_diff import index_nodes, diff_node_index
 from Fairy.tools.screen_perceptor.ssip_new.llm_tools.visual_description_generator import VisualDescriptionGenerator
 
+# 图像节点内容哈希：裁剪区域缩小为灰度缩略图并量化（忽略轻微的渲染噪声）
+CROP_HASH_SIZE = (16, 16)
+CROP_HASH_QUANTIZE_SHIFT = 4
+
+
+def get_crop_content_hash(image, bounds) -> str:
+    """图像节点裁剪区域的内容哈希（用于判断同一位置的图像是否变化）
+
+    Args:
+        image: 截图（PIL图像）
+        bounds: 节点边界 [[x1, y1], [x2, y2]]
+
+    Returns:
+        str: 缩略图的MD5哈希
+    """
+    (x1, y1), (x2, y2) = bounds
+    if x2 <= x1 or y2 <= y1:
+        return ""
+    thumbnail = image.crop((x1, y1, x2, y2)).convert("L").resize(CROP_HASH_SIZE)
+    quantized = bytes(value >> CROP_HASH_QUANTIZE_SHIFT for value in thumbnail.tobytes())
+    return hashlib.md5(quantized).hexdigest()
+
+
 class ScreenStructuredInfoPerception:
     def __init__(self, visual_prompt_model_config, text_summarization_model_config):
         self.image_description_generator = VisualDescriptionGenerator(visual_prompt_model_config) if visual_prompt_model_config is not None else None
         self.text_summarizer = TextSummarizer(text_summarization_model_config) if text_summarization_model_config is not None else None
         self.log_t = LogTemplate(self,"ScreenStructuredInfoPerception")  # 日志模板
 
+        # ⭐ 增量感知状态：上一帧的节点索引与可复用的描述缓存
+        self._previous_node_index = None  # {节点键: 内容签名}
+        self._visual_desc_cache = {}  # {(节点键, 裁剪内容哈希): 视觉描述}，仅保留上一帧的结果
+        self._summary_cache = {}  # {子树JSON: 总结文本}
+        self._summary_cache_limit = 512
+
+    async def _generate_visual_description_incrementally(self, screenshot_file_info, at, track_diff):
+        """仅对新增/变化的图像节点请求视觉描述，未变化节点复用上一帧缓存
+
+        图像节点没有文本，节点键（resource-id、class、bounds）相同不代表图像相同（列表滚动后复用的槽位、
+        布局相同的新页面），因此缓存键同时包含截图上该区域的内容哈希
+
+        Args:
+            screenshot_file_info: 原始截图文件信息
+            at: ScreenPerceptionAccessibilityTree
+            track_diff: 是否用本帧结果刷新缓存
+
+        Returns:
+            dict: {节点序号: 视觉描述}，与 set_visual_desc_to_nodes 的索引一致
+        """
+        node_bounds_list, node_key_list = at.get_nodes_need_visual_desc(return_keys=True)
+        image = screenshot_file_info.get_screenshot_PILImage_file()
+        node_key_list = [(key, get_crop_content_hash(image, bounds)) for key, bounds in zip(node_key_list, node_bounds_list)]
+        missing = [i for i, key in enumerate(node_key_list) if key not in self._visual_desc_cache]
+
+        visual_description_map = {i: self._visual_desc_cache.get(key) for i, key in enumerate(node_key_list)}
+        if missing:
+            generated = await self.image_description_generator.generate_visual_description(
+                screenshot_file_info, [node_bounds_list[i] for i in missing])
+            for j, i in enumerate(missing):
+                visual_description_map[i] = generated[j]
+        logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(
+            f"Visual descriptions: {len(node_key_list) - len(missing)} reused, {len(missing)} generated"))
+
+        if track_diff:
+            self._visual_desc_cache = {key: visual_description_map[i] for i, key in enumerate(node_key_list)}
+        return visual_description_map
+
+    async def _summarize_text_with_cache(self, text_list):
+        """带缓存的可点击节点总结：子树内容未变化时复用之前的总结结果"""
+        cache_keys = [json.dumps(text, ensure_ascii=False, sort_keys=True) for text in text_list]
+        missing = [i for i, key in enumerate(cache_keys) if key not in self._summary_cache]
+        if missing:
+            generated = await self.text_summarizer.summarize_text([text_list[i] for i in missing])
+            for j, i in enumerate(missing):
+                self._summary_cache[cache_keys[i]] = generated[j]
+            # 超出上限时淘汰最早写入的条目
+            while len(self._summary_cache) > self._summary_cache_limit:
+                self._summary_cache.pop(next(iter(self._summary_cache)))
+        return {i: self._summary_cache.get(key) for i, key in enumerate(cache_keys)}
+
     def _generate_compressed_txt_from_nodes(self, nodes_need_marked):
         """从标记节点信息生成 compressed_txt（确保索引与SoM_mapping一致）
 
@@ -74,10 +152,34 @@ class ScreenStructuredInfoPerception:
 
         return "\n".join(lines)
 
-    async def get_perception_infos(self, raw_screenshot_file_info: ScreenFileInfo, ui_hierarchy_xml, non_visual_mode=False, target_app=None, use_clickable_node_summaries=True):
+    async def get_perception_infos(self, raw_screenshot_file_info: ScreenFileInfo, ui_hierarchy_xml, non_visual_mode=False, target_app=None, use_clickable_node_summaries=True, track_diff=True):
+        """屏幕结构化感知
+
+        Args:
+            raw_screenshot_file_info: 原始截图文件信息
+            ui_hierarchy_xml: UI层次结构XML（字符串或已解析的 ParsedHierarchy）
+            non_visual_mode: 是否为非视觉模式
+            target_app: 目标应用包名（过滤其他包的节点）
+            use_clickable_node_summaries: 非视觉模式下是否总结可点击节点
+            track_diff: 是否将本帧作为下一次差异计算的基准（临时截图如immediate截图应传False）
+
+        Returns:
+            Tuple[ScreenFileInfo, SSIPInfo]: 截图文件信息（视觉模式下为标记后的截图）与感知结果
+        """
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerStart)("Screen Perception"))
         logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)("Analyzing Screen Accessibility Tree..."))
-        at = ScreenPerceptionAccessibilityTree(ui_hierarchy_xml, target_app = target_app)
+        # ⭐ 本帧只解析一次，解析结果随 SSIPInfo 传给下游（XML压缩、状态识别）
+        hierarchy = ParsedHierarchy.of(ui_hierarchy_xml)
+        at = ScreenPerceptionAccessibilityTree(hierarchy, target_app = target_app)
+
+        # ⭐ 与上一帧的层次结构做差异（键：resource-id/class/bounds）
+        current_node_index = index_nodes(at.at_dict)
+        screen_diff = diff_node_index(self._previous_node_index, current_node_index)
+        if screen_diff is not None:
+            logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)(
+                f"Screen diff: {len(screen_diff.added)} added, {len(screen_diff.removed)} removed, {len(screen_diff.changed)} changed, {screen_diff.unchanged_count} unchanged"))
+        if track_diff:
+            self._previous_node_index = current_node_index
 
         # 确定宽高
         screenshot_image = raw_screenshot_file_info.get_screenshot_PILImage_file()
@@ -115,15 +217,15 @@ class ScreenStructuredInfoPerception:
             # 构建新的截屏文件对象
             screenshot_file_info = deepcopy(raw_screenshot_file_info)
             screenshot_file_info.file_extra_name = "marked"
-            screenshot_image_marked.convert("RGB").save(screenshot_file_info.get_screenshot_fullpath())
+            screenshot_file_info.set_image(screenshot_image_marked.convert("RGB"))
+            screenshot_file_info.persist()  # 后台写盘，内存中的标记图可直接供后续消费者使用
 
         # 如果是非图像模式（适用于不具备视觉能力的模型）
         if non_visual_mode:
             logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)("Fetching image node contents..."))
             # 补全图像节点
             if self.image_description_generator is not None:
-                node_bounds_list = at.get_nodes_need_visual_desc()
-                visual_description_map = await self.image_description_generator.generate_visual_description(raw_screenshot_file_info, node_bounds_list)
+                visual_description_map = await self._generate_visual_description_incrementally(raw_screenshot_file_info, at, track_diff)
                 at.set_visual_desc_to_nodes(visual_description_map)
             else:
                 raise RuntimeError(self.log_t.log(LogEventType.MissingConfig)("'non_visual_mode=True'", "visual_prompt_model_config", "critical"))
@@ -132,7 +234,7 @@ class ScreenStructuredInfoPerception:
             if use_clickable_node_summaries:
                 logger.bind(log_tag="fairy_sys").debug(self.log_t.log(LogEventType.Notice)("Summarizing clickable node contents..."))
                 if self.text_summarizer is not None:
-                    page_desc = await at.get_page_description(self.text_summarizer.summarize_text)
+                    page_desc = await at.get_page_description(self._summarize_text_with_cache)
                 else:
                     logger.bind(log_tag="fairy_sys").error(self.log_t.log(LogEventType.MissingConfig)("'non_visual_mode=True' and 'use_clickable_node_summaries=True'", "text_summarization_model_config", "error"))
                     page_desc = await at.get_page_description()
@@ -145,7 +247,7 @@ class ScreenStructuredInfoPerception:
             page_desc = None
 
         logger.bind(log_tag="fairy_sys").info(self.log_t.log(LogEventType.WorkerCompleted)("Screen Perception"))
-        return screenshot_file_info, SSIPInfo(width, height, [ui_hierarchy_xml, page_desc, at.at_dict], non_visual_mode, SoM_mapping=SoM_mapping, som_compressed_txt=som_compressed_txt)
+        return screenshot_file_info, SSIPInfo(width, height, [hierarchy.xml, page_desc, at.at_dict], non_visual_mode, SoM_mapping=SoM_mapping, som_compressed_txt=som_compressed_txt, screen_diff=screen_diff, hierarchy=hierarchy)
 
         # # ocr过滤被遮盖节点
         # ocr_filter_xml = self.ocr_filter.filter(ui_hierarchy_xml,screenshot_file_info)
\ No newline at end of file
@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+def get_node_key(node) -> Tuple:
+    """节点结构键：resource-id + class + bounds（同一位置的同一控件视为同一节点）"""
+    bounds = node.get('bounds') or []
+    return node.get('resource-id'), node.get('class'), tuple(tuple(point) for point in bounds)
+
+
+def get_node_signature(node) -> Tuple:
+    """节点内容签名：用于判断结构键相同的节点内容是否发生变化（文本、勾选/选中等属性）"""
+    return node.get('text') or '', tuple(sorted(node.get('properties', [])))
+
+
+def index_nodes(at_dict) -> Dict[Tuple, Tuple]:
+    """将可访问性树展开为 {节点键: 内容签名}，按先序遍历，重复键保留首次出现
+
+    Args:
+        at_dict: ScreenAccessibilityTree.at_dict（根节点列表）
+
+    Returns:
+        Dict[Tuple, Tuple]: 节点索引
+    """
+    index = {}
+    stack = list(reversed(at_dict))
+    while stack:
+        node = stack.pop()
+        index.setdefault(get_node_key(node), get_node_signature(node))
+        stack.extend(reversed(node.get('children', [])))
+    return index
+
+
+@dataclass
+class ScreenHierarchyDiff:
+    """两帧UI层次结构之间的结构差异"""
+    added: List[Tuple] = field(default_factory=list)  # [(key, signature)]
+    removed: List[Tuple] = field(default_factory=list)  # [(key, signature)]
+    changed: List[Tuple] = field(default_factory=list)  # [(key, old_signature, new_signature)]
+    unchanged_count: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    @staticmethod
+    def _describe(key, signature) -> str:
+        resource_id, class_name, bounds = key
+        text, properties = signature
+        parts = [class_name.split('.')[-1] if class_name else 'Unknown']
+        if resource_id:
+            parts.append(f"({resource_id.split('/')[-1]})")
+        if text:
+            parts.append(f"[{text[:40]}]")
+        if properties:
+            parts.append(f"[{', '.join(properties)}]")
+        if bounds:
+            parts.append(f"@{[list(point) for point in bounds]}")
+        return " ".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            'added': [self._describe(key, sig) for key, sig in self.added],
+            'removed': [self._describe(key, sig) for key, sig in self.removed],
+            'changed': [f"{self._describe(key, old)} -> {self._describe(key, new)}" for key, old, new in self.changed],
+            'unchanged_count': self.unchanged_count
+        }
+
+    def get_summary(self, max_items=10) -> str:
+        """生成供 Reflector 使用的"屏幕变化"摘要
+
+        Args:
+            max_items: 每类变化最多列出的节点数
+
+        Returns:
+            str: 文本摘要
+        """
+        if not self.has_changes:
+            return f"No structural change detected ({self.unchanged_count} nodes unchanged).\n"
+
+        lines = [f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed, {self.unchanged_count} unchanged."]
+        diff_dict = self.to_dict()
+        for label, items in (("+", diff_dict['added']), ("-", diff_dict['removed']), ("~", diff_dict['changed'])):
+            for item in items[:max_items]:
+                lines.append(f"  {label} {item}")
+            if len(items) > max_items:
+                lines.append(f"  {label} ... and {len(items) - max_items} more")
+        return "\n".join(lines) + "\n"
+
+
+def diff_node_index(previous_index: Optional[Dict[Tuple, Tuple]], current_index: Dict[Tuple, Tuple]) -> Optional[ScreenHierarchyDiff]:
+    """计算两帧节点索引的结构差异
+
+    Args:
+        previous_index: 上一帧的节点索引（None 表示没有上一帧）
+        current_index: 当前帧的节点索引
+
+    Returns:
+        Optional[ScreenHierarchyDiff]: 差异结果，无上一帧时返回 None
+    """
+    if previous_index is None:
+        return None
+
+    diff = ScreenHierarchyDiff()
+    for key, signature in current_index.items():
+        previous_signature = previous_index.get(key)
+        if previous_signature is None:
+            diff.added.append((key, signature))
+        elif previous_signature != signature:
+            diff.changed.append((key, previous_signature, signature))
+        else:
+            diff.unchanged_count += 1
+    for key, signature in previous_index.items():
+        if key not in current_index:
+            diff.removed.append((key, signature))
+    return diff
@@ -1,23 +1,29 @@
 from copy import deepcopy
+from typing import Union
 
+from Fairy.tools.screen_perceptor.ssip_new.perceptor.screen_diff import get_node_key
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
 from Fairy.tools.screen_perceptor.ssip_new.screen_AT import ScreenAccessibilityTree
 
 
 class ScreenPerceptionAccessibilityTree(ScreenAccessibilityTree):
-    def __init__(self, at_xml: str, target_app: None):
+    def __init__(self, at_xml: Union[str, ParsedHierarchy], target_app: None):
         super().__init__(at_xml, target_app)
 
-    def get_nodes_need_visual_desc(self):
+    def get_nodes_need_visual_desc(self, return_keys=False):
         node_bounds_list = []
+        node_key_list = []
         def _need_visual_filter(node):
             # 如果是叶子节点且类名为 ImageView 或 View，则需要视觉描述
             if len(node['children']) == 0 and node['class'] in ['android.widget.ImageView', 'android.view.View']:
                 node_bounds_list.append(node['bounds'])
+                node_key_list.append(get_node_key(node))
             return node
 
         for at_node in self.at_dict:
             self._common_filter(at_node, _need_visual_filter)
-        return node_bounds_list
+        # ⭐ return_keys=True 时同时返回节点结构键，用于增量感知复用缓存的视觉描述
+        return (node_bounds_list, node_key_list) if return_keys else node_bounds_list
 
     def set_visual_desc_to_nodes(self, desc_map):
         index = 0
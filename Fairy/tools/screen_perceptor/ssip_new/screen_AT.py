@@ -1,24 +1,27 @@
 from copy import deepcopy
+from typing import Union
 
-import xmltodict
 import re
 
 from loguru import logger
 
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
+
+NODE_PROPERTY_ATTRS = ('checkable', 'checked', 'clickable', 'enabled', 'focusable', 'focused', 'scrollable', 'long-clickable', 'password', 'selected', 'visible-to-user')
+BOUNDS_PATTERN = re.compile(r'\[(\d+),(\d+)\]')
 
-class ScreenAccessibilityTree:
-    def __init__(self, at_xml: str, target_app: None):
-        self.at_xml_raw = at_xml
-        self.at_dict_raw = xmltodict.parse(self.at_xml_raw)['hierarchy']['node']
 
-        # 确保at_dict_raw是列表
-        if not isinstance(self.at_dict_raw, list):
-            self.at_dict_raw = [self.at_dict_raw]
+class ScreenAccessibilityTree:
+    def __init__(self, at_xml: Union[str, ParsedHierarchy], target_app: None):
+        # ⭐ 接受已解析的层次结构（与XML压缩、状态识别共享同一次解析）
+        self.hierarchy = ParsedHierarchy.of(at_xml)
+        self.at_xml_raw = self.hierarchy.xml
+        self.at_dict_raw = self.hierarchy.top_nodes
 
         self.at_dict = []
         for at_node in self.at_dict_raw:
             if target_app is not None:
-                package = at_node.get('@package', '')
+                package = at_node.get('package', '')
                 # 保留目标app的节点，或者android系统弹窗（PopupWindow、Dialog等）
                 should_keep = (
                     package == target_app or
@@ -40,21 +43,20 @@ class ScreenAccessibilityTree:
     def _node_info_collector(self, at_node, layer):
         at_node_info = {}
         # 收集类名、包名、资源ID
-        at_node_info['class'] = at_node.get('@class')
-        at_node_info['package'] = at_node.get('@package')
-        at_node_info['resource-id'] = at_node.get('@resource-id') if at_node.get('@resource-id') != '' else None
+        at_node_info['class'] = at_node.get('class')
+        at_node_info['package'] = at_node.get('package')
+        at_node_info['resource-id'] = at_node.get('resource-id') if at_node.get('resource-id') != '' else None
 
         # 收集关键属性(非False)
         at_node_info['properties'] = []
         for key, value in at_node.items():
-            if value and value != 'false' and key in ['@checkable', '@checked', '@clickable', '@enabled', '@focusable', '@focused', '@scrollable', '@long-clickable', '@password', '@selected', '@visible-to-user']:
-                at_node_info['properties'].append(key.replace('@', ''))
+            if value and value != 'false' and key in NODE_PROPERTY_ATTRS:
+                at_node_info['properties'].append(key)
 
         # 收集坐标信息
-        bounds = at_node.get('@bounds') # 形如[x1,y1][x2,y2]的字符串
+        bounds = at_node.get('bounds') # 形如[x1,y1][x2,y2]的字符串
         # 正则表达式匹配方括号内的数字
-        pattern = r'\[(\d+),(\d+)\]'
-        matches = re.findall(pattern, bounds)
+        matches = BOUNDS_PATTERN.findall(bounds)
         bounds = [[int(x), int(y)] for x, y in matches] # 形如[[x1,y1],[x2,y2]]的数组
         at_node_info['bounds'] = bounds
         at_node_info['center'] = [ # 计算中心点坐标
@@ -62,14 +64,13 @@ class ScreenAccessibilityTree:
         ]
 
         # 收集文本信息
-        at_node_info['text'] = at_node.get('@text', None).replace("\n","")
+        at_node_info['text'] = at_node.get('text', None).replace("\n","")
 
         at_node_info['layer'] = layer
 
         # 递归处理子节点
         at_node_info['children'] = []
-        node = at_node.get('node', [])
-        for sub_node in node if isinstance(node, list) else [node]:
+        for sub_node in at_node.findall('node'):
             at_node_info['children'].append(self._node_info_collector(sub_node, layer + [at_node_info['class']]))
 
         return at_node_info
@@ -3,8 +3,6 @@ import os
 import uuid
 import xml.etree.ElementTree as ET
 
-from config.config import initialize_config
-
 # 定义布尔属性列表
 BOOL_ATTRS = {
     "checkable", "checked", "clickable", "enabled", "focusable",
@@ -307,6 +305,8 @@ def compress_xml_node(root: ET.Element) -> ET.Element:
 
 
 if __name__ == "__main__":
+    from config.config import initialize_config
+
     input_xml = "/Users/jackyyang/Desktop/端侧大模型/code/MobileAgentX/static/ASSM/xml/实习.xml"
     output_dir = "/Users/jackyyang/Desktop/端侧大模型/code/MobileAgentX/pkg/transform/tools"
     config = initialize_config()
@@ -1,9 +1,12 @@
 import subprocess
 import os
+import xml.etree.ElementTree as ET
 from datetime import datetime
 
 from sympy import capture
 
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
+
 
 class UIAutomatorCapture:
     def __init__(self, adb_path="/Users/jackyyang/android_sdk/platform-tools/adb", output_dir="./captures", use_singleton=False, device_id=None):
@@ -145,6 +148,36 @@ class XMLCompressor:
     def __init__(self, output_dir="./captures"):
         self.output_dir = output_dir
 
+    def compress_xml_in_memory(self, ui_xml):
+        """
+        在内存中压缩 XML（不写文件），同时生成 Fairy 的文本描述格式
+
+        传入已解析的 ParsedHierarchy 时复用其解析结果，且同一帧的压缩结果只计算一次
+
+        Args:
+            ui_xml: 原始UI XML字符串，或 ParsedHierarchy
+
+        Returns:
+            (压缩后的 XML 字节串（含XML声明）, 文本描述)
+        """
+        hierarchy = ParsedHierarchy.of(ui_xml)
+        return hierarchy.derive("xml_compressor", self._compress_hierarchy)
+
+    def _compress_hierarchy(self, hierarchy):
+        """压缩已解析的层次结构（构建新的压缩树，不修改共享的解析树）"""
+        # 压缩
+        compressed_root = self._compress_xml_node(hierarchy.root)
+
+        new_tree = ET.ElementTree(compressed_root)
+        try:
+            ET.indent(new_tree, space="  ")
+        except Exception:
+            pass  # Python 3.9 以下版本不支持 indent
+
+        compressed_xml = ET.tostring(compressed_root, encoding="UTF-8", xml_declaration=True)
+        text_desc = self._format_ui_tree_to_text(compressed_root)
+        return compressed_xml, text_desc
+
     async def compress_xml(self, ui_xml, timestamp, target_app=None):
         """
         压缩 XML 并保存（使用 MobileAgentX 快速算法），同时生成 Fairy 的文本描述格式
@@ -157,30 +190,19 @@ class XMLCompressor:
         Returns:
             (压缩后的 XML 文件路径, 文本描述文件路径)
         """
-        import xml.etree.ElementTree as ET
         import time
 
         print("正在压缩XML（使用 MobileAgentX 快速算法）...")
         start_time = time.time()
 
-        # 解析 XML
-        root = ET.fromstring(ui_xml)
-
-        # 压缩
-        compressed_root = self._compress_xml_node(root)
+        compressed_xml, text_desc = self.compress_xml_in_memory(ui_xml)
 
         # 1. 写入压缩后的 XML
-        new_tree = ET.ElementTree(compressed_root)
-        try:
-            ET.indent(new_tree, space="  ")
-        except Exception:
-            pass  # Python 3.9 以下版本不支持 indent
-
         compressed_xml_path = os.path.join(self.output_dir, f"compressed_{timestamp}.xml")
-        new_tree.write(compressed_xml_path, encoding="UTF-8", xml_declaration=True)
+        with open(compressed_xml_path, 'wb') as f:
+            f.write(compressed_xml)
 
-        # 2. 转换为 Fairy 的文本描述格式
-        text_desc = self._format_ui_tree_to_text(compressed_root)
+        # 2. 写入 Fairy 的文本描述格式
         text_path = os.path.join(self.output_dir, f"compressed_{timestamp}.txt")
         with open(text_path, 'w', encoding='utf-8') as f:
             f.write(text_desc)
@@ -195,7 +217,11 @@ class XMLCompressor:
     def _format_ui_tree_to_text(self, node, indent=0):
         """将 ElementTree 节点格式化为 Fairy 的文本描述格式"""
         lines = []
+        self._append_ui_tree_lines(node, indent, lines)
+        return "\n".join(lines)
 
+    def _append_ui_tree_lines(self, node, indent, lines):
+        """先序遍历，将每个节点的描述行追加到 lines（避免逐层拼接字符串）"""
         # 合并 class 信息
         base_class = node.get('class', 'Unknown')
         full_class = base_class.split('.')[-1] if base_class else 'Unknown'
@@ -228,14 +254,11 @@ class XMLCompressor:
             desc_parts.append(props_text)
 
         # 输出行
-        line = "  " * indent + "- " + " ".join(desc_parts)
-        lines.append(line)
+        lines.append("  " * indent + "- " + " ".join(desc_parts))
 
         # 递归子节点
         for child in node:
-            lines.append(self._format_ui_tree_to_text(child, indent + 1))
-
-        return "\n".join(lines)
+            self._append_ui_tree_lines(child, indent + 1, lines)
 
     def _parse_properties(self, node):
         """从节点的布尔属性中提取 properties 列表"""
@@ -247,21 +270,63 @@ class XMLCompressor:
 
     def _compress_xml_node(self, root):
         """
-        对传入的 XML 根节点执行压缩操作，包括嵌套合并、无意义节点删除等，返回压缩后的根节点。
-        （基于 MobileAgentX 的实现）
+        对传入的 XML 根节点执行压缩操作，包括嵌套合并、无意义节点删除等，返回新的压缩后根节点（不修改传入的树）。
+
+        输出与 MobileAgentX 的多遍实现（合并单子节点 → 3 轮"删除无意义节点 + 合并" → 4 遍属性清理）一致，
+        但只做一次后序遍历，总耗时与节点数成线性：
+        - 单子节点链在下行时收集，到达链底后自底向上合并属性（与原实现的合并顺序一致）
+        - 子节点处理完后立即做删除判断；只剩一个子节点时与其合并，合并得到的叶子再做删除判断，直至不动点
+        - 节点确定不会再被合并时（父节点保留了多个子节点，或为根节点）立即清理属性并添加 center
         """
-        merged_root = self._merge_single_child_nodes(root)
+        compressed_root = self._compress_subtree(root)
+        if compressed_root is None:
+            # 整棵树都是无意义节点，返回不含子节点的根节点
+            compressed_root = ET.Element(root.tag, root.attrib)
+        self._finalize_node(compressed_root)
+        return compressed_root
+
+    def _compress_subtree(self, node):
+        """压缩以 node 为根的子树，返回新节点（属性尚未清理，可能继续被父节点合并），整棵子树被删除时返回 None"""
+        # 1. 沿单子节点链下行，链上的节点都会被合并进链底节点
+        chain = []
+        while len(node) == 1:
+            chain.append(node)
+            node = node[0]
 
-        for _ in range(3):
-            merged_root = self._delete_meaningless_node(merged_root)
-            merged_root = self._merge_single_child_nodes(merged_root)
+        attrib, text = dict(node.attrib), node.text
+        for ancestor in reversed(chain):
+            attrib = self._merge_attributes(ancestor.attrib, attrib)
+            text = self._merge_text(ancestor.text, text)
 
-        self._clean_false_attributes(merged_root)
-        self._clean_empty_attributes(merged_root)
-        self._clean_remove_true_or_non_empty_attributes(merged_root)
-        self._add_bounds_center_attribute(merged_root)
+        compressed = ET.Element(node.tag, attrib)
+        compressed.text = text
+        compressed.tail = node.tail
 
-        return merged_root
+        # 2. 后序处理子节点
+        children = []
+        for child in node:
+            compressed_child = self._compress_subtree(child)
+            if compressed_child is not None:
+                children.append(compressed_child)
+
+        # 3. 叶子节点：判断是否删除
+        if not children:
+            return None if self._is_meaningless_leaf(compressed) else compressed
+
+        # 4. 删除后只剩一个子节点：提升子节点，合并后若成为无意义叶子则继续删除
+        if len(children) == 1:
+            child = children[0]
+            child.attrib = self._merge_attributes(compressed.attrib, child.attrib)
+            child.text = self._merge_text(compressed.text, child.text)
+            if len(child) == 0 and self._is_meaningless_leaf(child):
+                return None
+            return child
+
+        # 5. 保留多个子节点：子节点不会再被合并，清理属性
+        for child in children:
+            self._finalize_node(child)
+        compressed.extend(children)
+        return compressed
 
     def _merge_attributes(self, parent_attrib, child_attrib):
         """合并父节点与子节点的属性（不删除 false，统一在后处理）"""
@@ -276,87 +341,46 @@ class XMLCompressor:
                     merged[key] = p_val
         return merged
 
-    def _merge_single_child_nodes(self, node):
-        """合并仅包含单一子节点的结构，提升子节点"""
-        children = list(node)
-        for child in children:
-            merged_child = self._merge_single_child_nodes(child)
-            node.remove(child)
-            node.append(merged_child)
-
-        while len(node) == 1:
-            child = node[0]
-            child.attrib = self._merge_attributes(node.attrib, child.attrib)
-            if node.text and node.text.strip():
-                if child.text and child.text.strip():
-                    child.text = node.text.strip() + " " + child.text.strip()
-                else:
-                    child.text = node.text.strip()
-            node = child
-        return node
-
-    def _delete_meaningless_node(self, node):
-        """删除无意义的节点（后根遍历）"""
-        children_to_keep = []
-        for child in list(node):
-            pruned_child = self._delete_meaningless_node(child)
-            if pruned_child is not None:
-                children_to_keep.append(pruned_child)
-        node[:] = children_to_keep  # 更新子节点列表
-
-        # 如果是叶子节点且满足条件，返回 None 表示删除
-        if len(node) == 0:
-            all_false = all(node.get(attr) == "false" for attr in self.MEANINGFUL_BOOL_ATTRS)
-            text_empty = not node.get("text", "").strip()
-            not_image_view = node.get("class") != "android.widget.ImageView"
-
-            if all_false and text_empty and not_image_view:
-                return None  # 删除该节点
-
-            # 判断是否是 ImageView，并且 clickable 和 long-clickable 都为 false
-            if node.get("class") == "android.widget.ImageView":
-                clickable = node.get("clickable", "false") == "true"
-                long_clickable = node.get("long-clickable", "false") == "true"
-                if not clickable and not long_clickable:
-                    return None  # 删除该节点
-
-        return node  # 保留该节点
-
-    def _clean_false_attributes(self, node):
-        """遍历所有节点，删除值为 false 且不在保留列表中的布尔属性"""
-        keys_to_delete = [
-            k for k, v in node.attrib.items()
-            if k in self.BOOL_ATTRS and v.lower() == "false" and k not in self.KEEP_FALSE_BOOLEAN_ATTRS
-        ]
-        for k in keys_to_delete:
-            del node.attrib[k]
-        for child in node:
-            self._clean_false_attributes(child)
-
-    def _clean_empty_attributes(self, node):
-        """遍历所有节点，删除值为空的属性（只删除空属性且不在保留列表中）"""
-        keys_to_delete = [
-            k for k, v in node.attrib.items()
-            if not v.strip() and k not in self.KEEP_EMPTY_STRING_ATTRS
-        ]
-        for k in keys_to_delete:
-            del node.attrib[k]
-        for child in node:
-            self._clean_empty_attributes(child)
-
-    def _clean_remove_true_or_non_empty_attributes(self, node):
-        """遍历所有节点，删除即使为 true 或非空的属性，如果在配置项中"""
-        keys_to_delete = [
-            k for k, v in node.attrib.items()
-            if k in self.REMOVE_IF_TRUE_OR_NON_EMPTY and (v.lower() == "true" or v.strip())
-        ]
-        for k in keys_to_delete:
-            del node.attrib[k]
-        for child in node:
-            self._clean_remove_true_or_non_empty_attributes(child)
+    @staticmethod
+    def _merge_text(parent_text, child_text):
+        """合并父节点与子节点的文本内容"""
+        if parent_text and parent_text.strip():
+            if child_text and child_text.strip():
+                return parent_text.strip() + " " + child_text.strip()
+            return parent_text.strip()
+        return child_text
+
+    def _is_meaningless_leaf(self, node):
+        """判断叶子节点是否无意义（应删除）"""
+        all_false = all(node.get(attr) == "false" for attr in self.MEANINGFUL_BOOL_ATTRS)
+        text_empty = not node.get("text", "").strip()
+        not_image_view = node.get("class") != "android.widget.ImageView"
+
+        if all_false and text_empty and not_image_view:
+            return True
+
+        # 判断是否是 ImageView，并且 clickable 和 long-clickable 都为 false
+        if node.get("class") == "android.widget.ImageView":
+            clickable = node.get("clickable", "false") == "true"
+            long_clickable = node.get("long-clickable", "false") == "true"
+            if not clickable and not long_clickable:
+                return True
+
+        return False
+
+    def _finalize_node(self, node):
+        """清理单个节点的属性：删除 false 布尔属性、空属性、配置中要删除的属性，并添加 center"""
+        # 三条规则都只看单个属性的键值，一次遍历同时判断
+        node.attrib = {
+            k: v for k, v in node.attrib.items()
+            if not (k in self.BOOL_ATTRS and v.lower() == "false" and k not in self.KEEP_FALSE_BOOLEAN_ATTRS)
+            and not (not v.strip() and k not in self.KEEP_EMPTY_STRING_ATTRS)
+            and not (k in self.REMOVE_IF_TRUE_OR_NON_EMPTY and (v.lower() == "true" or v.strip()))
+        }
+        self._add_bounds_center_attribute(node)
 
     def _add_bounds_center_attribute(self, node):
-        """给每个包含 bounds 属性的节点添加一个 center 属性，表示其中心点坐标"""
+        """给包含 bounds 属性的节点添加一个 center 属性，表示其中心点坐标"""
         bounds = node.attrib.get("bounds", "")
         if bounds:
             try:
@@ -377,8 +401,6 @@ class XMLCompressor:
                         node.attrib["center"] = f"[{center_x},{center_y}]"
             except ValueError:
                 pass  # 如果解析失败，忽略该节点
-        for child in node:
-            self._add_bounds_center_attribute(child)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+对比 ADB 截图的两条主机侧路径：
+
+- file 模式（当前默认）：PNG 解码 ← 读文件 ← 写文件 ← PNG 编码（模拟 screencap -p + pull 后再打开）
+  另外还有 3 次 subprocess 之间固定的 3 秒等待，这里单独列出
+- raw 模式：解析 exec-out screencap 原始帧 → NumPy → PIL 图像
+
+使用录制好的帧缓冲样本（默认保存在系统临时目录，可用 --fixture 指定路径，不写入仓库）。样本不存在时：
+- 连接了设备则用 `--record` 从设备录制：python benchmark_raw_screencap.py --record --adb adb
+- 否则从 captures/ 下的截图生成一份
+"""
+
+import argparse
+import asyncio
+import gzip
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image as PILImage
+
+from Fairy.tools.mobile_controller.adb_tools.raw_screencap import (
+    capture_raw_framebuffer, parse_raw_framebuffer, framebuffer_to_image, encode_raw_framebuffer
+)
+
+DEFAULT_FIXTURE_PATH = Path(tempfile.gettempdir()) / "fairy_framebuffer_fixture.raw.gz"
+SOURCE_SCREENSHOT = project_root / "captures" / "20251214_172759" / "screenshot_20251214_172759.png"
+FILE_MODE_FIXED_SLEEP = 3.0  # file 模式三条命令之间各 sleep 1 秒
+
+
+def load_or_build_fixture(fixture_path: Path, record: bool, adb_path: str) -> bytes:
+    """加载帧缓冲样本，必要时录制或从截图生成"""
+    if record:
+        raw = asyncio.run(capture_raw_framebuffer(adb_path))
+        fixture_path.write_bytes(gzip.compress(raw))
+        print(f"✓ 已从设备录制帧缓冲样本: {fixture_path}")
+    elif not fixture_path.exists():
+        raw = encode_raw_framebuffer(PILImage.open(SOURCE_SCREENSHOT))
+        fixture_path.write_bytes(gzip.compress(raw))
+        print(f"✓ 已从截图生成帧缓冲样本: {fixture_path}")
+    return gzip.decompress(fixture_path.read_bytes())
+
+
+def bench(func, rounds):
+    func()  # 预热
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - t0) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE_PATH, help="帧缓冲样本路径")
+    parser.add_argument("--record", action="store_true", help="从已连接设备录制帧缓冲样本")
+    parser.add_argument("--adb", default="adb")
+    args = parser.parse_args()
+
+    raw = load_or_build_fixture(args.fixture, args.record, args.adb)
+    frame = parse_raw_framebuffer(raw)
+    height, width = frame.shape[:2]
+    png_bytes = io.BytesIO()
+    framebuffer_to_image(frame).save(png_bytes, "PNG")
+    png_bytes = png_bytes.getvalue()
+    print(f"样本: {width}x{height}, raw={len(raw) / 1e6:.1f}MB, png={len(png_bytes) / 1e6:.1f}MB")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        png_path = os.path.join(tmp_dir, "screenshot.png")
+
+        def file_mode():
+            # 手机端 PNG 编码 + pull 写文件 + 主机端打开解码
+            buffer = io.BytesIO()
+            framebuffer_to_image(frame).save(buffer, "PNG")
+            with open(png_path, "wb") as f:
+                f.write(buffer.getvalue())
+            PILImage.open(png_path).load()
+
+        def raw_mode():
+            framebuffer_to_image(parse_raw_framebuffer(raw))
+
+        results = [
+            ("file (PNG encode/write/read/decode)", bench(file_mode, args.rounds)),
+            ("raw", bench(raw_mode, args.rounds)),
+        ]
+
+    print("\n" + "=" * 60)
+    for name, seconds in results:
+        print(f"{name:<40} {seconds * 1000:8.1f} ms")
+    print(f"{'file mode fixed sleeps (not included)':<40} {FILE_MODE_FIXED_SLEEP * 1000:8.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+对比 XML 压缩的两种实现：
+
+- multi-pass：MobileAgentX 原始实现（Perceptor/compressXML_original.py）：合并单子节点 4 次、删除无意义节点 3 次，
+  再做 4 遍属性清理；合并时逐个 remove/append 子节点，兄弟节点多时为平方复杂度
+- fused：XMLCompressor 的单次后序遍历实现
+
+使用 captures/ 下的 UI XML 样本，以及一份合成的宽层次结构（单个父节点下 N 个兄弟节点）用于观察随节点数的增长。
+两种实现的压缩结果会先做一致性校验。
+
+用法：python benchmark_xml_compressor.py [--rounds 20] [--siblings 500 2000 8000]
+"""
+
+import argparse
+import copy
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Perceptor.tools import XMLCompressor
+from Perceptor.compressXML_original import compress_xml_node as multi_pass_compress
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
+
+SIBLING_TEMPLATE = (
+    '<node index="{i}" text="Item {i}" resource-id="com.example:id/title" class="android.widget.TextView" '
+    'package="com.example" content-desc="" checkable="false" checked="false" clickable="true" enabled="true" '
+    'focusable="true" focused="false" scrollable="false" long-clickable="false" password="false" selected="false" '
+    'bounds="[0,{top}][1080,{bottom}]" />'
+)
+
+
+def build_wide_hierarchy(siblings: int) -> str:
+    """合成一个单父节点下有大量兄弟节点的层次结构（例如很长的列表）"""
+    nodes = "".join(SIBLING_TEMPLATE.format(i=i, top=i * 10, bottom=i * 10 + 10) for i in range(siblings))
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+        '<node index="0" text="" resource-id="com.example:id/list" class="android.widget.ListView" package="com.example" '
+        'content-desc="" checkable="false" checked="false" clickable="false" enabled="true" focusable="true" focused="false" '
+        'scrollable="true" long-clickable="false" password="false" selected="false" bounds="[0,0][1080,2400]">'
+        f'{nodes}<node index="x" text="" resource-id="" class="android.view.View" package="com.example" content-desc="" '
+        'checkable="false" checked="false" clickable="false" enabled="true" focusable="false" focused="false" '
+        'scrollable="false" long-clickable="false" password="false" selected="false" bounds="[0,0][1,1]" />'
+        '</node></hierarchy>'
+    )
+
+
+def bench(func, rounds):
+    func()  # 预热
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - t0) / rounds
+
+
+def compare(name, ui_xml, rounds):
+    hierarchy = ParsedHierarchy(ui_xml)
+    root = hierarchy.root
+    compressor = XMLCompressor()
+
+    # 一致性校验（多遍实现会就地修改，传入副本）
+    expected = ET.tostring(multi_pass_compress(copy.deepcopy(root)))
+    actual = ET.tostring(compressor._compress_xml_node(root))
+    assert expected == actual, f"{name}: 两种实现的压缩结果不一致"
+
+    multi_pass = bench(lambda: multi_pass_compress(copy.deepcopy(root)), rounds)
+    copy_only = bench(lambda: copy.deepcopy(root), rounds)
+    fused = bench(lambda: compressor._compress_xml_node(root), rounds)
+    # 完整压缩：压缩树 + 序列化XML + 文本描述（直接调用，绕过按帧缓存）
+    end_to_end = bench(lambda: compressor._compress_hierarchy(hierarchy), rounds)
+    # 多遍实现就地修改，需要扣除复制解析树的耗时
+    return name, len(root.findall(".//node")), multi_pass - copy_only, fused, end_to_end
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--siblings", type=int, nargs="*", default=[500, 2000, 8000])
+    args = parser.parse_args()
+
+    results = []
+    for fixture in sorted(project_root.glob("captures/*/ui_dump_*.xml")):
+        results.append(compare(fixture.name, fixture.read_text(encoding='utf-8'), args.rounds))
+    for siblings in args.siblings:
+        results.append(compare(f"synthetic wide x{siblings}", build_wide_hierarchy(siblings), max(1, args.rounds // 5)))
+
+    print("=" * 96)
+    print(f"{'sample':<34} {'nodes':>7} {'multi-pass':>12} {'fused':>12} {'speedup':>9} {'fused+xml+txt':>15}")
+    for name, nodes, multi_pass, fused, end_to_end in results:
+        print(f"{name:<34} {nodes:>7} {multi_pass * 1000:>9.2f} ms {fused * 1000:>9.2f} ms "
+              f"{multi_pass / fused:>8.1f}x {end_to_end * 1000:>12.2f} ms")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    main()
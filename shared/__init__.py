@@ -5,5 +5,6 @@
 """
 
 from .device_manager import DeviceManager
+from .blob_store import BlobStore
 
-__all__ = ['DeviceManager']
+__all__ = ['DeviceManager', 'BlobStore']
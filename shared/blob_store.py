@@ -0,0 +1,204 @@
+"""
+内容寻址的产物存储
+
+同一张截图/同一份XML在一次会话中会出现在多个位置（Executor 输出目录、步骤的 stable/、immediate/ 目录等）。
+BlobStore 按文件内容的 sha256 将每份内容只保存一次（blobs/<前两位>/<摘要><后缀>），
+各位置的文件通过硬链接指向同一个 blob；文件系统不支持硬链接时退化为复制，并在清单中记录引用关系。
+
+注意：blob 与其硬链接共享同一份数据，链接出去的文件应视为只读（产物本身都是一次写入的）。
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from loguru import logger
+
+PathLike = Union[str, Path]
+
+
+class BlobStore:
+    """会话级内容寻址存储
+
+    Attributes:
+        root: blob 根目录
+        manifest: 引用清单 {目标路径: 摘要}
+        stats: 统计信息（写入的 blob 数、去重次数、硬链接/复制次数、节省的字节数）
+    """
+
+    MANIFEST_FILENAME = "manifest.json"
+    _HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: PathLike, use_hardlinks: bool = True):
+        """
+        Args:
+            root: blob 根目录（通常为会话目录下的 blobs/）
+            use_hardlinks: 是否使用硬链接；为False或链接失败时复制文件
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.use_hardlinks = use_hardlinks
+        self.manifest: Dict[str, str] = {}
+        self.stats = {"blobs": 0, "dedup_hits": 0, "hardlinks": 0, "copies": 0, "bytes_saved": 0}
+        self._lock = threading.RLock()
+        # 源文件 (路径, mtime, 大小) -> 摘要，避免同一源文件被重复计算哈希
+        self._digest_cache: Dict[Tuple[str, int, int], str] = {}
+
+    # ==================== 写入 blob ====================
+
+    def _blob_path(self, digest: str, suffix: str = "") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def _hash_file(self, src: Path) -> str:
+        stat = src.stat()
+        key = (str(src.resolve()), stat.st_mtime_ns, stat.st_size)
+        digest = self._digest_cache.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(src, 'rb') as f:
+                for chunk in iter(lambda: f.read(self._HASH_CHUNK_SIZE), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._digest_cache[key] = digest
+        return digest
+
+    def put_file(self, src: PathLike) -> Path:
+        """将文件内容存入 store（内容已存在时不重复写入）
+
+        源文件会被复制（而不是链接）进 store，这样之后源文件被原地改写也不会影响 blob
+
+        Args:
+            src: 源文件路径
+
+        Returns:
+            Path: blob 路径
+        """
+        src = Path(src)
+        with self._lock:
+            digest = self._hash_file(src)
+            blob_path = self._blob_path(digest, src.suffix)
+            if blob_path.exists():
+                self.stats["dedup_hits"] += 1
+                self.stats["bytes_saved"] += blob_path.stat().st_size
+            else:
+                blob_path.parent.mkdir(exist_ok=True)
+                tmp_path = blob_path.with_name(blob_path.name + ".tmp")
+                shutil.copyfile(src, tmp_path)
+                os.replace(tmp_path, blob_path)
+                self.stats["blobs"] += 1
+            return blob_path
+
+    def put_bytes(self, data: bytes, suffix: str = "") -> Path:
+        """将内存中的内容存入 store
+
+        Args:
+            data: 文件内容
+            suffix: blob 文件后缀（如 .xml）
+
+        Returns:
+            Path: blob 路径
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(digest, suffix)
+        with self._lock:
+            if blob_path.exists():
+                self.stats["dedup_hits"] += 1
+                self.stats["bytes_saved"] += len(data)
+            else:
+                blob_path.parent.mkdir(exist_ok=True)
+                tmp_path = blob_path.with_name(blob_path.name + ".tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, blob_path)
+                self.stats["blobs"] += 1
+            return blob_path
+
+    # ==================== 引用 blob ====================
+
+    def link(self, blob_path: PathLike, dst: PathLike) -> Path:
+        """在目标位置创建指向 blob 的文件（硬链接，失败时复制），并记录到清单
+
+        Args:
+            blob_path: put_file/put_bytes 返回的 blob 路径
+            dst: 目标路径
+
+        Returns:
+            Path: 目标路径
+        """
+        blob_path, dst = Path(blob_path), Path(dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if dst.exists() or dst.is_symlink():
+                if dst.exists() and os.path.samefile(blob_path, dst):
+                    self.manifest[str(dst)] = blob_path.stem
+                    return dst
+                dst.unlink()
+            linked = False
+            if self.use_hardlinks:
+                try:
+                    os.link(blob_path, dst)
+                    linked = True
+                except OSError as e:
+                    # 跨文件系统、FAT/exFAT、Windows 部分网络盘等不支持硬链接
+                    logger.bind(log_tag="fairy_sys").debug(f"[BlobStore] Hard link unavailable ({e}), fall back to copy")
+                    self.use_hardlinks = False
+            if linked:
+                self.stats["hardlinks"] += 1
+            else:
+                shutil.copyfile(blob_path, dst)
+                self.stats["copies"] += 1
+            self.manifest[str(dst)] = blob_path.stem
+            return dst
+
+    def store_file(self, src: PathLike, dst: PathLike) -> Path:
+        """将源文件以 blob 引用的方式放到目标位置（替代 shutil.copy）
+
+        Args:
+            src: 源文件路径
+            dst: 目标路径
+
+        Returns:
+            Path: 目标路径
+        """
+        return self.link(self.put_file(src), dst)
+
+    def store_bytes(self, data: Union[bytes, str], dst: PathLike) -> Path:
+        """将内存内容以 blob 引用的方式写到目标位置（替代 open(dst, 'wb').write）
+
+        Args:
+            data: 文件内容（str 按 UTF-8 编码）
+            dst: 目标路径
+
+        Returns:
+            Path: 目标路径
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return self.link(self.put_bytes(data, Path(dst).suffix), dst)
+
+    def digest_of(self, path: PathLike) -> Optional[str]:
+        """查询目标路径引用的 blob 摘要，未经 store 写入时返回None"""
+        with self._lock:
+            return self.manifest.get(str(Path(path)))
+
+    # ==================== 清单 ====================
+
+    def save_manifest(self) -> Path:
+        """保存引用清单与统计信息到 blob 根目录
+
+        Returns:
+            Path: 清单文件路径
+        """
+        with self._lock:
+            data = {"stats": dict(self.stats), "entries": dict(self.manifest)}
+        manifest_path = self.root / self.MANIFEST_FILENAME
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return manifest_path
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats, references=len(self.manifest))
@@ -1,28 +1,133 @@
 """
 设备管理单例
 
-确保全局只有一个 uiautomator2 连接
+按设备序列号维护 uiautomator2 连接池：
+- 懒连接：首次使用某台设备时才建立连接
+- 健康检查：租用前检查连接是否可用（按间隔缓存检查结果）
+- 断线重连：连接失效时按指数退避重连
+- 异步租用/归还：多个 Explorer/Executor 可以并行驱动不同设备，同一设备同一时刻只被一个使用者租用
 """
+import asyncio
+import contextlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any
+
 import uiautomator2 as u2
-from typing import Optional
+from adbutils import AdbError
+from loguru import logger
+
+# 视为设备故障的异常（连接断开、adb/uiautomator 服务异常）；其他异常属于使用方自身的错误
+DEVICE_ERRORS = (u2.exceptions.DeviceError, u2.exceptions.SessionBrokenError, AdbError, ConnectionError)
+
+
+@dataclass
+class DeviceEntry:
+    """连接池中的一台设备"""
+    serial: str
+    device: Any = None                  # uiautomator2.Device，懒连接
+    leased: bool = False                # 是否已被租用
+    last_health_check: float = 0.0      # 上次健康检查通过的时间
+    consecutive_failures: int = 0       # 连续连接/健康检查失败次数
+    lease_count: int = 0                # 累计租用次数
+    connect_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)  # 同一设备的连接串行执行
+
+    @property
+    def connected(self) -> bool:
+        return self.device is not None
 
 
 class DeviceManager:
-    """UIAutomator2 设备连接单例管理器"""
+    """UIAutomator2 设备连接池（单例）"""
 
     _instance: Optional['DeviceManager'] = None
-    _device = None
-    _device_id: Optional[str] = None
+    _devices: Dict[str, DeviceEntry] = {}
+    _default_serial: Optional[str] = None   # get_device(None) 自动连接到的设备
+
+    _lock = threading.RLock()
+    _condition: Optional[asyncio.Condition] = None
+    _condition_loop = None
+
+    # 健康检查与重连参数
+    health_check_interval: float = 30.0  # 秒，间隔内不重复检查
+    reconnect_retries: int = 3
+    reconnect_base_delay: float = 1.0    # 秒，每次重试翻倍
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    # ==================== 连接 ====================
+
+    @classmethod
+    def _connect(cls, device_id: Optional[str]):
+        """按指数退避连接设备
+
+        Args:
+            device_id: 设备ID，None 表示自动选择
+
+        Returns:
+            uiautomator2.Device 实例
+        """
+        last_error = None
+        for attempt in range(cls.reconnect_retries):
+            try:
+                return u2.connect(device_id) if device_id else u2.connect()
+            except Exception as e:
+                last_error = e
+                delay = cls.reconnect_base_delay * (2 ** attempt)
+                logger.bind(log_tag="fairy_sys").warning(
+                    f"[DeviceManager] Connect to {device_id or '<auto>'} failed (attempt {attempt + 1}/{cls.reconnect_retries}): {e}, retry in {delay:.1f}s")
+                time.sleep(delay)
+        raise RuntimeError(f"[DeviceManager] Unable to connect to device {device_id or '<auto>'}: {last_error}")
+
+    @classmethod
+    def _is_healthy(cls, entry: DeviceEntry) -> bool:
+        """健康检查：能取到设备信息即认为连接可用"""
+        try:
+            entry.device.info
+            return True
+        except Exception as e:
+            logger.bind(log_tag="fairy_sys").warning(f"[DeviceManager] Health check failed for {entry.serial}: {e}")
+            return False
+
+    @classmethod
+    def _ensure_connected(cls, entry: DeviceEntry, force_check: bool = False):
+        """确保设备已连接且健康，必要时（重新）连接
+
+        阻塞调用（重连含退避等待）：只持有该设备自己的连接锁，不持有连接池锁
+
+        Args:
+            entry: 设备条目
+            force_check: 忽略健康检查间隔，强制检查
+        """
+        with entry.connect_lock:
+            now = time.time()
+            if entry.connected:
+                if not force_check and now - entry.last_health_check < cls.health_check_interval:
+                    return
+                if cls._is_healthy(entry):
+                    entry.last_health_check = now
+                    entry.consecutive_failures = 0
+                    return
+                entry.device = None
+
+            try:
+                entry.device = cls._connect(entry.serial)
+            except Exception:
+                entry.consecutive_failures += 1
+                raise
+            entry.last_health_check = time.time()
+            entry.consecutive_failures = 0
+
+    # ==================== 同步接口（兼容原有用法） ====================
+
     @classmethod
     def get_device(cls, device_id: Optional[str] = None):
         """
-        获取设备连接（单例）
+        获取设备连接（按序列号复用，不会断开其他设备的连接）
 
         Args:
             device_id: 设备ID，如果为None则自动连接
@@ -30,25 +135,188 @@ class DeviceManager:
         Returns:
             uiautomator2.Device 实例
         """
-        instance = cls()
+        cls()
+        if not device_id:
+            with cls._lock:
+                device_id = cls._default_serial
+            if device_id is None:
+                # 连接（含退避等待）不持有连接池锁，避免阻塞其他设备的租用/归还
+                device = cls._connect(None)
+                with cls._lock:
+                    if cls._default_serial is None:
+                        cls._default_serial = device.serial
+                        entry = cls._devices.setdefault(device.serial, DeviceEntry(device.serial))
+                        if not entry.connected:
+                            entry.device = device
+                            entry.last_health_check = time.time()
+                    device_id = cls._default_serial
 
-        # 如果已经连接了相同设备，直接返回
-        if instance._device is not None and instance._device_id == device_id:
-            return instance._device
+        with cls._lock:
+            entry = cls._devices.setdefault(device_id, DeviceEntry(device_id))
+        if not entry.connected:
+            cls._ensure_connected(entry)
+        return entry.device
 
-        # 如果设备ID不同，重新连接
-        if device_id is None or device_id == "":
-            instance._device = u2.connect()
-            instance._device_id = None
-        else:
-            instance._device = u2.connect(device_id)
-            instance._device_id = device_id
+    @classmethod
+    def register(cls, serials: Optional[List[str]] = None) -> List[str]:
+        """将设备加入连接池（仅登记，不立即连接）
+
+        Args:
+            serials: 设备序列号列表，为None时登记所有已连接（adb devices 中 state=device）的设备
+
+        Returns:
+            List[str]: 连接池中的全部序列号
+        """
+        if serials is None:
+            import adbutils
+            serials = [d.serial for d in adbutils.adb.device_list()]
+        with cls._lock:
+            for serial in serials:
+                cls._devices.setdefault(serial, DeviceEntry(serial))
+            return list(cls._devices.keys())
+
+    @classmethod
+    def serials(cls) -> List[str]:
+        """连接池中的全部序列号"""
+        with cls._lock:
+            return list(cls._devices.keys())
 
-        return instance._device
+    # ==================== 异步租用/归还 ====================
+
+    @classmethod
+    def _get_condition(cls) -> asyncio.Condition:
+        """获取绑定到当前事件循环的条件变量"""
+        loop = asyncio.get_running_loop()
+        if cls._condition is None or cls._condition_loop is not loop:
+            cls._condition = asyncio.Condition()
+            cls._condition_loop = loop
+        return cls._condition
+
+    @classmethod
+    def _pick_available(cls, serial: Optional[str]) -> Optional[DeviceEntry]:
+        with cls._lock:
+            if serial is not None:
+                entry = cls._devices.setdefault(serial, DeviceEntry(serial))
+                return None if entry.leased else entry
+            # 优先选择失败次数少、租用次数少的设备
+            candidates = [e for e in cls._devices.values() if not e.leased]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda e: (e.consecutive_failures, e.lease_count))
+
+    @classmethod
+    async def acquire(cls, serial: Optional[str] = None, timeout: Optional[float] = None):
+        """租用一台设备（异步等待直到有空闲设备），租用前做健康检查并按需重连
+
+        Args:
+            serial: 指定设备序列号，为None时从池中任选一台空闲设备
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            Tuple[str, uiautomator2.Device]: (序列号, 设备连接)
+        """
+        if serial is None and not cls.serials():
+            raise RuntimeError("[DeviceManager] Device pool is empty, call DeviceManager.register() first")
+
+        condition = cls._get_condition()
+        async with condition:
+            entry = None
+
+            def _try_pick():
+                nonlocal entry
+                entry = cls._pick_available(serial)
+                if entry is not None:
+                    entry.leased = True
+                return entry is not None
+
+            await asyncio.wait_for(condition.wait_for(_try_pick), timeout)
+
+        try:
+            # 连接与健康检查是阻塞调用，放到线程中执行
+            await asyncio.to_thread(cls._ensure_connected, entry, True)
+        except Exception:
+            await cls.release(entry.serial)
+            raise
+        entry.lease_count += 1
+        logger.bind(log_tag="fairy_sys").debug(f"[DeviceManager] Device {entry.serial} leased")
+        return entry.serial, entry.device
+
+    @classmethod
+    async def release(cls, serial: str, failed: bool = False):
+        """归还设备
+
+        Args:
+            serial: 设备序列号
+            failed: 使用过程中设备出错，下次租用时强制重连
+        """
+        with cls._lock:
+            entry = cls._devices.get(serial)
+            if entry is None:
+                return
+            entry.leased = False
+            if failed:
+                entry.consecutive_failures += 1
+                entry.device = None
+        condition = cls._get_condition()
+        async with condition:
+            condition.notify_all()
+        logger.bind(log_tag="fairy_sys").debug(f"[DeviceManager] Device {serial} released (failed={failed})")
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def lease(cls, serial: Optional[str] = None, timeout: Optional[float] = None):
+        """租用设备的上下文管理器，退出时自动归还（因设备/连接错误退出时标记为失败，下次租用时强制重连）
+
+        用法：
+            async with DeviceManager.lease() as (serial, dev):
+                ...
+        """
+        leased_serial, device = await cls.acquire(serial, timeout)
+        failed = False
+        try:
+            yield leased_serial, device
+        except DEVICE_ERRORS:
+            failed = True
+            raise
+        finally:
+            await cls.release(leased_serial, failed=failed)
+
+    @classmethod
+    def check_health(cls, serial: str) -> bool:
+        """立即检查指定设备的连接是否可用（阻塞调用，不重连）
+
+        Args:
+            serial: 设备序列号
+
+        Returns:
+            bool: 连接是否可用
+        """
+        with cls._lock:
+            entry = cls._devices.get(serial)
+        if entry is None or not entry.connected:
+            return False
+        healthy = cls._is_healthy(entry)
+        if healthy:
+            entry.last_health_check = time.time()
+        return healthy
+
+    @classmethod
+    def get_pool_status(cls) -> List[Dict[str, Any]]:
+        """连接池状态（用于日志/报告）"""
+        with cls._lock:
+            return [{
+                "serial": e.serial,
+                "connected": e.connected,
+                "leased": e.leased,
+                "consecutive_failures": e.consecutive_failures,
+                "lease_count": e.lease_count,
+            } for e in cls._devices.values()]
 
     @classmethod
     def reset(cls):
-        """重置单例（用于测试）"""
-        instance = cls()
-        instance._device = None
-        instance._device_id = None
+        """重置连接池（用于测试）"""
+        with cls._lock:
+            cls._devices = {}
+            cls._default_serial = None
+            cls._condition = None
+            cls._condition_loop = None
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+测试常驻 adb shell 会话与动作批量执行
+
+使用 fake_adb 离线替身，无需连接设备
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Fairy.tools.mobile_controller.adb_tools.adb_shell_session import AdbShellSession, SKIPPED_EXIT_CODE
+from Fairy.tools.mobile_controller.adb_tools.mobile_control_tool import AdbMobileController
+from Fairy.tools.mobile_controller.adb_tools.screen_capture_tool import AdbMobileScreenCapturer
+
+FAKE_ADB = f"{sys.executable} {project_root / 'Fairy/tools/mobile_controller/adb_tools/fake_adb.py'}"
+
+
+class FakeAdbConfig:
+    """AdbMobileController 所需的最小配置"""
+    adb_shell_session = True
+    adb_screencap_mode = 'file'
+    screenshot_phone_path = "/sdcard"
+    screenshot_filename = "screenshot"
+
+    def get_adb_path(self):
+        return f"{FAKE_ADB} -s emulator-5554"
+
+    def get_screenshot_temp_path(self):
+        return tempfile.gettempdir()
+
+
+def read_command_log(log_path):
+    with open(log_path, 'r', encoding='utf-8') as f:
+        return [line.rstrip("\n") for line in f]
+
+
+async def test_shell_session_batch():
+    """测试一次往返执行多条命令，输出与退出码按命令切分"""
+    session = AdbShellSession(FAKE_ADB)
+    results = await session.run_batch(["input tap 1 2", "pm list packages -3", "dumpsys window | grep -E 'mCurrentFocus'"])
+    await session.close()
+
+    assert len(results) == 3
+    assert results[0] == ("", 0)
+    assert results[1][0].splitlines() == ["package:com.example.app", "package:com.example.mail"]
+    assert "mCurrentFocus=Window{" in results[2][0]
+    print("✓ 单次往返批量执行正常")
+
+
+async def test_controller_batches_consecutive_actions(log_path):
+    """测试 Input + Enter 等连续动作合并为一次往返，非批量动作单独执行"""
+    controller = AdbMobileController(FakeAdbConfig())
+    await controller.execute_actions([
+        {"name": "Tap", "arguments": {"x": 100, "y": 200}},
+        {"name": "Input", "arguments": {"text": "hello world's"}},
+        {"name": "KeyEvent", "arguments": {"type": "KEYCODE_ENTER"}},
+        {"name": "ListApps", "arguments": None},
+    ])
+    await controller.shell_session.close()
+
+    commands = read_command_log(log_path)
+    print("收到的设备端命令:")
+    for command in commands:
+        print(f"   {command}")
+
+    assert commands == [
+        "input tap 100 200",
+        "sleep 0.5",
+        "am broadcast -a ADB_INPUT_TEXT --es msg 'hello world'\"'\"'s'",
+        "sleep 0.5",
+        "input keyevent KEYCODE_ENTER",
+        "pm list packages -3",
+    ]
+    print("✓ 连续动作已合并为一次往返")
+
+
+async def test_batch_stops_at_first_failure(log_path):
+    """测试批量中某条命令失败时不整体重放：设备端遇错即停，之后只重新执行失败及其后的动作"""
+    os.environ["FAKE_ADB_FAIL_ONCE"] = "input keyevent"
+    try:
+        session = AdbShellSession(FAKE_ADB)
+        results = await session.run_batch(["input tap 1 2", "input keyevent 4", "input tap 3 4"], stop_on_error=True)
+        await session.close()
+        assert [exit_code for _, exit_code in results] == [0, 1, SKIPPED_EXIT_CODE]
+        assert read_command_log(log_path) == ["input tap 1 2", "input keyevent 4"]
+
+        os.remove(log_path)
+        controller = AdbMobileController(FakeAdbConfig())
+        await controller.execute_actions([
+            {"name": "Tap", "arguments": {"x": 100, "y": 200}},
+            {"name": "Input", "arguments": {"text": "hello"}},
+            {"name": "KeyEvent", "arguments": {"type": "KEYCODE_ENTER"}},
+            {"name": "Tap", "arguments": {"x": 300, "y": 400}},
+        ])
+        await controller.shell_session.close()
+    finally:
+        del os.environ["FAKE_ADB_FAIL_ONCE"]
+
+    # 点击和输入各只执行一次；失败的按键及其后的点击逐个重新执行
+    assert read_command_log(log_path) == [
+        "input tap 100 200",
+        "sleep 0.5",
+        "am broadcast -a ADB_INPUT_TEXT --es msg hello",
+        "sleep 0.5",
+        "input keyevent KEYCODE_ENTER",
+        "input keyevent KEYCODE_ENTER",
+        "input tap 300 400",
+    ]
+    print("✓ 批量执行失败时只重新执行失败及其后的动作")
+
+
+async def test_capturer_focus_and_ime_single_round_trip(log_path, use_shell_session):
+    """测试焦点窗口与输入法状态通过一次 dumpsys 往返获取（会话模式与一次性进程模式）"""
+    config = FakeAdbConfig()
+    config.adb_shell_session = use_shell_session
+    capturer = AdbMobileScreenCapturer(config)
+    activity_info, keyboard_status = await capturer._get_focus_and_ime_status()
+    if capturer.shell_session is not None:
+        await capturer.shell_session.close()
+
+    assert activity_info.package_name == "com.example.app"
+    assert activity_info.activity == "com.example.app.MainActivity"
+    assert keyboard_status == ["com.example.ime/.Ime", "false"]
+    assert read_command_log(log_path) == ["dumpsys window; dumpsys input_method"]
+    print(f"✓ 焦点窗口与输入法状态单次往返获取正常 (shell_session={use_shell_session})")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "fake_adb.log")
+        os.environ["FAKE_ADB_LOG"] = log_path
+
+        asyncio.run(test_shell_session_batch())
+        os.remove(log_path)
+        asyncio.run(test_controller_batches_consecutive_actions(log_path))
+        os.remove(log_path)
+        asyncio.run(test_batch_stops_at_first_failure(log_path))
+        for use_shell_session in (True, False):
+            os.remove(log_path)
+            asyncio.run(test_capturer_focus_and_ime_single_round_trip(log_path, use_shell_session))
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()
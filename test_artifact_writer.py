@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试 Executor 的后台产物写入（ArtifactWriter / OutputManager）
+
+无需连接设备：截图用临时文件代替
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Executor.artifact_writer import ArtifactWriter
+from Executor.output import ExecutionOutput, OutputManager
+
+
+class FakeScreenFileInfo:
+    """只提供 ensure_persisted 的截图文件替身"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def ensure_persisted(self) -> str:
+        return str(self.path)
+
+
+def make_screen_info(tmp_dir: Path, content: bytes):
+    screenshot_path = tmp_dir / f"screenshot_{len(list(tmp_dir.glob('screenshot_*')))}.jpeg"
+    screenshot_path.write_bytes(content)
+    perception_infos = SimpleNamespace(use_set_of_marks_mapping=True, SoM_mapping={1: (10, 20), 2: (30, 40)})
+    return SimpleNamespace(screenshot_file_info=FakeScreenFileInfo(screenshot_path), perception_infos=perception_infos)
+
+
+def make_result(instruction: str) -> ExecutionOutput:
+    return ExecutionOutput(
+        success=True, instruction=instruction, actions_taken=[], action_thought="", action_expectation="",
+        execution_time=0.1, timestamp="2026-01-01 00:00:00", output_files={}
+    )
+
+
+def test_synchronous_mode():
+    """同步模式：提交时立即写入，写入失败直接抛出"""
+    writer = ArtifactWriter(synchronous=True)
+    written = []
+    writer.submit("results", written.append, 1)
+    assert written == [1]
+
+    try:
+        writer.submit("results", lambda: 1 / 0)
+        assert False, "同步模式应抛出写入异常"
+    except ZeroDivisionError:
+        pass
+    assert writer.get_stats() == {'submitted': 2, 'written': 1, 'failed': 1, 'pending': 0, 'counts': {'results': 2}}
+    print("✓ 同步模式")
+
+
+def test_background_order_and_backpressure():
+    """后台模式：按提交顺序执行，队列满时提交方阻塞，flush 后全部完成"""
+    writer = ArtifactWriter(max_queue_size=2)
+    gate = threading.Event()
+    order = []
+    writer.submit("blocked", gate.wait)
+    for i in range(2):
+        writer.submit("items", order.append, i)
+
+    # 队列已满（1个执行中 + 2个排队）：下一次提交阻塞，直到放行
+    submitter = threading.Thread(target=writer.submit, args=("items", order.append, 2))
+    submitter.start()
+    submitter.join(timeout=0.2)
+    assert submitter.is_alive(), "队列满时提交应阻塞"
+
+    gate.set()
+    submitter.join()
+    writer.flush()
+    assert order == [0, 1, 2]
+    assert writer.pending == 0
+
+    writer.submit("items", lambda: 1 / 0)  # 后台写入失败只计数，不影响后续写入
+    writer.submit("items", order.append, 3)
+    writer.close()
+    assert order == [0, 1, 2, 3]
+    assert writer.failed == 1 and writer.written == 5
+
+    writer.submit("items", order.append, 4)  # 关闭后在调用线程中写入
+    assert order[-1] == 4
+    print("✓ 后台模式：顺序、背压、flush/close")
+
+
+def test_output_manager(synchronous: bool):
+    """OutputManager：返回的路径在 flush 后可读，会话摘要使用内存计数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        manager = OutputManager(tmp_dir / "output", session_id="session", synchronous_writes=synchronous)
+        screen_info = make_screen_info(tmp_dir, b"fake-jpeg")
+
+        screenshot_path = manager.save_screenshot(screen_info, "before", "exec_001")
+        marked_path = manager.save_marked_image(screen_info, "before", "exec_001")
+        mapping_path = manager.save_mark_mapping(screen_info, "before", "exec_001")
+
+        result = make_result("点击设置")
+        result_path = manager.save_execution_result(result)
+        result.output_files['result'] = str(result_path)  # 提交后的修改不影响已保存的内容
+
+        manager.flush()
+        assert screenshot_path.read_bytes() == b"fake-jpeg"
+        assert marked_path.read_bytes() == b"fake-jpeg"
+        assert json.loads(mapping_path.read_text(encoding='utf-8'))['mark_mapping'] == {'1': [10, 20], '2': [30, 40]}
+        saved_result = json.loads(result_path.read_text(encoding='utf-8'))
+        assert saved_result['instruction'] == "点击设置" and saved_result['output_files'] == {}
+
+        summary_path = manager.save_session_summary()
+        summary = json.loads(summary_path.read_text(encoding='utf-8'))
+        assert (summary['screenshots_count'], summary['marked_images_count'], summary['results_count']) == (1, 1, 1)
+        assert summary['artifact_writer']['written'] == 4 and summary['artifact_writer']['pending'] == 0
+        assert summary['blob_store']['blobs'] == 1
+        manager.close()
+    print(f"✓ OutputManager（{'同步' if synchronous else '后台'}写入）")
+
+
+def main():
+    test_synchronous_mode()
+    test_background_order_and_backpressure()
+    test_output_manager(synchronous=True)
+    test_output_manager(synchronous=False)
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
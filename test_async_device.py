@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+测试 uiautomator2 设备的异步门面（AsyncDevice）
+
+设备用记录调用的替身代替，无需连接设备
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Fairy.tools.mobile_controller.ui_automator_tools.async_device import AsyncDevice
+
+
+class FakeDevice:
+    """记录调用的 uiautomator2 设备替身"""
+
+    def __init__(self, serial, name):
+        self.serial = serial
+        self.name = name
+        self.calls = []
+
+    def click(self, x, y):
+        self.calls.append(("click", x, y))
+        return self.name
+
+    def dump_hierarchy(self):
+        self.calls.append(("dump_hierarchy",))
+        return f"<hierarchy device='{self.name}'/>"
+
+
+def test_shared_serial():
+    """同一序列号的两个设备对象（控制器与截图器各自 u2.connect）：共用门面，先持有的一方仍可调用"""
+    controller_dev = FakeDevice("emulator-5554", "controller")
+    capturer_dev = FakeDevice("emulator-5554", "capturer")
+
+    controller_adev = AsyncDevice.of(controller_dev)
+    capturer_adev = AsyncDevice.of(capturer_dev)
+    assert controller_adev is capturer_adev
+
+    async def run():
+        await controller_adev.click(10, 20)
+        return await capturer_adev.dump_hierarchy()
+
+    assert asyncio.run(run()) == "<hierarchy device='capturer'/>"
+    # 之后的调用使用最新的设备对象
+    assert capturer_dev.calls == [("click", 10, 20), ("dump_hierarchy",)]
+
+    other_adev = AsyncDevice.of(FakeDevice("emulator-5556", "other"))
+    assert other_adev is not controller_adev
+
+    controller_adev.shutdown()
+    other_adev.shutdown()
+    assert AsyncDevice.of(controller_dev) is not controller_adev  # 显式关闭后重新创建
+    AsyncDevice.of(controller_dev).shutdown()
+    print("✓ 同一序列号的多个设备对象共用门面")
+
+
+def main():
+    test_shared_serial()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+测试反思预检（Executor/reflection_precheck.py）
+
+使用真实的 SSIPInfo 构造执行前后的屏幕，LMM 用替身代替，无需连接设备
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Executor.config import ReflectionConfig
+from Executor.executor import FairyExecutor
+from Executor.reflection_precheck import ReflectionPrecheck
+from Fairy.entity.info_entity import ActionInfo, ActivityInfo, PlanInfo, ScreenInfo
+from Fairy.tools.screen_perceptor.ssip_new.perceptor.entity import SSIPInfo
+
+
+def make_node(class_name, bounds, text="", resource_id=None, properties=None, children=None):
+    return {
+        'class': class_name, 'resource-id': resource_id, 'text': text, 'bounds': bounds,
+        'properties': properties or [], 'children': children or []
+    }
+
+
+def make_screen(nodes, activity=".MainActivity", keyboard=False) -> ScreenInfo:
+    """由可访问性树节点构造屏幕（非视觉模式的 SSIPInfo）"""
+    root = make_node("android.widget.FrameLayout", [[0, 0], [1080, 2400]], children=nodes)
+    perception_infos = SSIPInfo(1080, 2400, ["<hierarchy/>", "page description", [root]],
+                                non_visual_mode=True, SoM_mapping=None)
+    perception_infos.keyboard_status = keyboard
+    return ScreenInfo(None, perception_infos, ActivityInfo("com.example", activity, 0, 0))
+
+
+SAVE_BUTTON = make_node("android.widget.Button", [[100, 100], [300, 200]], "保存", "com.example:id/save", ["clickable"])
+SAVED_TOAST = make_node("android.widget.TextView", [[100, 400], [600, 500]], "保存成功")
+PLAN_INFO = PlanInfo("", "保存设置", "点击保存按钮", "", "")
+
+
+def tap(expectation="") -> ActionInfo:
+    return ActionInfo("点击保存", [{'name': 'Tap', 'arguments': {'x': 200, 'y': 150}}], expectation, "")
+
+
+def test_no_change_after_tap():
+    """点击后屏幕完全不变 → D"""
+    precheck = ReflectionPrecheck()
+    verdict = precheck.evaluate(tap(), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON]))
+    assert verdict is not None and verdict.action_result == "D" and verdict.rule == "no_change"
+    assert verdict.signals.diff_size == 0 and verdict.signals.target_found
+    assert precheck.accept(verdict) and precheck.get_stats()['llm_calls_saved'] == 1
+
+    # 键盘弹出也算屏幕变化，不作判断
+    assert precheck.evaluate(tap(), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON], keyboard=True)) is None
+    print("✓ 点击后无变化判定为 D")
+
+
+def test_expected_text_appeared():
+    """预期结果中引号括起的文本新出现 → B（只说明该动作符合预期，子目标是否完成仍由后续迭代判断）"""
+    precheck = ReflectionPrecheck()
+    verdict = precheck.evaluate(tap('页面出现"保存成功"提示'), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON, SAVED_TOAST]))
+    assert verdict is not None and verdict.action_result == "B" and verdict.rule == "expected_text_appeared"
+    assert verdict.signals.expected_texts_new == ["保存成功"]
+    progress_info = verdict.to_progress_info("保存设置")
+    assert progress_info.action_result == "B" and "not yet confirmed" in progress_info.progress_status
+
+    # 预期文本执行前就已存在：不作判断
+    assert precheck.evaluate(tap('页面出现"保存"按钮'), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON, SAVED_TOAST])) is None
+    print("✓ 预期文本新出现判定为 B")
+
+
+class FakeModelClient:
+    """记录调用次数，返回固定的反思结果"""
+
+    def __init__(self, action_result):
+        self.calls = 0
+        self.action_result = action_result
+
+    async def create(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=json.dumps({
+            'action_result': self.action_result, 'error_potential_causes': "None", 'progress_status': "LMM"
+        }))
+
+
+def make_executor(precheck: ReflectionPrecheck, model_client: FakeModelClient) -> FairyExecutor:
+    """只包含反思所需属性的执行器（不连接设备）"""
+    executor = object.__new__(FairyExecutor)
+    executor.config = SimpleNamespace(perception=SimpleNamespace(non_visual_mode=True))
+    executor.reflection_precheck = precheck
+    executor.model_client = model_client
+    return executor
+
+
+def reflect(executor, action_info, screen_before, screen_after):
+    return asyncio.run(executor._reflect_on_execution(
+        instruction="保存设置", plan_info=PLAN_INFO, action_info=action_info,
+        screen_before=screen_before, screen_after=screen_after, key_infos=[]
+    ))
+
+
+def test_precheck_skips_llm():
+    """置信度达到阈值时不调用LMM；低于阈值时退回LMM"""
+    model_client = FakeModelClient("B")
+    progress_info = reflect(make_executor(ReflectionPrecheck(), model_client), tap(), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON]))
+    assert progress_info.action_result == "D" and model_client.calls == 0
+
+    progress_info = reflect(make_executor(ReflectionPrecheck(min_confidence=0.99), model_client), tap(), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON]))
+    assert progress_info.action_result == "B" and model_client.calls == 1
+    print("✓ 预检结果跳过LMM / 低置信度退回LMM")
+
+
+def test_audit_mode():
+    """审计模式：仍然调用LMM并采用其结果，记录预检与LMM是否一致"""
+    precheck = ReflectionPrecheck(audit_mode=True)
+    model_client = FakeModelClient("D")
+    executor = make_executor(precheck, model_client)
+
+    progress_info = reflect(executor, tap(), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON]))
+    assert progress_info.action_result == "D" and model_client.calls == 1
+
+    # 预检判断为 B：LMM 判断为 A（子目标已完成）同样一致，判断为 C 不一致
+    for llm_result in ("A", "C"):
+        model_client.action_result = llm_result
+        progress_info = reflect(executor, tap('出现"保存成功"'), make_screen([SAVE_BUTTON]), make_screen([SAVE_BUTTON, SAVED_TOAST]))
+        assert progress_info.action_result == llm_result
+    assert model_client.calls == 3
+
+    stats = precheck.get_stats()
+    assert stats['llm_calls_saved'] == 0
+    assert stats['audit_accuracy']['no_change'] == {'total': 1, 'agreed': 1, 'accuracy': 1.0}
+    assert stats['audit_accuracy']['expected_text_appeared'] == {'total': 2, 'agreed': 1, 'accuracy': 0.5}
+    print("✓ 审计模式记录一致率")
+
+
+def test_default_config():
+    """默认配置运行在审计模式：预检结果不替代LMM反思"""
+    config = ReflectionConfig()
+    assert config.enable_precheck and config.precheck_audit_mode
+    print("✓ 默认审计模式")
+
+
+def main():
+    test_default_config()
+    test_no_change_after_tap()
+    test_expected_text_appeared()
+    test_precheck_skips_llm()
+    test_audit_mode()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试屏幕稳定检测（ScreenSettleDetector / UiAutomatorSettleSampler）
+
+使用预设的采样序列与设备替身，无需连接设备
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Fairy.tools.mobile_controller.screen_settle_detector import (
+    ScreenSettleDetector, SettleConfig, SettleSample, hierarchy_skeleton_hash
+)
+from Fairy.tools.mobile_controller.ui_automator_tools.screen_settle_sampler import build_settle_detector
+
+FAST_CONFIG = SettleConfig(max_timeout=1.0, min_wait=0.0, poll_interval=0.01, use_statistics=False)
+
+
+def make_xml(clock="12:00", button_bounds="[100,200][300,260]"):
+    return (
+        '<hierarchy rotation="0">'
+        '<node class="android.widget.FrameLayout" package="com.example" bounds="[0,0][1080,2400]">'
+        f'<node class="android.widget.TextView" resource-id="com.android.systemui:id/clock" text="{clock}" content-desc="{clock}" bounds="[0,0][200,80]"/>'
+        f'<node class="android.widget.Button" resource-id="com.example:id/ok" text="确定" clickable="true" bounds="{button_bounds}"/>'
+        '</node></hierarchy>'
+    )
+
+
+class FakeSampler:
+    """依次返回预设的层次结构，之后一直返回最后一个"""
+
+    def __init__(self, xmls):
+        self.xmls = list(xmls)
+        self.calls = 0
+
+    async def __call__(self) -> SettleSample:
+        ui_xml = self.xmls[min(self.calls, len(self.xmls) - 1)]
+        self.calls += 1
+        return SettleSample(activity="com.example/.MainActivity", package_name="com.example",
+                            hierarchy_hash=hierarchy_skeleton_hash(ui_xml), hierarchy_xml=ui_xml)
+
+
+class FakeAsyncDevice:
+    """记录被调用的设备接口"""
+
+    def __init__(self, xmls):
+        self.xmls = list(xmls)
+        self.calls = []
+
+    async def shell(self, command, timeout=None):
+        self.calls.append("shell")
+        return "mCurrentFocus=Window{1a2b3c u0 com.example/com.example.MainActivity}", 0
+
+    async def dump_hierarchy(self):
+        self.calls.append("dump_hierarchy")
+        return self.xmls.pop(0) if len(self.xmls) > 1 else self.xmls[0]
+
+    async def screenshot(self):
+        self.calls.append("screenshot")
+        raise AssertionError("未启用的截图信号不应被采样")
+
+
+def test_skeleton_hash():
+    """骨架哈希忽略文本变化，位置/结构变化会改变哈希"""
+    assert hierarchy_skeleton_hash(make_xml("12:00")) == hierarchy_skeleton_hash(make_xml("12:01"))
+    assert hierarchy_skeleton_hash(make_xml()) != hierarchy_skeleton_hash(make_xml(button_bounds="[100,400][300,460]"))
+    assert hierarchy_skeleton_hash("<broken") != hierarchy_skeleton_hash("<broken2")
+    print("✓ 骨架哈希忽略文本")
+
+
+def test_settles_despite_ticking_clock():
+    """动画过程中按钮位置变化，之后只有时钟在走：判定为稳定"""
+    sampler = FakeSampler([
+        make_xml("12:00", "[100,800][300,860]"),
+        make_xml("12:00", "[100,500][300,560]"),
+        make_xml("12:01"),
+        make_xml("12:02"),
+    ])
+    result = asyncio.run(ScreenSettleDetector(sampler, FAST_CONFIG).wait_until_settled())
+    assert result.settled and result.polls == 4
+    assert 'text="12:02"' in result.last_sample.hierarchy_xml  # 复用的是最后一次采样的层次结构
+    print("✓ 时钟变化不影响稳定判定")
+
+
+def test_timeout_when_never_settled():
+    """布局一直在变化：超时后返回未稳定"""
+    xmls = [make_xml(button_bounds=f"[100,{y}][300,{y + 60}]") for y in range(0, 2000, 10)]
+    config = SettleConfig(max_timeout=0.2, min_wait=0.0, poll_interval=0.02, use_statistics=False)
+    detector = ScreenSettleDetector(FakeSampler(xmls), config)
+    result = asyncio.run(detector.wait_until_settled())
+    assert not result.settled and result.elapsed < 0.5
+    assert detector.statistics.to_dict()['com.example']['timeouts'] == 1
+    print("✓ 持续变化时超时返回")
+
+
+def test_sampler_uses_config_signals():
+    """build_settle_detector 将 config.signals 传给采样器"""
+    adev = FakeAsyncDevice([make_xml("12:00"), make_xml("12:01")])
+    detector = build_settle_detector(adev, FAST_CONFIG)
+    assert detector.sampler.signals == ("activity", "hierarchy")
+    result = asyncio.run(detector.wait_until_settled())
+    assert result.settled and result.last_sample.package_name == "com.example"
+    assert "dump_hierarchy" in adev.calls and "screenshot" not in adev.calls
+
+    activity_only = SettleConfig(max_timeout=1.0, min_wait=0.0, poll_interval=0.01, use_statistics=False, signals=("activity",))
+    adev = FakeAsyncDevice([make_xml()])
+    result = asyncio.run(build_settle_detector(adev, activity_only).wait_until_settled())
+    assert result.settled and result.last_sample.hierarchy_xml is None
+    assert set(adev.calls) == {"shell"}
+    print("✓ 采样器使用配置中的信号")
+
+
+def main():
+    test_skeleton_hash()
+    test_settles_despite_ticking_clock()
+    test_timeout_when_never_settled()
+    test_sampler_uses_config_signals()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
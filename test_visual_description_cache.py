@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试增量感知中视觉描述的缓存复用（ScreenStructuredInfoPerception）
+
+截图用内存中的 PIL 图像，视觉描述生成器用替身代替，无需连接设备或调用模型
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image as PILImage, ImageDraw
+
+from Fairy.entity.info_entity import ScreenFileInfo
+from Fairy.tools.screen_perceptor.ssip_new.perceptor.perceptor import ScreenStructuredInfoPerception
+
+ICON_BOUNDS = [[[100, 100], [300, 300]], [[100, 400], [300, 600]]]
+
+
+class FakeAccessibilityTree:
+    """只提供需要视觉描述的图像节点（两个列表槽位中的 ImageView）"""
+
+    def get_nodes_need_visual_desc(self, return_keys=False):
+        keys = [("com.example:id/icon", "android.widget.ImageView", str(bounds)) for bounds in ICON_BOUNDS]
+        return (ICON_BOUNDS, keys) if return_keys else ICON_BOUNDS
+
+
+class FakeDescriptionGenerator:
+    """按裁剪区域的颜色生成描述，并记录请求的区域"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def generate_visual_description(self, screenshot_file_info, image_coordinates):
+        self.requests.append(list(image_coordinates))
+        image = screenshot_file_info.get_screenshot_PILImage_file()
+        return {i: f"icon {image.getpixel(((x1 + x2) // 2, (y1 + y2) // 2))}"
+                for i, ((x1, y1), (x2, y2)) in enumerate(image_coordinates)}
+
+
+def make_screenshot(colors) -> ScreenFileInfo:
+    image = PILImage.new("RGB", (1080, 2400), "white")
+    draw = ImageDraw.Draw(image)
+    for ((x1, y1), (x2, y2)), color in zip(ICON_BOUNDS, colors):
+        draw.ellipse((x1, y1, x2, y2), fill=color)
+    screenshot_file_info = ScreenFileInfo("/tmp", "screenshot", "png")
+    screenshot_file_info.set_image(image)
+    return screenshot_file_info
+
+
+def describe(perception, screenshot_file_info):
+    return asyncio.run(perception._generate_visual_description_incrementally(
+        screenshot_file_info, FakeAccessibilityTree(), track_diff=True))
+
+
+def test_reuse_and_invalidate():
+    """图像未变化时复用描述；同一槽位换了图像（列表滚动）时重新生成"""
+    perception = ScreenStructuredInfoPerception(None, None)
+    generator = FakeDescriptionGenerator()
+    perception.image_description_generator = generator
+
+    first = describe(perception, make_screenshot(["red", "blue"]))
+    assert first == {0: "icon (255, 0, 0)", 1: "icon (0, 0, 255)"}
+    assert len(generator.requests) == 1
+
+    # 同一画面重新感知：全部复用
+    assert describe(perception, make_screenshot(["red", "blue"])) == first
+    assert len(generator.requests) == 1
+
+    # 列表滚动：第一个槽位显示了新的图像，节点键不变但描述需要重新生成
+    scrolled = describe(perception, make_screenshot(["green", "blue"]))
+    assert scrolled == {0: "icon (0, 128, 0)", 1: "icon (0, 0, 255)"}
+    assert generator.requests[-1] == [ICON_BOUNDS[0]]
+    print("✓ 视觉描述按图像内容复用/失效")
+
+
+def main():
+    test_reuse_and_invalidate()
+    print("\n全部测试通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+XMLCompressor 黄金输出等价性测试
+
+对 captures/ 下的 UI XML 样本（以及 Perceptor/golden/ 中的合成样本）进行压缩，
+与多遍实现生成并保存在 Perceptor/golden/ 中的输出逐字节比较（压缩XML与文本描述）。
+
+重新生成黄金输出（仅在有意修改压缩规则时）：python test_xml_compressor.py --regenerate
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# 添加项目路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from Perceptor.tools import XMLCompressor
+from Fairy.tools.screen_perceptor.ssip_new.hierarchy import ParsedHierarchy
+
+GOLDEN_DIR = project_root / "Perceptor" / "golden"
+
+
+def collect_fixtures():
+    """captures/ 下的 ui_dump 样本 + golden 目录下的合成样本"""
+    fixtures = sorted(project_root.glob("captures/*/ui_dump_*.xml"))
+    fixtures += sorted(project_root.glob("Perceptor/captures/*/ui_dump_*.xml"))
+    fixtures += sorted(p for p in GOLDEN_DIR.glob("*.xml") if not p.name.endswith(".compressed.xml"))
+    return fixtures
+
+
+def golden_paths(fixture: Path):
+    return GOLDEN_DIR / f"{fixture.stem}.compressed.xml", GOLDEN_DIR / f"{fixture.stem}.compressed.txt"
+
+
+def test_golden_equivalence(fixture: Path):
+    """压缩输出与黄金输出逐字节一致"""
+    golden_xml_path, golden_txt_path = golden_paths(fixture)
+    ui_xml = fixture.read_text(encoding='utf-8')
+
+    compressed_xml, text_desc = XMLCompressor().compress_xml_in_memory(ui_xml)
+
+    assert compressed_xml == golden_xml_path.read_bytes(), f"{fixture.name}: 压缩XML与黄金输出不一致"
+    assert text_desc == golden_txt_path.read_text(encoding='utf-8'), f"{fixture.name}: 文本描述与黄金输出不一致"
+    print(f"✓ {fixture.relative_to(project_root)}: 与黄金输出一致")
+
+
+def test_shared_hierarchy_untouched(fixture: Path):
+    """复用共享解析结果时不修改解析树，且同一帧的压缩结果只计算一次"""
+    hierarchy = ParsedHierarchy(fixture.read_text(encoding='utf-8'))
+    before = ET.tostring(hierarchy.root)
+
+    first = XMLCompressor().compress_xml_in_memory(hierarchy)
+    second = XMLCompressor().compress_xml_in_memory(hierarchy)
+
+    assert ET.tostring(hierarchy.root) == before, f"{fixture.name}: 共享解析树被修改"
+    assert first is second, f"{fixture.name}: 同一帧重复压缩"
+    assert first == XMLCompressor().compress_xml_in_memory(hierarchy.xml)
+    print(f"✓ {fixture.relative_to(project_root)}: 共享解析树未被修改")
+
+
+def regenerate():
+    for fixture in collect_fixtures():
+        golden_xml_path, golden_txt_path = golden_paths(fixture)
+        compressed_xml, text_desc = XMLCompressor().compress_xml_in_memory(fixture.read_text(encoding='utf-8'))
+        golden_xml_path.write_bytes(compressed_xml)
+        golden_txt_path.write_text(text_desc, encoding='utf-8')
+        print(f"已生成: {golden_xml_path.name}, {golden_txt_path.name}")
+
+
+def main():
+    if "--regenerate" in sys.argv:
+        regenerate()
+        return
+
+    fixtures = collect_fixtures()
+    assert fixtures, "未找到 XML 样本"
+    for fixture in fixtures:
+        test_golden_equivalence(fixture)
+        test_shared_hierarchy_untouched(fixture)
+
+    print("\n✅ 所有测试通过")
+
+
+if __name__ == "__main__":
+    main()